@@ -16,6 +16,7 @@ st.set_page_config(
 # Import components
 # Import components
 from components import inject_css, show_login, render_sidebar
+from utils.db_manager import get_db_engine
 from views import (
     show_dashboard, 
     show_produksi,
@@ -67,6 +68,12 @@ def main():
         
         render_sidebar()
 
+        # Views read the migrated schema; the sidebar sync (or the worker) upgrades it
+        try:
+            get_db_engine()
+        except RuntimeError as e:
+            st.error(f"⚠️ {e}")
+            st.stop()
         
         # Route to pages
         menu = st.session_state.current_menu
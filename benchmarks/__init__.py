@@ -0,0 +1,11 @@
+# ============================================================
+# BENCHMARKS - Sync pipeline performance scripts
+# ============================================================
+# Run from the project root, e.g.:
+#   python -m benchmarks.bench_bulk_writer --rows 50000
+#   python -m benchmarks.bench_sync_e2e --scale 10
+#   python -m benchmarks.bench_readers --days 120
+#   python -m benchmarks.explain_loaders
+#   python -m benchmarks.bench_rollups --scale 1
+#   python -m benchmarks.bench_dimensions --scale 1
+#   python -m benchmarks.bench_loader_queries --scale 1
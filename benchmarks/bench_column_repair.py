@@ -0,0 +1,49 @@
+"""
+2026 downtime column repair (utils.parsers.repair_shifted_columns) against
+the pair-by-pair df.loc assignments parse_downtime_data and
+load_gangguan_all used to make.
+
+    python -m benchmarks.bench_column_repair --rows 100000
+
+Parity, before timing: the cases of tests/test_column_repair.py (the
+Gangguan workbook and synthetic frames of every column dtype) at --rows /
+--days.
+"""
+import argparse
+import time
+
+from utils.parsers import repair_shifted_columns, shifted_downtime_rows
+from tests.test_column_repair import check_parity, legacy_repair, parity_cases
+
+
+def best_of(fn, df, repeat):
+    timings = []
+    for _ in range(repeat):
+        frame, mask = df.copy(), shifted_downtime_rows(df)
+        start = time.perf_counter()
+        fn(frame, mask)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--days', type=int, default=120, help='Days in the synthetic Gangguan workbook')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    cases = parity_cases(args.rows, args.days)
+    check_parity(cases)
+    print(f"Parity: OK (block copy == pairwise df.loc on {len(cases)} frames)")
+
+    print(f"{'frame':<20}{'rows':>9}{'pairwise':>11}{'block':>10}{'speedup':>10}")
+    for name in ('gangguan workbook', 'synthetic'):
+        df = cases[name]
+        t_before = best_of(legacy_repair, df, args.repeat)
+        t_after = best_of(repair_shifted_columns, df, args.repeat)
+        print(f"{name:<20}{len(df):>9,}{t_before:>10.3f}s{t_after:>9.3f}s{t_before / t_after:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
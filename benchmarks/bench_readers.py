@@ -0,0 +1,144 @@
+"""
+Excel reader backends (utils.parsers.EXCEL_READERS) on the four synced
+workbook layouts, generated by benchmarks.workbooks.
+
+    python -m benchmarks.bench_readers --scale 1 --days 120
+    python -m benchmarks.bench_readers --dir /path/with/real/workbooks
+
+Parity, before timing: the cases of tests/test_readers.py (raw sheets,
+streamed rows and parsed frames of every other installed engine ==
+openpyxl) on the benchmark's workbooks.
+Timing: open + full parse job per workbook, best of --repeat.
+Memory: peak RSS growth of one parse job in a fresh process, per engine,
+for the sources with streamed sheets (Produksi, Stockpile Hopper) parsed
+whole and bounded to their last --window-days (as a window sync does,
+streaming in bounded memory, see utils.parsers.BOUNDED_READERS), with the
+bounded job's time; and of the two Workbook.rows() readers on their own:
+the Stockpile Hopper stream since the same date and the column-range copy
+of the 2026 shipping blocks (calamine loads whole sheets for both).
+"""
+import argparse
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+from io import BytesIO
+
+import utils.parsers as parsers
+from benchmarks.workbooks import FILE_NAMES, YEAR, generate_workbooks
+from tests.test_readers import BASELINE, check_parity, run_job
+
+# Sources whose parse job streams a sheet with min_date
+STREAMED_SOURCES = ('produksi', 'monitoring')
+
+# Workbook.rows() reader -> (source, read(wb, min_date))
+READER_CASES = {
+    'stockpile stream': ('monitoring', lambda wb, min_date: parsers.SheetStream(
+        wb, 'Stockpile Hopper', parsers.STOCKPILE_HEADER_WORDS, start=3000, min_date=min_date).frame()),
+    'shipping blocks': ('monitoring', lambda wb, min_date: parsers.parse_shipping_data(wb)),
+}
+
+
+def best_of(key, data, engine, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run_job(key, data, engine)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def _status_kb(field):
+    with open('/proc/self/status') as f:
+        return int(next(line for line in f if line.startswith(field)).split()[1])
+
+
+def read_case(case, data, engine, min_date):
+    with parsers.Workbook(BytesIO(data), engine=engine) as wb:
+        return READER_CASES[case][1](wb, min_date)
+
+
+def _measure(fn, *args):
+    # Linux: reset the peak (VmHWM) so the imports' peak does not hide the call's
+    with open('/proc/self/clear_refs', 'w') as f:
+        f.write('5')
+    before, start = _status_kb('VmRSS:'), time.perf_counter()
+    fn(*args)
+    return (_status_kb('VmHWM:') - before) / 1024, time.perf_counter() - start
+
+
+def peak_mb(fn, *args):
+    """(peak RSS growth MB, seconds) of fn(*args), in a fresh process (Linux /proc)"""
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as pool:
+        return pool.submit(_measure, fn, *args).result()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dir', default=None, help='Directory with the real workbooks (default: synthetic)')
+    parser.add_argument('--scale', type=float, default=1)
+    parser.add_argument('--days', type=int, default=120)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--window-days', type=int, default=30, help='min_date bound of the memory check')
+    args = parser.parse_args()
+
+    engines = parsers.available_readers(BASELINE)
+    print(f"Installed readers: {', '.join(engines)} (default order: {', '.join(parsers.available_readers())})")
+
+    workdir = None
+    if args.dir:
+        files = {key: os.path.join(args.dir, name) for key, name in FILE_NAMES.items()
+                 if os.path.exists(os.path.join(args.dir, name))}
+    else:
+        workdir = tempfile.mkdtemp(prefix='bench_readers_')
+        files = generate_workbooks(workdir, args.scale, args.days)
+
+    try:
+        payloads = {}
+        for key, path in files.items():
+            with open(path, 'rb') as f:
+                payloads[key] = f.read()
+            for engine in engines[1:]:
+                check_parity(key, payloads[key], engine)
+        if len(engines) > 1:
+            print(f"Parity: OK ({', '.join(engines[1:])} == {BASELINE}: raw sheets, streamed rows, parsed frames)")
+        else:
+            print(f"Parity: skipped (only {BASELINE} installed; pip install python-calamine)")
+
+        print(f"{'workbook':<12}{'MB':>6}" + ''.join(f"{e:>11}" for e in engines) + f"{'speedup':>9}")
+        for key, data in payloads.items():
+            timings = [best_of(key, data, engine, args.repeat) for engine in engines]
+            speedup = timings[0] / min(timings)
+            print(f"{key:<12}{len(data) / 1024 / 1024:>6.1f}" + ''.join(f"{t:>10.2f}s" for t in timings) +
+                  f"{speedup:>8.1f}x")
+
+        window = date(YEAR, 1, 1) + timedelta(days=max(args.days - args.window_days, 0))
+        print(f"Peak RSS MB of one parse job: whole / since {window:%d %b} (its time)")
+        print(f"{'workbook':<12}" + ''.join(f"{e:>22}" for e in engines))
+        for key in STREAMED_SOURCES:
+            if key not in payloads:
+                continue
+            cells = []
+            for engine in engines:
+                whole, _ = peak_mb(run_job, key, payloads[key], engine, None)
+                bounded, seconds = peak_mb(run_job, key, payloads[key], engine, window)
+                cells.append(f"{whole:.0f} / {bounded:.0f} ({seconds:.1f}s)")
+            print(f"{key:<12}" + ''.join(f"{c:>22}" for c in cells))
+
+        print(f"Peak RSS MB of one Workbook.rows() reader (its time)")
+        print(f"{'reader':<18}" + ''.join(f"{e:>16}" for e in engines))
+        for case, (key, _) in READER_CASES.items():
+            if key not in payloads:
+                continue
+            cells = [peak_mb(read_case, case, payloads[key], engine, window) for engine in engines]
+            print(f"{case:<18}" + ''.join(f"{f'{mb:.1f} ({s:.2f}s)':>16}" for mb, s in cells))
+    finally:
+        if workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
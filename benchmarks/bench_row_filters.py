@@ -0,0 +1,77 @@
+"""
+Empty-row filters of the production and stockpile parsers: the row-wise
+apply(is_valid_row, axis=1) they used to run against the column masks
+(utils.parsers.production_valid_mask / stockpile_valid_mask).
+
+    python -m benchmarks.bench_row_filters --rows 100000
+    python -m benchmarks.bench_row_filters --rows 100000 --days 120
+
+Parity, before timing: the cases of tests/test_row_filters.py (legacy row
+functions == masks on edge-seeded frames, parsed workbooks identical) at
+--rows / --days.
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import utils.parsers as parsers
+from benchmarks.workbooks import write_monitoring, write_produksi
+from tests.test_row_filters import (
+    check_mask_parity, check_workbook_parity, legacy_production_mask, legacy_stockpile_mask,
+    make_production_frame, make_stockpile_frame,
+)
+
+
+# ============================================================
+# RUNNER
+# ============================================================
+
+def best_of(fn, df, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(df)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--days', type=int, default=60, help='Days in the synthetic workbooks (parity)')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    production = make_production_frame(args.rows)
+    stockpile = make_stockpile_frame(args.rows)
+    check_mask_parity(production, stockpile)
+    print(f"Parity: OK (legacy row functions == masks on {args.rows:,} edge-seeded rows)")
+
+    workdir = tempfile.mkdtemp(prefix='bench_filters_')
+    try:
+        files = {'produksi': os.path.join(workdir, 'produksi.xlsx'),
+                 'monitoring': os.path.join(workdir, 'monitoring.xlsx')}
+        write_produksi(files['produksi'], days=args.days)
+        write_monitoring(files['monitoring'], days=args.days)
+        counts = check_workbook_parity(files)
+        print(f"Parity: OK (parsed workbooks identical: {counts})")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    cases = [
+        ('production', legacy_production_mask, parsers.production_valid_mask, production),
+        ('stockpile', legacy_stockpile_mask, parsers.stockpile_valid_mask, stockpile),
+        ('stockpile final', lambda df: legacy_stockpile_mask(df, final=True),
+         lambda df: parsers.stockpile_valid_mask(df, final=True), stockpile),
+    ]
+    print(f"{'filter':<18}{'row apply':>11}{'masks':>10}{'speedup':>10}")
+    for name, legacy, vectorized, df in cases:
+        t_before = best_of(legacy, df, args.repeat)
+        t_after = best_of(vectorized, df, args.repeat)
+        print(f"{name:<18}{t_before:>10.3f}s{t_after:>9.3f}s{t_before / t_after:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
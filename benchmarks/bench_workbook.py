@@ -0,0 +1,183 @@
+"""
+Cost of opening Monitoring.xlsx once (utils.parsers.Workbook shared by the
+shipping, stockpile and target parsers) against one pd.ExcelFile per parser.
+
+    python -m benchmarks.bench_workbook --file path/to/Monitoring.xlsx
+    python -m benchmarks.bench_workbook --stockpile-rows 4000 --repeat 3
+
+Without --file a synthetic workbook with the same sheet layout is generated.
+'sheet reads' times the reads the parsers used to make (three ExcelFile
+opens, the stockpile sheet read three times) against the shared handle;
+'full parse' times the three parsers on separate handles against one.
+Before timing, every header-based frame the parsers take from the shared
+handle is checked against pd.read_excel(..., header=n) (parity).
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook as XlsxWorkbook
+
+from utils.parsers import (
+    Workbook, parse_shipping_data, parse_stockpile_hopper, parse_target_data, parse_monitoring_source
+)
+
+
+# ============================================================
+# SYNTHETIC MONITORING WORKBOOK
+# ============================================================
+
+def make_monitoring_workbook(path, stockpile_rows=4000, shipping_days=365, seed=0):
+    rng = np.random.default_rng(seed)
+    wb = XlsxWorkbook()
+
+    # Stockpile Hopper: a 2025 block, then the 2026 header further down
+    ws = wb.active
+    ws.title = 'Stockpile Hopper'
+    header = ['Date', 'Time', 'Shift', 'Dumping', 'Unit', 'Ritase']
+    ws.append(header)
+    old_rows = stockpile_rows * 4 // 5
+    for i in range(stockpile_rows):
+        if i == old_rows:
+            ws.append(header)
+        day = datetime(2025 if i < old_rows else 2026, 1, 1) + timedelta(days=i % 300)
+        hour = int(rng.integers(0, 24))
+        ws.append([day, f"{hour:02d}:00-{(hour + 1) % 24:02d}:00", f"Shift {1 + i % 3}",
+                   'PC 850-01', f"DT{i % 40}", int(rng.integers(0, 5))])
+
+    # TONASE Pengiriman: header on row 3, one 7-column block per year
+    ws = wb.create_sheet('TONASE Pengiriman ')
+    ws.append(['TONASE PENGIRIMAN'])
+    ws.append([None])
+    block = ['Tanggal', 'Shift', 'AP LS', 'AP LS MK3', 'AP SS', 'Total LS', 'Total SS']
+    ws.append(block + [None] + block)
+    for i in range(shipping_days * 3):
+        day = timedelta(days=i // 3)
+        values = [int(v) for v in rng.integers(0, 500, 5)]
+        ws.append([datetime(2025, 1, 1) + day, f"Shift {1 + i % 3}"] + values + [None] +
+                  [datetime(2026, 1, 1) + day, f"Shift {1 + i % 3}"] + values)
+
+    # Analisa Produksi: day rows x month columns
+    ws = wb.create_sheet('Analisa Produksi')
+    months = ['Januari', 'Februari', 'Maret', 'April', 'Mei', 'Juni',
+              'Juli', 'Agustus', 'September', 'Oktober', 'November', 'Desember']
+    ws.append(['Tanggal'] + [f"{m} {y}" for y in (2025, 2026) for m in months])
+    for day in range(1, 32):
+        ws.append([day] + [int(v) for v in rng.integers(1000, 5000, 24)])
+
+    wb.save(path)
+
+
+# ============================================================
+# PARITY
+# ============================================================
+
+def check_parity(data):
+    """Frames derived from the cached header=None read == pd.read_excel(header=n)"""
+    wb = Workbook(BytesIO(data))
+    sheets = {'Stockpile Hopper': [0], 'TONASE Pengiriman ': [2], 'Analisa Produksi': [0]}
+    raw = wb.raw('Stockpile Hopper')
+    second_header = raw.index[raw[0].astype(str).str.lower().eq('date')]
+    sheets['Stockpile Hopper'] += [int(i) for i in second_header[1:]]
+
+    for sheet, headers in sheets.items():
+        for header in headers:
+            expected = pd.read_excel(BytesIO(data), sheet_name=sheet, header=header)
+            pd.testing.assert_frame_equal(wb.frame(sheet, header), expected)
+    wb.close()
+
+    # Shared handle vs one handle per parser
+    shared = parse_monitoring_source(data)
+    separate = {
+        'Shipping': parse_shipping_data(BytesIO(data)),
+        'Stockpile': parse_stockpile_hopper(BytesIO(data)),
+        'Targets': parse_target_data(BytesIO(data)),
+    }
+    for key in separate:
+        pd.testing.assert_frame_equal(shared[key], separate[key])
+
+
+# ============================================================
+# RUNNER
+# ============================================================
+
+def legacy_reads(data):
+    """The ExcelFile opens / sheet reads the three parsers made before the shared handle"""
+    stockpile = pd.ExcelFile(BytesIO(data), engine='openpyxl')
+    pd.read_excel(stockpile, sheet_name='Stockpile Hopper', header=None)
+    raw = pd.read_excel(stockpile, sheet_name='Stockpile Hopper', header=None)
+    header_idx = int(raw.index[raw[0].astype(str).str.lower().eq('date')][-1])
+    pd.read_excel(stockpile, sheet_name='Stockpile Hopper', header=header_idx)
+
+    shipping = pd.ExcelFile(BytesIO(data), engine='openpyxl')
+    pd.read_excel(shipping, sheet_name='TONASE Pengiriman ', header=None)
+
+    target = pd.ExcelFile(BytesIO(data), engine='openpyxl')
+    pd.read_excel(target, sheet_name='Analisa Produksi', header=0)
+
+def shared_reads(data):
+    with Workbook(BytesIO(data)) as wb:
+        raw = wb.raw('Stockpile Hopper')
+        header_idx = int(raw.index[raw[0].astype(str).str.lower().eq('date')][-1])
+        wb.frame('Stockpile Hopper', header_idx)
+        wb.raw('TONASE Pengiriman ')
+        wb.frame('Analisa Produksi', 0)
+
+def separate_parse(data):
+    parse_shipping_data(BytesIO(data))
+    parse_stockpile_hopper(BytesIO(data))
+    parse_target_data(BytesIO(data))
+
+def best_of(fn, data, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(data)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--file', default=None, help='Monitoring workbook (default: synthetic)')
+    parser.add_argument('--stockpile-rows', type=int, default=4000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    path = args.file
+    tmp_path = None
+    if not path:
+        fd, tmp_path = tempfile.mkstemp(suffix='.xlsx')
+        os.close(fd)
+        make_monitoring_workbook(tmp_path, args.stockpile_rows)
+        path = tmp_path
+
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+        print(f"Workbook: {path} ({len(data) / 1024:.0f} KB)")
+
+        check_parity(data)
+        print("Parity: OK (derived frames == pd.read_excel, shared == separate handles)")
+
+        cases = [
+            ('sheet reads', legacy_reads, shared_reads),
+            ('full parse', separate_parse, parse_monitoring_source),
+        ]
+        print(f"{'stage':<14}{'per parser':>12}{'shared':>10}{'speedup':>10}")
+        for name, before, after in cases:
+            t_before = best_of(before, data, args.repeat)
+            t_after = best_of(after, data, args.repeat)
+            print(f"{name:<14}{t_before:>11.2f}s{t_after:>9.2f}s{t_before / t_after:>9.1f}x")
+    finally:
+        if tmp_path:
+            os.remove(tmp_path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+"""
+Local stand-in for the OneDrive share links: serves workbooks at
+http://127.0.0.1:<port>/<source key>?download=1 with the ETag /
+Last-Modified / 304 behaviour the conditional fetch relies on.
+
+    python -m benchmarks.fake_onedrive --dir /tmp/onedrive --scale 1 --port 8765
+
+then start the app (or the worker) with the printed ONEDRIVE_LINK_* variables.
+The ETag follows the file's mtime and size, so rewriting a workbook (or
+touching it) is seen as a new version.
+"""
+import argparse
+import os
+import threading
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from benchmarks.workbooks import FILE_NAMES, generate_workbooks
+
+CHUNK_SIZE = 64 * 1024
+XLSX_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server.owner
+        key = urlsplit(self.path).path.strip('/')
+        path = server.files.get(key)
+        if not path or not os.path.exists(path):
+            self.send_error(404)
+            return
+
+        stat = os.stat(path)
+        etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+        modified = int(stat.st_mtime)
+        if server.latency:
+            time.sleep(server.latency)
+
+        not_modified = False
+        if self.headers.get('If-None-Match'):
+            not_modified = self.headers['If-None-Match'] == etag
+        elif self.headers.get('If-Modified-Since'):
+            try:
+                not_modified = parsedate_to_datetime(self.headers['If-Modified-Since']).timestamp() >= modified
+            except (TypeError, ValueError):
+                pass
+
+        server.record(key, 304 if not_modified else 200, 0 if not_modified else stat.st_size)
+        if not_modified:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', XLSX_TYPE)
+        self.send_header('Content-Length', str(stat.st_size))
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', formatdate(modified, usegmt=True))
+        self.end_headers()
+        with open(path, 'rb') as f:
+            while chunk := f.read(CHUNK_SIZE):
+                self.wfile.write(chunk)
+                if server.bandwidth:
+                    time.sleep(len(chunk) / server.bandwidth)
+
+
+class FakeOneDrive:
+    """
+    files     : {source key: workbook path}
+    latency   : seconds added to every request (server think time)
+    bandwidth : bytes/second cap on response bodies (None = unthrottled)
+    """
+
+    def __init__(self, files, host='127.0.0.1', port=0, latency=0.0, bandwidth=None):
+        self.files = dict(files)
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.requests = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        self._server.owner = self
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def links(self):
+        """{source key: direct download URL} in ONEDRIVE_LINKS form"""
+        return {key: f"{self.base_url}/{key}?download=1" for key in self.files}
+
+    def record(self, key, status, size):
+        with self._lock:
+            self.requests.append((key, status, size))
+
+    def take_requests(self):
+        """Requests served since the last call: [(key, status, bytes)]"""
+        with self._lock:
+            served, self.requests = self.requests, []
+        return served
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name='fake-onedrive', daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        """Serve on the calling thread (CLI)"""
+        self._server.serve_forever()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dir', required=True, help='Directory with (or for) the workbooks')
+    parser.add_argument('--scale', type=float, default=None, help='Generate synthetic workbooks first')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0)
+    args = parser.parse_args()
+
+    if args.scale:
+        files = generate_workbooks(args.dir, args.scale)
+    else:
+        files = {key: os.path.join(args.dir, name) for key, name in FILE_NAMES.items()
+                 if os.path.exists(os.path.join(args.dir, name))}
+
+    server = FakeOneDrive(files, port=args.port, latency=args.latency)
+    for key, link in server.links().items():
+        print(f"ONEDRIVE_LINK_{key.upper()}={link}")
+    print(f"Serving {args.dir} on {server.base_url} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
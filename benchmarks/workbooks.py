@@ -0,0 +1,269 @@
+"""
+Synthetic OneDrive workbooks with the sheet layouts the parsers expect.
+
+    python -m benchmarks.workbooks --dir /tmp/onedrive --scale 10
+
+Volumes are per day of 2026 (1x ~ the current year's files) and multiplied
+by `scale`. Every day draws from its own seeded generator, so regenerating a
+file with one more day leaves the earlier rows byte-for-byte identical -
+an incremental sync then only sees the appended day.
+"""
+import argparse
+import os
+from datetime import datetime, time, timedelta
+
+import numpy as np
+from openpyxl import Workbook as XlsxWorkbook
+
+YEAR = 2026
+YEAR_DAYS = 365
+
+# Rows per day at 1x
+PRODUCTION_ROWS_PER_DAY = 120
+STOCKPILE_ROWS_PER_DAY = 40
+DOWNTIME_ROWS_PER_DAY = 8
+PLAN_ROWS_PER_DAY = 6
+
+# Stockpile Hopper keeps last year's block above the 2026 header (row ~3399)
+STOCKPILE_HISTORY_ROWS = 3398
+
+# Share of rows that are pre-filled but empty (date/shift only)
+FILLER_RATIO = 0.03
+
+# File name per ONEDRIVE_LINKS key
+FILE_NAMES = {
+    'produksi': 'Produksi_UTSG_Harian.xlsx',
+    'monitoring': 'Monitoring.xlsx',
+    'gangguan': 'Gangguan_Produksi.xlsx',
+    'daily_plan': 'DAILY_PLAN.xlsx',
+}
+
+MONTHS = ['Januari', 'Februari', 'Maret', 'April', 'Mei', 'Juni',
+          'Juli', 'Agustus', 'September', 'Oktober', 'November', 'Desember']
+HARI = ['Senin', 'Selasa', 'Rabu', 'Kamis', 'Jumat', 'Sabtu', 'Minggu']
+
+# Raw spellings as typed in the field (normalize_excavator_name folds them)
+EXCAVATORS = ['PC 850-01', 'PC850-01', 'PC 850 02', 'pc850-02', 'PC 1250-01', 'PC1250-01', 'PC 400-05']
+LOADERS = ['PC 850-01', 'PC 850-02', 'PC 1250-01', 'WA 600-01']
+FRONTS = ['Front B', 'Front C', 'PLB', 'Front Silika']
+BLOKS = ['B1', 'B2', 'B3', 'C1']
+COMMODITIES = ['Batu Kapur', 'Silika', 'Clay']
+DUMP_LOCS = ['Hopper', 'Stockpile 6', 'ROM 1', 'Stockpile Silika']
+CRUSHERS = ['LSC 1', 'LSC 2', 'MS 1', 'Batu Split']
+EQUIPMENT = ['Belt Conveyor', 'Apron Feeder', 'Hammer Crusher', 'Screen', 'Hopper']
+PROBLEMS = ['Mechanical', 'Electrical', 'Operational', 'External']
+DOWNTIME_HEADER = ['Tanggal', 'Bulan', 'Tahun', 'Week', 'Shift', 'Start', 'End', 'Durasi',
+                   'Alat', 'Remarks', 'Kelompok Masalah', 'Gangguan', 'Info CCR', 'Sub Komponen',
+                   'Keterangan', 'Penyebab', 'Identifikasi Masalah', 'Action', 'Plan', 'PIC',
+                   'Status', 'Due Date', 'Spare Part', 'Info Spare Part', 'Link/Lampiran', 'Extra']
+
+
+# ============================================================
+# HELPERS
+# ============================================================
+
+def _day_rng(seed, day_index, stream=0):
+    # stream separates the non-daily blocks (last year's history, targets)
+    return np.random.default_rng([seed, stream, day_index])
+
+def _rows_per_day(base, scale):
+    return max(1, int(round(base * scale)))
+
+def _hour_slots(rng, n):
+    hours = rng.integers(0, 24, n)
+    hours.sort()
+    shifts = np.where((hours >= 7) & (hours < 15), 1, np.where((hours >= 15) & (hours < 23), 2, 3))
+    slots = [f"{h:02d}:00-{(h + 1) % 24:02d}:00" for h in hours]
+    return hours, shifts, slots
+
+def _days(days):
+    start = datetime(YEAR, 1, 1)
+    return [(i, start + timedelta(days=i)) for i in range(min(days, YEAR_DAYS))]
+
+
+# ============================================================
+# PRODUKSI_UTSG_HARIAN (one sheet per month, header on row 3)
+# ============================================================
+
+def write_produksi(path, scale=1, days=YEAR_DAYS, seed=0):
+    wb = XlsxWorkbook(write_only=True)
+    per_day = _rows_per_day(PRODUCTION_ROWS_PER_DAY, scale)
+    header = ['Date', 'Time', 'Shift', 'BLOK', 'Front', 'Commudity', 'Excavator',
+              'Dump Truck', 'Dump Loc', 'Rit', 'Tonnase']
+    sheets = {}
+    for i, day in _days(days):
+        ws = sheets.get(day.month)
+        if ws is None:
+            ws = sheets[day.month] = wb.create_sheet(f"{MONTHS[day.month - 1]} {YEAR}")
+            ws.append(['PRODUKSI UTSG HARIAN'])
+            ws.append([f"{MONTHS[day.month - 1]} {YEAR}"])
+            ws.append(header)
+
+        rng = _day_rng(seed, i)
+        _, shifts, slots = _hour_slots(rng, per_day)
+        filler = rng.random(per_day) < FILLER_RATIO
+        cols = zip(
+            slots, shifts,
+            rng.choice(BLOKS, per_day), rng.choice(FRONTS, per_day), rng.choice(COMMODITIES, per_day),
+            rng.choice(EXCAVATORS, per_day), rng.integers(1, 60, per_day), rng.choice(DUMP_LOCS, per_day),
+            rng.integers(1, 4, per_day), rng.uniform(20, 40, per_day).round(2), filler,
+        )
+        for slot, shift, blok, front, commodity, excavator, truck, loc, rit, ton, empty in cols:
+            if empty:
+                ws.append([day, None, int(shift)] + [None] * 8)
+            else:
+                ws.append([day, slot, int(shift), blok, front, commodity, excavator,
+                           int(truck), loc, int(rit), float(ton)])
+    wb.save(path)
+
+
+# ============================================================
+# MONITORING (Stockpile Hopper, TONASE Pengiriman, Analisa Produksi)
+# ============================================================
+
+def write_monitoring(path, scale=1, days=YEAR_DAYS, seed=0):
+    wb = XlsxWorkbook(write_only=True)
+    header = ['Date', 'Time', 'Shift', 'Dumping', 'Unit', 'Ritase']
+
+    # Stockpile Hopper: last year's block, then the 2026 header further down
+    ws = wb.create_sheet('Stockpile Hopper')
+    ws.append(header)
+    rng = _day_rng(seed, 0, stream=1)
+    for i in range(STOCKPILE_HISTORY_ROWS):
+        hour = int(rng.integers(0, 24))
+        ws.append([datetime(YEAR - 1, 1, 1) + timedelta(days=i * YEAR_DAYS // STOCKPILE_HISTORY_ROWS),
+                   f"{hour:02d}:00-{(hour + 1) % 24:02d}:00", f"Shift {1 + i % 3}",
+                   str(rng.choice(LOADERS)), f"DT{int(rng.integers(1, 60))}", int(rng.integers(1, 5))])
+    ws.append(header)
+    per_day = _rows_per_day(STOCKPILE_ROWS_PER_DAY, scale)
+    for i, day in _days(days):
+        rng = _day_rng(seed, i)
+        _, shifts, slots = _hour_slots(rng, per_day)
+        filler = rng.random(per_day) < FILLER_RATIO
+        cols = zip(slots, shifts, rng.choice(LOADERS, per_day), rng.integers(1, 60, per_day),
+                   rng.integers(0, 5, per_day), filler)
+        for slot, shift, loader, unit, rit, empty in cols:
+            if empty:
+                ws.append([day, None, f"Shift {shift}", None, None, None])
+            else:
+                ws.append([day, slot, f"Shift {shift}", loader, f"DT{unit}", int(rit)])
+
+    # TONASE Pengiriman: header on row 3, one 7-column block per year.
+    # Rows for the rest of the year are pre-filled with zeros.
+    ws = wb.create_sheet('TONASE Pengiriman ')
+    ws.append(['TONASE PENGIRIMAN'])
+    ws.append([None])
+    block = ['Tanggal', 'Shift', 'AP LS', 'AP LS MK3', 'AP SS', 'Total LS', 'Total SS']
+    ws.append(block + [None] + block)
+    for i in range(YEAR_DAYS):
+        rng = _day_rng(seed, i)
+        for shift in (1, 2, 3):
+            last_year = [int(v) for v in rng.integers(0, 500, 5)]
+            this_year = [int(v) for v in rng.integers(0, 500, 5)] if i < days else [0] * 5
+            ws.append([datetime(YEAR - 1, 1, 1) + timedelta(days=i), f"Shift {shift}"] + last_year + [None] +
+                      [datetime(YEAR, 1, 1) + timedelta(days=i), f"Shift {shift}"] + this_year)
+
+    # Analisa Produksi: day rows x month columns
+    ws = wb.create_sheet('Analisa Produksi')
+    ws.append(['Tanggal'] + [f"{m} {y}" for y in (YEAR - 1, YEAR) for m in MONTHS])
+    rng = _day_rng(seed, 0, stream=2)
+    for day in range(1, 32):
+        ws.append([day] + [int(v) for v in rng.integers(1000, 5000, 24)])
+
+    wb.save(path)
+
+
+# ============================================================
+# GANGGUAN_PRODUKSI ('All' sheet, 2026 rows shifted one column right)
+# ============================================================
+
+def _downtime_row(rng, day, shifted):
+    start = time(int(rng.integers(0, 24)), int(rng.choice([0, 15, 30, 45])))
+    minutes = int(rng.integers(10, 240))
+    end_total = start.hour * 60 + start.minute + minutes
+    end = time((end_total // 60) % 24, end_total % 60)
+    text = [str(rng.choice(EQUIPMENT)), 'Remarks', str(rng.choice(PROBLEMS)), 'Belt slip', 'Info CCR',
+            'Sub komponen', 'Keterangan', 'Penyebab', 'Identifikasi', 'Action', 'Plan', 'PIC',
+            str(rng.choice(['Open', 'Close'])), None, None, None, None]
+    lead = [day, day.month, day.year, int(day.strftime('%V')), int(rng.integers(1, 4)),
+            start, end, round(minutes / 60, 2)]
+    if shifted:
+        # 2026 layout: the crusher was inserted before 'Alat'
+        return lead + [str(rng.choice(CRUSHERS))] + text
+    return lead + text + [None]
+
+def write_gangguan(path, scale=1, days=YEAR_DAYS, seed=0):
+    wb = XlsxWorkbook(write_only=True)
+    ws = wb.create_sheet('All')
+    ws.append(DOWNTIME_HEADER)
+    per_day = _rows_per_day(DOWNTIME_ROWS_PER_DAY, scale)
+    history = [(i, datetime(YEAR - 1, 12, 1) + timedelta(days=i)) for i in range(31)]
+    for i, day in history:
+        rng = _day_rng(seed, i, stream=3)
+        for _ in range(per_day):
+            ws.append(_downtime_row(rng, day, shifted=False))
+    for i, day in _days(days):
+        rng = _day_rng(seed, i)
+        for _ in range(per_day):
+            ws.append(_downtime_row(rng, day, shifted=True))
+    wb.save(path)
+
+
+# ============================================================
+# DAILY_PLAN ('Scheduling', header on row 3)
+# ============================================================
+
+def write_daily_plan(path, scale=1, days=YEAR_DAYS, seed=0):
+    wb = XlsxWorkbook(write_only=True)
+    ws = wb.create_sheet('Scheduling')
+    ws.append(['DAILY PLAN PRODUKSI'])
+    ws.append([None])
+    ws.append(['No', 'Hari', 'Tanggal', 'Shift', 'Batu Kapur', 'Silika', 'Clay', 'Alat Muat',
+               'Alat Angkut', 'Blok', 'Grid', 'ROM', 'Keterangan'])
+    per_day = _rows_per_day(PLAN_ROWS_PER_DAY, scale)
+    no = 0
+    for i, day in _days(days):
+        rng = _day_rng(seed, i)
+        for j in range(per_day):
+            no += 1
+            ws.append([no, HARI[day.weekday()], day, str(1 + j % 3), int(rng.integers(0, 3000)),
+                       int(rng.integers(0, 800)), None, str(rng.choice(LOADERS)), 'HD 785',
+                       str(rng.choice(BLOKS)), f"G{int(rng.integers(1, 20))}", 'ROM 1', None])
+    wb.save(path)
+
+
+# ============================================================
+# ALL SOURCES
+# ============================================================
+
+WRITERS = {
+    'produksi': write_produksi,
+    'monitoring': write_monitoring,
+    'gangguan': write_gangguan,
+    'daily_plan': write_daily_plan,
+}
+
+def generate_workbooks(directory, scale=1, days=YEAR_DAYS, seed=0, keys=None):
+    """Write every source workbook into `directory`. Returns {source key: path}"""
+    os.makedirs(directory, exist_ok=True)
+    paths = {}
+    for key in keys or WRITERS:
+        paths[key] = os.path.join(directory, FILE_NAMES[key])
+        WRITERS[key](paths[key], scale=scale, days=days, seed=seed)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dir', required=True)
+    parser.add_argument('--scale', type=float, default=1)
+    parser.add_argument('--days', type=int, default=YEAR_DAYS)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    for key, path in generate_workbooks(args.dir, args.scale, args.days, args.seed).items():
+        print(f"{key:<12}{path} ({os.path.getsize(path) / 1024:,.0f} KB)")
+
+
+if __name__ == '__main__':
+    main()
@@ -8,9 +8,89 @@ from config import CACHE_TTL
 from utils.helpers import get_logo_base64
 from .login import logout
 
+# Per-session copies of synced data, dropped when a newer sync lands
+SESSION_DATA_KEYS = [
+    'df_prod', 'df_gangguan', 'df_shipping', 'df_stockpile',
+    'df_ritase', 'df_daily_plan', 'df_target',
+    'last_sync_time', 'data_loaded'
+]
+
+
+@st.cache_resource
+def _cleared_for_sync():
+    """Process-wide: the sync stamp the data caches were last cleared for"""
+    return {'stamp': None}
+
+
+def refresh_after_sync():
+    """
+    Clear cached data once per completed sync, whichever process ran it
+    (background worker or inline fallback), using system_logs.last_sync_at.
+    """
+    try:
+        from utils.db_manager import get_db_engine
+        from utils.queries import LAST_SYNC_AT
+        engine = get_db_engine()
+        if not engine:
+            return
+        with engine.connect() as conn:
+            row = conn.execute(LAST_SYNC_AT).fetchone()
+    except Exception:
+        return
+    stamp = row[0] if row else None
+    if not stamp:
+        return
+    
+    # Shared caches: once per process (first sight of a stamp just records it)
+    cleared = _cleared_for_sync()
+    if cleared['stamp'] != stamp:
+        if cleared['stamp'] is not None:
+            st.cache_data.clear()
+        cleared['stamp'] = stamp
+    
+    # Session copies: once per session
+    if st.session_state.get('sync_stamp') != stamp:
+        if 'sync_stamp' in st.session_state:
+            for key in SESSION_DATA_KEYS:
+                st.session_state.pop(key, None)
+        st.session_state['sync_stamp'] = stamp
+
+
+SYNC_HISTORY_RUNS = 5
+OUTCOME_ICONS = {'success': '✅', 'unchanged': '⏭️', 'empty': '⚠️', 'failed': '❌'}
+
+
+def render_sync_history(runs=SYNC_HISTORY_RUNS):
+    """Compact per-source stage timings of the last sync runs (sync_runs ledger)"""
+    from utils.data_loader import load_sync_history
+    df = load_sync_history(runs)
+    if df.empty:
+        return
+    
+    import pytz
+    started = df['started_at'].dt.tz_localize('UTC').dt.tz_convert(pytz.timezone('Asia/Jakarta'))
+    table = {
+        'Waktu': started.dt.strftime('%d/%m %H:%M'),
+        'Sumber': df['source'],
+        '': df['outcome'].map(OUTCOME_ICONS).fillna('?'),
+        'MB': (df['download_bytes'] / 1048576).round(1),
+        'DL s': (df['download_ms'] / 1000).round(1),
+        'Parse s': (df['parse_ms'] / 1000).round(1),
+        'Write s': (df['write_ms'] / 1000).round(1),
+        'Rows': df['rows_kept'].astype(str) + '/' + df['rows_parsed'].astype(str),
+        # Rows read but never returned: dated before the window / filtered by the parsers
+        'Drop s/p': df['stream_dropped'].astype(str) + '/' + df['parser_dropped'].astype(str),
+    }
+    with st.expander("🕑 Riwayat Sync", expanded=False):
+        st.dataframe(table, hide_index=True, use_container_width=True)
+        errors = df.loc[df['error'].notna(), ['source', 'error']].drop_duplicates()
+        for _, row in errors.head(3).iterrows():
+            st.caption(f"❌ {row['source']}: {row['error']}")
+
 
 def render_sidebar():
     """Render sidebar navigation"""
+    refresh_after_sync()
     logo_base64 = get_logo_base64()
     
     with st.sidebar:
@@ -56,34 +136,43 @@ def render_sidebar():
         ''', unsafe_allow_html=True)
             
         # Unified Sync Button (Professional Single-Click Action)
-        if st.button("🔄 Sync & Refresh Data", use_container_width=True, type="primary", help="Ambil data terbaru dari OneDrive dan perbarui tampilan"):
+        # With a background worker running (python -m utils.sync_manager --watch)
+        # the button only requests a sync; otherwise it syncs inline.
+        # Caches are cleared by refresh_after_sync once the new data lands.
+        sync_clicked = st.button("🔄 Sync & Refresh Data", use_container_width=True, type="primary", help="Ambil data terbaru dari OneDrive dan perbarui tampilan")
+        worker_running = False
+        if sync_clicked:
+            try:
+                from utils.sync_manager import worker_is_alive, request_sync
+                if worker_is_alive():
+                    worker_running = request_sync(st.session_state.get('name') or "dashboard")
+            except Exception as e:
+                print(f"Sync request failed, syncing inline: {e}")
+        
+        if worker_running:
+            st.toast("Permintaan sinkronisasi dikirim. Data diperbarui otomatis setelah selesai.", icon="🔄")
+        elif sync_clicked:
             with st.status("🔄 Sinkronisasi Data OneDrive...", expanded=True) as status:
                 st.write("Menghubungkan ke Database...")
                 
-                # 1. Clear ALL caches BEFORE sync
-                st.cache_data.clear()
-                st.cache_resource.clear()
-                
-                # 2. Clear ALL session state data
-                keys_to_clear = [
-                    'df_prod', 'df_gangguan', 'df_shipping', 'df_stockpile', 
-                    'df_ritase', 'df_daily_plan', 'df_target',
-                    'last_sync_time', 'data_loaded'
-                ]
-                for key in keys_to_clear:
-                    if key in st.session_state:
-                        del st.session_state[key]
-                
                 try:
                     from utils.sync_manager import sync_all_data
                     st.write("📥 Mengunduh & Memperbarui Data...")
                     
-                    report = sync_all_data()
+                    # Live download progress per workbook
+                    progress_line = st.empty()
+                    downloaded = {}
+                    def show_progress(label, done, total):
+                        size = f"{done/1048576:.1f}/{total/1048576:.1f} MB" if total else f"{done/1048576:.1f} MB"
+                        downloaded[label] = size
+                        progress_line.caption(" · ".join(f"{k} {v}" for k, v in downloaded.items()))
+                    
+                    report = sync_all_data(progress=show_progress)
                     
                     for module, result in report.items():
                         st.write(f"{module}: {result}")
                     
-                    # 3. Mark sync as complete with timestamp
+                    # Mark sync as complete with timestamp
                     import pytz
                     from datetime import datetime
                     jakarta_tz = pytz.timezone('Asia/Jakarta')
@@ -93,7 +182,7 @@ def render_sidebar():
                     status.update(label="✅ Sinkronisasi Selesai!", state="complete", expanded=False)
                     st.toast("Data Berhasil Diperbarui!", icon="✅")
                     
-                    # 4. Force immediate rerun without delay
+                    # Force immediate rerun (refresh_after_sync picks up the new stamp)
                     st.rerun()
                     
                 except Exception as e:
@@ -148,6 +237,8 @@ def render_sidebar():
         else:
             st.markdown(f'<p style="color:#64748b; font-size:0.75rem; text-align:center; margin-top:0.5rem; font-style:italic;">Belum disinkronisasi hari ini</p>', unsafe_allow_html=True)
         
+        render_sync_history()
+        
         st.markdown("---")
         
         # ============================================================
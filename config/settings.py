@@ -48,6 +48,12 @@ try:
 except:
     pass
 
+# Environment overrides (e.g. ONEDRIVE_LINK_PRODUKSI=http://127.0.0.1:8765/produksi?download=1)
+for key in ONEDRIVE_LINKS.keys():
+    env_link = os.getenv(f"ONEDRIVE_LINK_{key.upper()}")
+    if env_link:
+        ONEDRIVE_LINKS[key] = env_link
+
 CACHE_TTL = 3600  # 1 hour (was 300 seconds / 5 minutes)
 
 def get_monitoring_path():
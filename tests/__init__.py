@@ -0,0 +1,7 @@
+# ============================================================
+# TESTS - Parity of the sync pipeline rewrites with the code they replaced
+# ============================================================
+# Run from the project root:
+#   python -m pytest -q
+# The parity cases live here; the benchmarks (benchmarks/) import them and
+# re-check them at their own scale before timing.
@@ -0,0 +1,97 @@
+"""
+2026 downtime column repair (utils.parsers.repair_shifted_columns) against
+the pair-by-pair df.loc assignments parse_downtime_data and
+load_gangguan_all used to make, on:
+  - the 'All' sheet of the synthetic Gangguan workbook (benchmarks.workbooks)
+  - a synthetic frame mixing all-empty float, datetime, str, int and text
+    columns, with and without some of the shifted columns
+
+benchmarks/bench_column_repair.py runs the same checks at scale before timing.
+"""
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from utils.parsers import (
+    DOWNTIME_SHIFTED_COLUMNS, Workbook, repair_shifted_columns, safe_parse_date_column, shifted_downtime_rows
+)
+from benchmarks.workbooks import write_gangguan
+
+
+def legacy_repair(df, mask):
+    """The sequential assignments, as parse_downtime_data made them"""
+    if mask.any():
+        shift_map = list(zip(DOWNTIME_SHIFTED_COLUMNS, DOWNTIME_SHIFTED_COLUMNS[1:]))
+        for new_col, old_col in shift_map:
+            if old_col in df.columns:
+                if new_col not in df.columns: df[new_col] = None
+                df[new_col] = df[new_col].astype(object)
+                df.loc[mask, new_col] = df.loc[mask, old_col]
+    return df
+
+
+def make_frame(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    frame = {
+        'Tanggal': pd.Timestamp('2026-01-01') + pd.to_timedelta(rng.integers(0, 365, rows), unit='D'),
+        'Durasi': rng.random(rows).round(2),
+        'Tahun': rng.choice([2025, 2026], rows),
+        'Alat': rng.choice(['LSC 1', 'MS 2', 'Batu Kapur', 'BC-01', None], rows),
+    }
+    # Mostly text, as in the sheet, plus the dtypes read_excel can give a column
+    kinds = {'Due Date': 'datetime', 'Spare Part': 'empty', 'Info Spare Part': 'empty',
+             'Link/Lampiran': 'empty', 'PIC': 'int', 'Status': 'mixed'}
+    for col in DOWNTIME_SHIFTED_COLUMNS[2:]:
+        kind = kinds.get(col, 'str')
+        if kind == 'empty':
+            frame[col] = np.full(rows, np.nan)  # all-empty column read as float64
+        elif kind == 'datetime':
+            frame[col] = pd.Timestamp('2026-01-01') + pd.to_timedelta(rng.integers(0, 60, rows), unit='D')
+        elif kind == 'int':
+            frame[col] = rng.integers(0, 9, rows)
+        elif kind == 'mixed':
+            frame[col] = rng.choice(np.array(['Open', None, 3, 2.5], dtype=object), rows)
+        else:
+            frame[col] = pd.Series(rng.choice(np.array([f"{col} {i}" for i in range(20)] + [None], dtype=object), rows), dtype='str')
+    return pd.DataFrame(frame)
+
+
+def gangguan_frame(days):
+    workdir = tempfile.mkdtemp(prefix='bench_repair_')
+    try:
+        path = os.path.join(workdir, 'gangguan.xlsx')
+        write_gangguan(path, days=days)
+        with Workbook(path) as wb:
+            df = wb.frame('All')
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    df.columns = [str(c).strip() for c in df.columns]
+    df['Tanggal'] = safe_parse_date_column(df['Tanggal'])
+    return df.dropna(subset=['Tanggal'])
+
+
+def check_parity(cases):
+    for name, df in cases.items():
+        mask = shifted_downtime_rows(df)
+        expected = legacy_repair(df.copy(), mask)
+        got = repair_shifted_columns(df.copy(), mask)
+        pd.testing.assert_frame_equal(got, expected, obj=name)
+
+
+def parity_cases(rows, days):
+    """{name: frame} of every case, `rows` synthetic rows, `days` workbook days"""
+    synthetic = make_frame(rows)
+    return {
+        'gangguan workbook': gangguan_frame(days),
+        'synthetic': synthetic,
+        'no Remarks / Crusher': synthetic.drop(columns=['Remarks']),
+        'no Link/Lampiran': synthetic.drop(columns=['Link/Lampiran', 'Plan']),
+        'no shifted rows': synthetic.assign(Alat='BC-01', Tahun=2025),
+    }
+
+
+def test_block_copy_matches_pairwise_loc():
+    check_parity(parity_cases(rows=5_000, days=30))
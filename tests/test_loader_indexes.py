@@ -0,0 +1,200 @@
+"""
+Query plans of the dashboard loaders (utils.data_loader): every SQL statement
+they issue must reach its table through an index.
+
+The loaders run uncached against a throwaway database migrated with
+utils.db_manager.upgrade_schema and seeded with a few rows per table (so they
+take the database path). Their statements are captured and explained:
+  sqlite      EXPLAIN QUERY PLAN; a bare 'SCAN <table>' is a full table scan
+  postgresql  EXPLAIN (FORMAT JSON) with enable_seqscan off; a 'Seq Scan'
+              node means no index can serve the query
+Small seeded tables would make PostgreSQL prefer sequential scans, hence the
+setting: the check is that an index path exists, not which plan wins at a
+given volume. A loader that raises or returns no rows fails the check too:
+the loaders catch their own errors, so an empty frame is how a broken
+query shows.
+
+The test runs on SQLite; benchmarks/explain_loaders.py prints the plans and
+runs the check on any database (--db).
+"""
+import json
+import re
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+
+# Full-table reads by design (no predicate an index could serve)
+WHOLE_TABLE = re.compile(r'^SELECT .* FROM daily_plan_logs$', re.IGNORECASE)
+# loader -> kwargs; every loader of utils.data_loader that reads the database,
+# with arguments that select some of the seeded rows
+LOADERS = [
+    ('load_produksi', {}),
+    ('load_produksi', {'start_date': '2026-01-05'}),
+    ('load_gangguan_all', {}),
+    ('load_gangguan_all', {'start_date': '2026-01-05'}),
+    ('load_stockpile_hopper', {}),
+    ('load_shipping_data', {}),
+    ('load_daily_plan', {}),
+    ('load_daily_plan_data', {}),
+    ('load_analisa_produksi_all', {}),
+    ('load_sync_history', {}),
+    ('get_filter_options', {}),
+    ('get_production_kpi_summary', {}),
+    ('get_production_kpi_summary', {'start_date': '2026-01-02', 'end_date': '2026-01-08'}),
+    ('load_production_rollup', {'by': ('date',)}),
+    ('load_production_rollup', {'by': ('excavator',), 'filters': {'date_range': ['2026-01-01', '2026-01-31']}}),
+    ('load_production_rollup', {'by': ('front',), 'filters': {'shift': 'Shift 1', 'front': ['F1']}}),
+    ('load_production_rollup', {'by': ('dump_loc',), 'filters': {'date_range': ['2026-01-01', '2026-01-31']}}),
+    ('load_production_rollup', {'by': ('dump_truck',), 'filters': {'shift': 'Shift 1'}, 'active': True}),
+    ('load_production_rollup', {'by': ('blok',), 'filters': {'date_range': ['2026-01-01', '2026-01-31']},
+                                'active': True}),
+    ('load_production_rollup', {'by': ('dump_loc',), 'active': True,
+                                'filters': {'date_range': ['2026-01-01', '2026-01-31'], 'front': ['F1']}}),
+]
+
+
+def seed(engine, days=10):
+    import pandas as pd
+    from sqlalchemy.orm import Session
+    from utils.bulk_writer import write_frame
+    from utils.dimensions import assign_dimension_keys
+    from utils.rollups import refresh_rollups
+    from utils.models import (
+        DailyPlanLog, DowntimeLog, ProductionLog, ShippingLog, StockpileLog, SyncRun, TargetLog
+    )
+    rows, production = [], []
+    for i in range(days):
+        day = date(2026, 1, 1) + timedelta(days=i)
+        production.append(dict(date=day, time='07:00-08:00', shift=1, front='F1', excavator='PC 850-01',
+                               commodity='LS', dump_truck='DT001', dump_loc='Hopper', blok='A', rit=1,
+                               tonnase=25.0))
+        rows += [
+            DowntimeLog(tanggal=day, shift='Shift 1', start='07:00', end='08:00', durasi=1.0, alat='LSC 1'),
+            StockpileLog(date=day, time='07:00-08:00', shift=1, unit='DT001', ritase=1.0),
+            ShippingLog(tanggal=day, shift=1, total_ls=10.0, total_ss=5.0),
+            DailyPlanLog(tanggal=day, shift='1', batu_kapur=100.0),
+            TargetLog(date=day, plan=1000.0),
+            SyncRun(run_id=f"run{i}", started_at=datetime(2026, 1, 1) + timedelta(days=i), source='produksi'),
+        ]
+    with Session(engine) as session:
+        session.add_all(rows)
+        session.commit()
+    # Production rows as a sync writes them: names as dimension keys, rollups refreshed
+    with engine.begin() as conn:
+        frame = assign_dimension_keys(conn, ProductionLog.__tablename__, pd.DataFrame(production))
+        write_frame(conn, ProductionLog.__table__, frame)
+        refresh_rollups(conn, ProductionLog.__tablename__)
+
+
+def capture(engine):
+    """
+    Run every loader uncached. Returns ({sql: [loader, ...]} in first-seen
+    order, problems): a loader that raises, or returns an empty frame (the
+    loaders catch their own errors and return one), is a problem
+    """
+    from sqlalchemy import event
+    import utils.data_loader as data_loader
+
+    statements, problems = {}, []
+    current = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.setdefault((statement, _frozen(parameters)), []).append(current[0])
+
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        for name, kwargs in LOADERS:
+            current[:] = [name + (f"({kwargs})" if kwargs else '')]
+            loader = getattr(data_loader, name)
+            try:
+                result = getattr(loader, '__wrapped__', loader)(**kwargs)
+            except Exception as e:
+                problems.append(f"{current[0]} raised {e!r}")
+                continue
+            if isinstance(result, pd.DataFrame) and result.empty:
+                problems.append(f"{current[0]} returned no rows")
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+    return statements, problems
+
+
+def _frozen(parameters):
+    if isinstance(parameters, dict):
+        return tuple(sorted(parameters.items()))
+    return tuple(parameters or ())
+
+
+def _unfrozen(parameters, paramstyle):
+    return dict(parameters) if paramstyle in ('named', 'pyformat') else tuple(v for v in parameters)
+
+
+def sqlite_scans(conn, statement, parameters):
+    plan = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+    details = [row[-1] for row in plan]
+    scans = [d for d in details if re.match(r'SCAN \w+$', d)]
+    return scans, details
+
+
+def postgres_scans(conn, statement, parameters):
+    conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+    plan = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    nodes, scans, stack = [], [], [plan[0]['Plan']]
+    while stack:
+        node = stack.pop()
+        label = node['Node Type'] + (f" on {node['Relation Name']}" if 'Relation Name' in node else '')
+        if 'Index Name' in node:
+            label += f" using {node['Index Name']}"
+        nodes.append(label)
+        if node['Node Type'] == 'Seq Scan':
+            scans.append(label)
+        stack.extend(node.get('Plans', []))
+    return scans, nodes
+
+
+def explain_statements(engine):
+    """
+    Run the loaders against `engine`. Returns ([(sql, loaders, status, scans,
+    plan) of every SELECT they sent], problems of capture()); status is OK,
+    SCAN (no index path) or WHOLE (WHOLE_TABLE)
+    """
+    explain = postgres_scans if engine.dialect.name == 'postgresql' else sqlite_scans
+    paramstyle = engine.dialect.paramstyle
+    statements, problems = capture(engine)
+    results = []
+    for (statement, parameters), loaders in statements.items():
+        sql = ' '.join(statement.split())
+        if not sql.upper().startswith('SELECT'):
+            continue  # e.g. the PRAGMA table_info probes of pd.read_sql
+        if WHOLE_TABLE.match(sql):
+            results.append((sql, loaders, 'WHOLE', [], []))
+            continue
+        with engine.begin() as conn:
+            scans, plan = explain(conn, statement, _unfrozen(parameters, paramstyle))
+        results.append((sql, loaders, 'SCAN' if scans else 'OK', scans, plan))
+    return results, problems
+
+
+# ============================================================
+# TESTS
+# ============================================================
+
+def test_loader_queries_use_an_index(tmp_path, monkeypatch):
+    from sqlalchemy import create_engine
+    import utils.data_loader as data_loader
+    from utils.db_manager import upgrade_schema
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'explain.db'}")
+    monkeypatch.setattr(data_loader, 'get_db_engine', lambda: engine)
+    try:
+        upgrade_schema(engine)
+        seed(engine)
+        statements, problems = explain_statements(engine)
+    finally:
+        engine.dispose()
+    assert not problems, '\n'.join(problems)
+    assert statements
+    scans = [f"{sql} ({', '.join(scans)})" for sql, _, status, scans, _ in statements if status == 'SCAN']
+    assert not scans, '\n'.join(scans)
@@ -0,0 +1,108 @@
+"""
+Excel reader backends (utils.parsers.EXCEL_READERS): every installed engine
+against openpyxl on the four synced workbook layouts (benchmarks.workbooks).
+
+  raw        pd.read_excel(header=None) of every sheet
+  rows       Workbook.rows() of every sheet (the streaming path), up to
+             trailing empty cells
+  parse      every frame and header hint of the source parse job, with and
+             without a min_date bound
+  hints      the header hints of a parse job, passed back: same frames
+             for the same layout, ignored for another
+
+benchmarks/bench_readers.py runs the same checks at scale before timing.
+"""
+from datetime import date
+from io import BytesIO
+from itertools import zip_longest
+
+import pandas as pd
+import pytest
+
+import utils.parsers as parsers
+from benchmarks.workbooks import FILE_NAMES, YEAR, generate_workbooks
+
+JOBS = {
+    'produksi': parsers.parse_produksi_source,
+    'monitoring': parsers.parse_monitoring_source,
+    'gangguan': parsers.parse_gangguan_source,
+    'daily_plan': parsers.parse_daily_plan_source,
+}
+BASELINE = 'openpyxl'
+
+
+def run_job(key, data, engine, min_date=None):
+    parsers.EXCEL_READER = engine
+    try:
+        return JOBS[key](data, None, min_date)
+    finally:
+        parsers.EXCEL_READER = None
+
+
+def _same_cell(a, b):
+    return a == b or (a != a and b != b)
+
+
+def check_parity(key, data, engine):
+    with parsers.Workbook(BytesIO(data), engine=BASELINE) as base, \
+         parsers.Workbook(BytesIO(data), engine=engine) as other:
+        assert other.engine == engine, f"{engine} could not open {key}"
+        assert base.sheet_names == other.sheet_names
+        for sheet in base.sheet_names:
+            for row, (a, b) in enumerate(zip_longest(base.rows(sheet), other.rows(sheet))):
+                assert a is not None and b is not None, f"{key}/{sheet}: row counts differ at {row}"
+                a, b = parsers._trimmed(a), parsers._trimmed(b)  # read-only openpyxl rows are ragged
+                assert len(a) == len(b) and all(map(_same_cell, a, b)), f"{key}/{sheet} row {row}: {a} != {b}"
+            pd.testing.assert_frame_equal(base.raw(sheet), other.raw(sheet))
+
+    for min_date in (None, date(YEAR, 3, 1)):
+        expected, got = run_job(key, data, BASELINE, min_date), run_job(key, data, engine, min_date)
+        assert expected.keys() == got.keys()
+        for name, frame in expected.items():
+            if isinstance(frame, pd.DataFrame):
+                pd.testing.assert_frame_equal(got[name], frame)
+            else:
+                assert got[name] == frame, f"{key}/{name}: {got[name]} != {frame}"
+
+
+# ============================================================
+# TESTS
+# ============================================================
+
+@pytest.fixture(scope='module')
+def payloads(tmp_path_factory):
+    files = generate_workbooks(str(tmp_path_factory.mktemp('workbooks')), days=30)
+    contents = {}
+    for key, path in files.items():
+        with open(path, 'rb') as f:
+            contents[key] = f.read()
+    return contents
+
+
+@pytest.mark.parametrize('engine', parsers.available_readers(BASELINE)[1:] or [None])
+@pytest.mark.parametrize('key', list(FILE_NAMES))
+def test_reader_matches_openpyxl(payloads, key, engine):
+    if engine is None:
+        pytest.skip(f"only {BASELINE} installed; pip install python-calamine")
+    check_parity(key, payloads[key], engine)
+
+
+# The jobs whose sheets are found by their header words (locate_header / SheetStream)
+@pytest.mark.parametrize('key', ['produksi', 'monitoring'])
+def test_header_hints_follow_layout(payloads, key):
+    data = payloads[key]
+    first = JOBS[key](data, None, None)
+    hints = first.pop(parsers.HEADER_HINTS_KEY)
+    assert hints
+
+    again = JOBS[key](data, hints, None)
+    assert again.pop(parsers.HEADER_HINTS_KEY) == hints
+    for name, frame in first.items():
+        if isinstance(frame, pd.DataFrame):
+            pd.testing.assert_frame_equal(again[name], frame)
+
+    with parsers.Workbook(BytesIO(data), hints) as wb:
+        assert wb.header_hints == {sheet: row for sheet, (_, row) in hints.items()}
+    moved = {sheet: ('another layout', row) for sheet, (_, row) in hints.items()}
+    with parsers.Workbook(BytesIO(data), moved) as wb:
+        assert wb.header_hints == {}
@@ -0,0 +1,189 @@
+"""
+Empty-row filters of the production and stockpile parsers: the column masks
+(utils.parsers.production_valid_mask / stockpile_valid_mask) against the
+row-wise apply(is_valid_row, axis=1) they replaced.
+
+  masks      legacy row function == column mask on frames seeded with every
+             edge value seen in the sheets (None, NaN, '', ' - ', 'nan',
+             'None', 'Unknown', 0, '0', '0.0', numbers as text, times, bools)
+  workbooks  parse_production_data / parse_stockpile_hopper on the synthetic
+             workbooks (benchmarks.workbooks) with the legacy filters swapped
+             in == with the masks
+
+benchmarks/bench_row_filters.py runs the same checks at scale before timing.
+"""
+from datetime import time as dtime
+
+import numpy as np
+import pandas as pd
+
+import utils.parsers as parsers
+from benchmarks.workbooks import write_monitoring, write_produksi
+
+
+# ============================================================
+# LEGACY ROW FUNCTIONS (as they were in the parsers)
+# ============================================================
+
+def legacy_is_valid_row(row):
+    criticals = [
+        row['Time'], row['Excavator'], row['Dump Truck'],
+        row['Front'], row['Commodity'], row['Dump Loc'], row['BLOK'],
+        row.get('Rit', 0), row.get('Tonnase', 0)
+    ]
+    for val in criticals:
+        s = str(val).strip()
+        if pd.notna(val) and s != '' and s != '-' and s != 'nan' and s != 'None':
+            try:
+                if float(val) == 0: continue
+            except: pass
+            return True
+    return False
+
+def legacy_is_valid_stockpile_row(row):
+    rit = row['Ritase'] if 'Ritase' in row else 0
+    try:
+        if float(rit) > 0: return True
+    except: pass
+    criticals = [row.get('Loader', ''), row.get('Unit', ''), row.get('Jam', '')]
+    for val in criticals:
+        s = str(val).strip().lower()
+        if pd.notna(val) and s != '' and s != '-' and s != 'nan' and s != 'unknown' and s != 'none':
+            return True
+    return False
+
+def legacy_is_valid_stockpile_final(row):
+    rit = row['Ritase'] if 'Ritase' in row else 0
+    try:
+        if float(rit) > 0: return True
+    except: pass
+    criticals = [row['Loader'], row['Unit'], row['Jam'], row['Shift']]
+    for val in criticals:
+        s = str(val).strip().lower()
+        if pd.notna(val) and s != '' and s != '-' and s != 'nan' and s != 'unknown':
+            return True
+    return False
+
+def _apply(func):
+    return lambda df: df.apply(func, axis=1) if len(df) else pd.Series(dtype=bool)
+
+def legacy_stockpile_mask(df, final=False):
+    return _apply(legacy_is_valid_stockpile_final if final else legacy_is_valid_stockpile_row)(df)
+
+legacy_production_mask = _apply(legacy_is_valid_row)
+
+
+# ============================================================
+# SYNTHETIC FRAMES
+# ============================================================
+
+TEXT_EDGES = [None, np.nan, '', ' ', '-', ' - ', 'nan', 'NaN', 'None', 'none', 'Unknown', 'unknown ',
+              '0', '0.0', ' 0 ', '12', '-3', 'abc', 0, 0.0, 5, 2.5, True, False, dtime(7, 30)]
+NUMBER_EDGES = [np.nan, 0, 0.0, 1, 12.5, -1]
+
+def _column(rng, rows, edges, values, edge_share=0.3):
+    """`values` with a share of the cells replaced by edge values"""
+    col = np.array(values, dtype=object)
+    hit = rng.random(rows) < edge_share
+    picks = rng.integers(0, len(edges), hit.sum())
+    col[hit] = [edges[i] for i in picks]
+    return col
+
+def make_production_frame(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    empty = rng.random(rows) < 0.2  # rows that only carry Date/Shift
+    frame = {
+        'Date': pd.Timestamp('2026-01-01') + pd.to_timedelta(rng.integers(0, 365, rows), unit='D'),
+        'Shift': rng.choice(['Shift 1', 'Shift 2', 'Shift 3'], rows),
+    }
+    text_cols = {'Time': [dtime(h, 0) for h in rng.integers(0, 24, rows)],
+                 'Excavator': [f"PC 850-{i:02d}" for i in rng.integers(1, 9, rows)],
+                 'Dump Truck': [f"DT{i:03d}" for i in rng.integers(1, 80, rows)],
+                 'Front': rng.choice(['F1', 'F2', 'F3'], rows),
+                 'Commodity': rng.choice(['LS', 'SS'], rows),
+                 'Dump Loc': rng.choice(['Hopper', 'Stockpile'], rows),
+                 'BLOK': rng.choice(['A', 'B', 'C'], rows)}
+    for name, values in text_cols.items():
+        col = _column(rng, rows, TEXT_EDGES, values)
+        col[empty] = None
+        frame[name] = col
+    rit = rng.integers(0, 4, rows).astype(float)
+    rit[empty | (rng.random(rows) < 0.1)] = np.nan
+    frame['Rit'] = rit
+    frame['Tonase'] = rit * 25
+    return pd.DataFrame(frame)
+
+def make_stockpile_frame(rows, seed=0):
+    rng = np.random.default_rng(seed + 1)
+    empty = rng.random(rows) < 0.2
+    frame = {
+        'Date': pd.Timestamp('2026-01-01') + pd.to_timedelta(rng.integers(0, 365, rows), unit='D'),
+        'Shift': _column(rng, rows, TEXT_EDGES, rng.choice(['1', '2', '3'], rows)),
+    }
+    for name, values in {'Loader': rng.choice(['PC 850-01', 'PC 400-02'], rows),
+                         'Unit': [f"DT{i}" for i in rng.integers(1, 40, rows)],
+                         'Jam': [f"{h:02d}:00" for h in rng.integers(0, 24, rows)]}.items():
+        col = _column(rng, rows, TEXT_EDGES, values)
+        col[empty] = None
+        frame[name] = col
+    frame['Ritase'] = _column(rng, rows, TEXT_EDGES + NUMBER_EDGES, rng.integers(0, 5, rows).tolist())
+    return pd.DataFrame(frame)
+
+
+# ============================================================
+# PARITY
+# ============================================================
+
+def check_mask_parity(production, stockpile):
+    cases = [
+        ('production', legacy_production_mask, parsers.production_valid_mask, production),
+        ('production (numeric text cols)', legacy_production_mask, parsers.production_valid_mask,
+         production.assign(Excavator=pd.to_numeric(production['Excavator'], errors='coerce'))),
+        ('stockpile', legacy_stockpile_mask, parsers.stockpile_valid_mask, stockpile),
+        ('stockpile (no Jam/Loader)', legacy_stockpile_mask, parsers.stockpile_valid_mask,
+         stockpile.drop(columns=['Jam', 'Loader'])),
+        ('stockpile (numeric Ritase)', legacy_stockpile_mask, parsers.stockpile_valid_mask,
+         stockpile.assign(Ritase=pd.to_numeric(stockpile['Ritase'], errors='coerce'))),
+        ('stockpile final', lambda df: legacy_stockpile_mask(df, final=True),
+         lambda df: parsers.stockpile_valid_mask(df, final=True), stockpile),
+        ('empty', legacy_production_mask, parsers.production_valid_mask, production.iloc[:0]),
+    ]
+    for name, legacy, vectorized, df in cases:
+        expected = np.asarray(legacy(df), dtype=bool)
+        got = np.asarray(vectorized(df), dtype=bool)
+        mismatch = np.flatnonzero(expected != got)
+        assert not len(mismatch), f"{name}: {len(mismatch)} rows differ, e.g.\n{df.iloc[mismatch[:5]]}"
+
+def _parse_workbooks(files):
+    return {
+        'Production': parsers.parse_production_data(files['produksi']),
+        'Stockpile': parsers.parse_stockpile_hopper(files['monitoring']),
+    }
+
+def check_workbook_parity(files):
+    vectorized = _parse_workbooks(files)
+    masks = parsers.production_valid_mask, parsers.stockpile_valid_mask
+    parsers.production_valid_mask, parsers.stockpile_valid_mask = legacy_production_mask, legacy_stockpile_mask
+    try:
+        legacy = _parse_workbooks(files)
+    finally:
+        parsers.production_valid_mask, parsers.stockpile_valid_mask = masks
+    for key in legacy:
+        pd.testing.assert_frame_equal(vectorized[key], legacy[key])
+    return {key: len(df) for key, df in vectorized.items()}
+
+
+# ============================================================
+# TESTS
+# ============================================================
+
+def test_masks_match_row_functions():
+    check_mask_parity(make_production_frame(5_000), make_stockpile_frame(5_000))
+
+
+def test_parsed_workbooks_match_row_functions(tmp_path):
+    files = {'produksi': str(tmp_path / 'produksi.xlsx'), 'monitoring': str(tmp_path / 'monitoring.xlsx')}
+    write_produksi(files['produksi'], days=20)
+    write_monitoring(files['monitoring'], days=20)
+    counts = check_workbook_parity(files)
+    assert all(counts.values()), counts
@@ -0,0 +1,213 @@
+import io
+import itertools
+import re
+import sqlite3
+import pandas as pd
+from datetime import datetime
+
+# ==============================================================================
+# COLUMNAR BULK WRITER
+# ==============================================================================
+# Writes a DataFrame whose columns are already named after the model columns.
+# - PostgreSQL : COPY ... FROM STDIN (CSV) through the psycopg2 cursor
+# - SQLite     : multi-row INSERT ... VALUES (...), (...) bounded by the
+#                host-parameter limit
+# - Others     : executemany in batches
+
+BATCH_SIZE = 5000
+NULL_TOKEN = '\\N'
+
+# SQLite < 3.32 allows 999 bound parameters per statement, newer builds 32766
+SQLITE_MAX_VARIABLES = 32766 if sqlite3.sqlite_version_info >= (3, 32, 0) else 999
+
+
+def frame_to_rows(frame):
+    """DataFrame -> list of dicts with NaN/NaT replaced by None"""
+    clean = frame.astype(object).where(frame.notna(), None)
+    return clean.to_dict('records')
+
+
+def _insert_columns(table, frame):
+    cols = [c for c in frame.columns if c in table.c]
+    if 'created_at' in table.c and 'created_at' not in cols:
+        cols.append('created_at')
+    return cols
+
+
+def _copy_frame(conn, table, frame, cols):
+    buffer = io.StringIO()
+    frame[cols].to_csv(buffer, index=False, header=False, na_rep=NULL_TOKEN)
+    buffer.seek(0)
+    col_sql = ', '.join(f'"{c}"' for c in cols)
+    cursor = conn.connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {table.name} ({col_sql}) FROM STDIN WITH (FORMAT csv, NULL '{NULL_TOKEN}')",
+            buffer
+        )
+    finally:
+        cursor.close()
+
+
+def _sqlite_multirow(conn, table, frame, cols, batch_size):
+    # Built as driver SQL: compiling a Core insert().values([...]) with
+    # thousands of rows costs more than executing it.
+    clean = frame.astype(object).where(frame.notna(), None)
+    for col in cols:
+        process = table.c[col].type.dialect_impl(conn.dialect).bind_processor(conn.dialect)
+        if process is not None:
+            clean[col] = clean[col].map(lambda v: None if v is None else process(v))
+    rows = list(clean.itertuples(index=False, name=None))
+
+    col_sql = ', '.join(f'"{c}"' for c in cols)
+    row_sql = '(' + ', '.join('?' * len(cols)) + ')'
+    for i in range(0, len(rows), batch_size):
+        batch = rows[i:i + batch_size]
+        conn.exec_driver_sql(
+            f"INSERT INTO {table.name} ({col_sql}) VALUES " + ', '.join([row_sql] * len(batch)),
+            tuple(itertools.chain.from_iterable(batch))
+        )
+
+
+def write_frame(conn, table, frame, batch_size=BATCH_SIZE):
+    """
+    Insert every row of `frame` into `table` on an open SQLAlchemy connection
+    (inside the caller's transaction). Returns the number of rows written.
+    """
+    if frame is None or frame.empty:
+        return 0
+
+    frame = frame.copy()
+    cols = _insert_columns(table, frame)
+    if 'created_at' in cols and 'created_at' not in frame.columns:
+        frame['created_at'] = datetime.utcnow()
+    frame = frame[cols]
+
+    dialect = conn.dialect.name
+
+    if dialect == 'postgresql' and hasattr(conn.connection, 'cursor'):
+        try:
+            _copy_frame(conn, table, frame, cols)
+            return len(frame)
+        except AttributeError:
+            pass  # Driver without copy_expert (not psycopg2) -> executemany
+
+    if dialect == 'sqlite':
+        batch_size = max(1, min(batch_size, SQLITE_MAX_VARIABLES // max(len(cols), 1)))
+        _sqlite_multirow(conn, table, frame, cols, batch_size)
+        return len(frame)
+
+    rows = frame_to_rows(frame)
+    for i in range(0, len(rows), batch_size):
+        conn.execute(table.insert(), rows[i:i + batch_size])
+    return len(rows)
+
+
+# ==============================================================================
+# VECTORIZED COERCION HELPERS
+# ==============================================================================
+
+def text_column(series, keep_null=True):
+    """str() every value; missing values become None unless keep_null=False ('nan')"""
+    out = series.astype(str)
+    if keep_null:
+        out = out.where(series.notna(), None)
+    return out.astype(object)
+
+
+def int_column(series, default=0):
+    return pd.to_numeric(series, errors='coerce').fillna(default).astype(int)
+
+
+def float_column(series, default=0.0, decimals=None):
+    out = pd.to_numeric(series, errors='coerce').fillna(default).astype(float)
+    if decimals is not None:
+        out = out.round(decimals)
+    return out
+
+
+def date_column(series):
+    """Any date-like Series -> python date objects (None when unparseable)"""
+    parsed = pd.to_datetime(series, errors='coerce')
+    return parsed.dt.date.where(parsed.notna(), None).astype(object)
+
+
+# ==============================================================================
+# DERIVED TIME COLUMNS
+# ==============================================================================
+# Typed copies of the time text, computed once at sync so views group by them
+# instead of re-parsing strings on every rerun. Few distinct values per
+# column -> each is parsed once and mapped back.
+
+_CLOCK = r'(\d{1,2}):(\d{2})(?::\d{2})?'
+_SLOT = re.compile(rf'^{_CLOCK}(?:\s*-\s*{_CLOCK})?$')
+
+
+def _per_distinct(series, func):
+    values = pd.unique(series.to_numpy(dtype=object))
+    return series.map({v: func(v) for v in values})
+
+
+def _clock_minutes(hours, minutes):
+    hours, minutes = int(hours), int(minutes)
+    return hours * 60 + minutes if hours <= 24 and minutes < 60 else None
+
+
+def hour_of(value):
+    """
+    Hour of day (0-23) of a time cell as the views always read it: int() of
+    the text before ':' ('13:00-14:00' -> 13), else int(float(text)).
+    None when unparseable or out of range.
+    """
+    text = str(value).strip()
+    try:
+        hour = int(text.split(':')[0]) if ':' in text else int(float(text))
+    except (ValueError, OverflowError):
+        return None
+    return hour if 0 <= hour <= 23 else None
+
+
+def slot_of(value):
+    """(start, end) minutes of day of a 'HH:MM-HH:MM' slot; end is None for a single time"""
+    match = _SLOT.match(str(value).strip())
+    if not match:
+        hour = hour_of(value)
+        return (hour * 60 if hour is not None else None), None
+    h1, m1, h2, m2 = match.groups()
+    return _clock_minutes(h1, m1), (_clock_minutes(h2, m2) if h2 is not None else None)
+
+
+def minutes_of(value):
+    """Minutes of day of 'HH:MM[:SS]' text or an Excel day fraction (0.3125 -> 450)"""
+    text = str(value).strip()
+    match = _SLOT.match(text)
+    if match and match.group(3) is None:
+        return _clock_minutes(*match.group(1, 2))
+    try:
+        fraction = float(text)
+    except ValueError:
+        return None
+    return int(round(fraction * 1440)) if 0 <= fraction < 1 else None
+
+
+def time_slot_columns(time):
+    """{'hour', 'slot_start', 'slot_end'} (nullable ints) of a time slot text column"""
+    return {
+        'hour': _per_distinct(time, hour_of).astype('Int64'),
+        'slot_start': _per_distinct(time, lambda v: slot_of(v)[0]).astype('Int64'),
+        'slot_end': _per_distinct(time, lambda v: slot_of(v)[1]).astype('Int64'),
+    }
+
+
+def downtime_minutes_columns(start, end):
+    """
+    {'start_min', 'end_min', 'duration_min'} (nullable ints) of start / end
+    time columns; a stop ending before it started ran past midnight.
+    """
+    start_min = _per_distinct(start, minutes_of).astype('Int64')
+    end_min = _per_distinct(end, minutes_of).astype('Int64')
+    return {
+        'start_min': start_min,
+        'end_min': end_min,
+        'duration_min': (end_min - start_min) % 1440,
+    }
@@ -5,16 +5,26 @@
 
 import pandas as pd
 import streamlit as st
-import requests
-from io import BytesIO
-import base64
 import os
 import sys
 from datetime import datetime, timedelta
 import time
 
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from utils.db_manager import get_db_engine
+from utils.rollups import production_rollup_query
+from utils.dimensions import decode_dimensions, dimension_names
+from utils.queries import (
+    as_date, since_date, PRODUCTION_ROWS, PRODUCTION_KPI, PRODUCTION_SHIFTS, DOWNTIME_ROWS, STOCKPILE_ROWS,
+    SHIPPING_ROWS, DAILY_PLAN_ALL, DAILY_PLAN_ROWS, TARGET_ROWS, SYNC_HISTORY
+)
+from utils.models import Front, Excavator, Commodity
+from utils.bulk_writer import time_slot_columns
+from utils.network import convert_onedrive_link, download_from_onedrive as _stream_download
+from utils.parsers import (
+    parse_excel_date, safe_parse_date_column, normalize_excavator_name, normalize_excavator_column,
+    shifted_downtime_rows, repair_shifted_columns
+)
 
 # Import Settings
 # Import Settings
@@ -40,6 +50,26 @@ except ImportError:
 # HELPER FUNCTIONS
 # ============================================================
 
+# Typed time columns derived at sync (utils/bulk_writer) -> loader column names
+DERIVED_TIME_LABELS = {
+    'hour': 'Hour', 'slot_start': 'Slot Start', 'slot_end': 'Slot End',
+    'start_min': 'Start Min', 'end_min': 'End Min', 'duration_min': 'Duration Min',
+}
+
+def with_time_labels(df):
+    """Rename the derived time columns of a DB frame and keep them integer (nullable)"""
+    df = df.rename(columns=DERIVED_TIME_LABELS)
+    for col in DERIVED_TIME_LABELS.values():
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype('Int64')
+    return df
+
+def with_hour(df, time_col='Time'):
+    """Frame with an 'Hour' column (Int64, NA when `time_col` holds no hour 0-23)"""
+    if 'Hour' not in df.columns:
+        df = df.assign(Hour=time_slot_columns(df[time_col])['hour'])
+    return df
+
 def apply_global_filters(df, date_col='Date', shift_col='Shift'):
     """Apply sidebar filters to any dataframe"""
     if df.empty:
@@ -110,62 +140,10 @@ def apply_global_filters(df, date_col='Date', shift_col='Shift'):
     return df
 
 
-def convert_onedrive_link(share_link, cache_bust=False):
-    """Convert OneDrive share link ke direct download link"""
-    if not share_link or share_link.strip() == "":
-        return None
-    
-    share_link = share_link.strip()
-    
-    # Determine separator
-    # For Strategy 1, we manually added ?download=1, so next is &
-    # For Strategy 2, it might be ?
-    
-    # STRATEGY 1: Simple 'download=1' param replacement
-    # Works for modern 1drv.ms/x/c/ links
-    if "1drv.ms" in share_link or "onedrive.live.com" in share_link:
-        try:
-            # Remove existing query params (everything after ?)
-            base_link = share_link.split('?')[0]
-            
-            final_link = f"{base_link}?download=1"
-            if cache_bust:
-                final_link += f"&t={int(time.time())}"
-            return final_link
-        except:
-            pass
-
-    # STRATEGY 2: Legacy API (u! encoding)
-    try:
-        encoded = base64.b64encode(share_link.encode()).decode()
-        encoded = encoded.rstrip('=').replace('/', '_').replace('+', '-')
-        
-        final_link = f"https://api.onedrive.com/v1.0/shares/u!{encoded}/root/content"
-        if cache_bust:
-             final_link += f"?t={int(time.time())}"
-        return final_link
-    except Exception:
-        return None
-
-
 def download_from_onedrive(share_link, timeout=30, cache_bust=False):
-    """Download file dari OneDrive"""
-    direct_url = convert_onedrive_link(share_link, cache_bust=cache_bust)
-    
-    if not direct_url:
-        return None
-    
-    try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }
-        response = requests.get(direct_url, headers=headers, timeout=timeout)
-        response.raise_for_status()
-        return BytesIO(response.content)
-    except Exception as e:
-        if cache_bust: # Propagate error if this is a manual sync
-            raise e
-        return None
+    """Download file dari OneDrive (streamed, lihat utils.network)"""
+    # Errors propagate only for manual syncs (cache_bust=True)
+    return _stream_download(share_link, timeout=timeout, cache_bust=cache_bust)
 
 
 
@@ -208,82 +186,6 @@ def check_onedrive_status():
     return status
 
 
-# ============================================================
-# EXCEL SERIAL DATE PARSER
-# ============================================================
-
-def parse_excel_date(date_value):
-    """
-    Parse Excel serial date to Python date
-    Excel stores dates as number of days since 1900-01-01
-    Example: 45870 = 2025-07-12
-    """
-    try:
-        # If already a date/datetime, return as is
-        if isinstance(date_value, (datetime, pd.Timestamp)):
-            return pd.Timestamp(date_value).date()
-        
-        # If string, try to parse
-        if isinstance(date_value, str):
-            parsed = pd.to_datetime(date_value, errors='coerce')
-            if pd.notna(parsed):
-                return parsed.date()
-            return None
-        
-        # If number (Excel serial date)
-        if isinstance(date_value, (int, float)):
-            # Excel epoch starts at 1899-12-30 (not 1900-01-01 due to Excel bug)
-            excel_epoch = datetime(1899, 12, 30)
-            date_result = excel_epoch + timedelta(days=int(date_value))
-            return date_result.date()
-        
-        return None
-        
-    except Exception:
-        return None
-
-
-def safe_parse_date_column(date_series):
-    """Apply Excel date parsing to entire column"""
-    return date_series.apply(parse_excel_date)
-
-
-def normalize_excavator_name(name):
-    """
-    Normalize excavator name to format: PC XXX-YY
-    Example: 'PC 850 01' -> 'PC 850-01', 'PC850-01' -> 'PC 850-01', 'PC-400-05' -> 'PC 400-05'
-    """
-    import re
-    
-    if pd.isna(name) or not isinstance(name, str):
-        return name
-    
-    name = str(name).strip().upper()
-    
-    # Remove all separators first to get pure digits
-    # Handle formats: PC 850 01, PC850-01, PC 850-01, PC85001, PC-850-01, PC-400-05
-    clean = re.sub(r'[^A-Z0-9]', '', name)  # Remove all non-alphanumeric
-    
-    # Match PC followed by exactly 5 digits (3 for model + 2 for number)
-    match = re.match(r'^PC(\d{3})(\d{2})$', clean)
-    if match:
-        return f"PC {match.group(1)}-{match.group(2)}"
-    
-    # Try original pattern for edge cases
-    match = re.match(r'^PC[-\s]*(\d{3})[-\s]*(\d{2})$', name)
-    if match:
-        return f"PC {match.group(1)}-{match.group(2)}"
-    
-    return name
-
-
-def normalize_excavator_column(df):
-    """Apply excavator name normalization to dataframe"""
-    if 'Excavator' in df.columns:
-        df['Excavator'] = df['Excavator'].apply(normalize_excavator_name)
-    return df
-
-
 # ============================================================
 # LOAD PRODUKSI - FIXED VERSION
 # ============================================================
@@ -300,13 +202,11 @@ def load_produksi(start_date=None):
     try:
         engine = get_db_engine()
         if engine:
-            if start_date:
-                query = f"SELECT * FROM production_logs WHERE date >= '{start_date}'"
-            else:
-                query = "SELECT * FROM production_logs WHERE date >= '2026-01-01'"
-            # Optional: Add date filter if implemented parameters
-            
-            df_db = pd.read_sql(query, engine)
+            # Dimension keys instead of the repeated names (utils/queries.py)
+            with engine.connect() as conn:
+                df_db = pd.read_sql(PRODUCTION_ROWS, conn, params={'since': since_date(start_date)})
+                # Names read after the rows, so every key has its category
+                df_db = decode_dimensions(conn, 'production_logs', df_db)
             print(f"[DEBUG] DB Load Result: {len(df_db)} rows. Columns: {list(df_db.columns)}")
             if not df_db.empty:
                 # Map DB columns to Dashboard/Excel standard
@@ -323,11 +223,12 @@ def load_produksi(start_date=None):
                     'tonnase': 'Tonnase',
                     'dump_loc': 'Dump Loc'
                 }
-                df_db = df_db.rename(columns=rename_map)
+                df_db = with_time_labels(df_db.rename(columns=rename_map))
                 
-                # Ensure Types
-                if 'Date' in df_db.columns:
-                    df_db['Date'] = pd.to_datetime(df_db['Date'])
+                # Ensure Types (SQLite hands both over as ISO text, see utils.queries.driver_value)
+                for col in ('Date', 'created_at'):
+                    if col in df_db.columns:
+                        df_db[col] = pd.to_datetime(df_db[col])
                 
                 debug_log.append(f"Loaded {len(df_db)} rows from Database.")
                 debug_log.append(f"Loaded {len(df_db)} rows from Database.")
@@ -605,12 +506,7 @@ def load_gangguan_all(start_date=None):
     try:
         engine = get_db_engine()
         if engine:
-            if start_date:
-                query = f"SELECT * FROM downtime_logs WHERE tanggal >= '{start_date}'"
-            else:
-                query = "SELECT * FROM downtime_logs WHERE tanggal >= '2026-01-01'"
-            
-            df_db = pd.read_sql(query, engine)
+            df_db = pd.read_sql(DOWNTIME_ROWS, engine, params={'since': since_date(start_date)})
             
             if not df_db.empty:
                 rename_map = {
@@ -639,7 +535,7 @@ def load_gangguan_all(start_date=None):
                     'link_lampiran': 'Link/Lampiran',
                     'extra': 'Extra'
                 }
-                df_db = df_db.rename(columns=rename_map)
+                df_db = with_time_labels(df_db.rename(columns=rename_map))
                 
                 if 'Tanggal' in df_db.columns:
                      df_db['Tanggal'] = pd.to_datetime(df_db['Tanggal'])
@@ -730,7 +626,7 @@ def load_gangguan_all(start_date=None):
                     else: df_mon = pd.read_excel(file_buffer, sheet_name=ms)
                     
                     if 'Tanggal' in df_mon.columns:
-                        dates = pd.to_datetime(df_mon['Tanggal'], errors='coerce')
+                        dates = safe_parse_date_column(df_mon['Tanggal'])
                         if not dates.empty:
                             mon_max = dates.max()
                             debug_log.append(f"🔎 Check '{ms}': Max Date {mon_max}")
@@ -779,7 +675,7 @@ def load_gangguan_all(start_date=None):
                 if 'Tanggal' in df_sheet.columns:
                      try:
                          # Quick check max date without modifying df yet
-                         dates = pd.to_datetime(df_sheet['Tanggal'], errors='coerce')
+                         dates = safe_parse_date_column(df_sheet['Tanggal'])
                          debug_log.append(f"Sheet '{sheet}': Date Range {dates.min()} - {dates.max()}")
                      except: 
                          debug_log.append(f"Sheet '{sheet}': Could not parse dates for logging")
@@ -836,9 +732,8 @@ def load_gangguan_all(start_date=None):
         # Date parsing
         # FIX: Use safe_parse_date_column to handle Excel serial numbers (45659 -> 2026)
         if 'Tanggal' in df.columns:
+            # datetime64 already: supports the .dt accessor and dashboard filtering
             df['Tanggal'] = safe_parse_date_column(df['Tanggal'])
-            # CRITICAL: Convert to datetime64 to support .dt accessor and dashboard filtering
-            df['Tanggal'] = pd.to_datetime(df['Tanggal'], errors='coerce')
         
         # Filter valid rows
         df = df[df['Bulan'].notna()]
@@ -875,39 +770,8 @@ def load_gangguan_all(start_date=None):
         # Symptoms: 'Alat' contains Crusher names (LSC, MS), 'Remarks' contains Alat, etc.
         # This happens because 'Crusher' column is physically present in 2026 rows but missing in Header.
         
-        # Check if shift is needed: Look for signatures in 'Alat'
-        # Safely convert to string
-        if 'Alat' in df.columns:
-            mask_shifted = df['Alat'].astype(str).str.contains(r'LSC|MS |Batu', case=False, na=False) | (df['Tahun'] == 2026)
-            
-            if mask_shifted.any():
-                # Define shift map: New_Column <- Current_Column
-                # Based on Excel debug: Durasi -> [Crusher] -> Alat -> Remarks -> Kelompok...
-                shift_map = [
-                    ('Crusher', 'Alat'),
-                    ('Alat', 'Remarks'),
-                    ('Remarks', 'Kelompok Masalah'),
-                    ('Kelompok Masalah', 'Gangguan'),
-                    ('Gangguan', 'Info CCR'),
-                    ('Info CCR', 'Sub Komponen'),
-                    ('Sub Komponen', 'Keterangan'),
-                    ('Keterangan', 'Penyebab'),
-                    ('Penyebab', 'Identifikasi Masalah'),
-                    ('Identifikasi Masalah', 'Action'),
-                    ('Action', 'Plan'),
-                    ('Plan', 'PIC'),
-                    ('PIC', 'Status'),
-                    ('Status', 'Due Date'),
-                    ('Due Date', 'Spare Part'),
-                    ('Spare Part', 'Info Spare Part'),
-                    ('Info Spare Part', 'Link/Lampiran')
-                ]
-                
-                # Apply shift ONLY to affected rows
-                for new_col, old_col in shift_map:
-                    if old_col in df.columns:
-                        if new_col not in df.columns: df[new_col] = None
-                        df.loc[mask_shifted, new_col] = df.loc[mask_shifted, old_col]
+        # Shift is needed where 'Alat' holds crusher names (or Tahun is 2026)
+        df = repair_shifted_columns(df, shifted_downtime_rows(df))
 
         # Standardize Kelompok Masalah
         kelompok_map = {
@@ -1260,8 +1124,7 @@ def load_daily_plan():
     try:
         engine = get_db_engine()
         if engine:
-            query = "SELECT * FROM daily_plan_logs"
-            df_db = pd.read_sql(query, engine)
+            df_db = pd.read_sql(DAILY_PLAN_ALL, engine)
             if not df_db.empty:
                 # DB has lowercase snake_case headers
                 # App expects Title Case or exact headers from Excel
@@ -1341,9 +1204,8 @@ def load_daily_plan_data():
     """
     try:
         engine = get_db_engine() # Ensure engine is available
-        # Sort by ID ASC (Since we reversed input, ID 1 is the Latest Data)
-        query = "SELECT * FROM daily_plan_logs WHERE tanggal >= '2026-01-01' ORDER BY id ASC"
-        df = pd.read_sql(query, engine)
+        # Latest date first (the view re-sorts by id)
+        df = pd.read_sql(DAILY_PLAN_ROWS, engine, params={'since': since_date()})
         
         if df.empty:
             return pd.DataFrame()
@@ -1377,6 +1239,23 @@ def load_daily_plan_data():
 
 
 
+@st.cache_data(ttl=60)
+def load_sync_history(runs=5):
+    """
+    Last `runs` sync runs from the sync_runs ledger, one row per source.
+    Short TTL: unchanged runs do not move the last_sync_at stamp.
+    """
+    try:
+        engine = get_db_engine()
+        df = pd.read_sql(SYNC_HISTORY, engine, params={'runs': int(runs)})
+        if not df.empty:
+            df['started_at'] = pd.to_datetime(df['started_at'])
+        return df
+    except Exception as e:
+        print(f"Error loading sync history: {e}")
+        return pd.DataFrame()
+
+
 # REFACTOR: Duplicate load_ritase_enhanced removed. 
 # The correct version with DB logic is defined above at line 1066.
 
@@ -1399,7 +1278,7 @@ def load_ritase_by_front():
             df_prod['Front'] = df_prod['Front'].astype(str).str.strip()
             
             # Group
-            totals = df_prod.groupby('Front')['Rit'].sum().reset_index()
+            totals = df_prod.groupby('Front', observed=True)['Rit'].sum().reset_index()
             totals.columns = ['Front', 'Total_Ritase']
             totals = totals[totals['Total_Ritase'] > 0]
             totals = totals.sort_values('Total_Ritase', ascending=False)
@@ -1504,8 +1383,7 @@ def load_analisa_produksi_all():
     try:
         engine = get_db_engine()
         if engine:
-            query = "SELECT * FROM target_logs ORDER BY date ASC"
-            df_db = pd.read_sql(query, engine)
+            df_db = pd.read_sql(TARGET_ROWS, engine)
             if not df_db.empty:
                 rename_map = {'date': 'Date', 'plan': 'Plan'}
                 df_db = df_db.rename(columns=rename_map)
@@ -1746,14 +1624,13 @@ def load_stockpile_hopper():
             engine = get_db_engine()
             if engine:
                 # OPTIMIZED: Filter only 2026+ data
-                query = "SELECT * FROM stockpile_logs WHERE date >= '2026-01-01' ORDER BY created_at DESC, id DESC"
-                df_db = pd.read_sql(query, engine)
+                df_db = pd.read_sql(STOCKPILE_ROWS, engine, params={'since': since_date()})
                 if not df_db.empty:
                     rename_map = {
                         'date': 'Tanggal', 'time': 'Jam', 'shift': 'Shift',
                         'dumping': 'Dumping', 'unit': 'Unit', 'ritase': 'Ritase'
                     }
-                    df_db = df_db.rename(columns=rename_map)
+                    df_db = with_time_labels(df_db.rename(columns=rename_map))
                     if 'Tanggal' in df_db.columns: df_db['Tanggal'] = pd.to_datetime(df_db['Tanggal'])
                     st.session_state['last_update_stockpile'] = "Database"
                     return df_db
@@ -1831,8 +1708,7 @@ def load_shipping_data():
     try:
         engine = get_db_engine()
         if engine:
-            query = "SELECT tanggal, shift, ap_ls, ap_ls_mk3, ap_ss, total_ls, total_ss FROM shipping_logs WHERE tanggal >= '2026-01-01' ORDER BY id ASC"
-            df_db = pd.read_sql(query, engine)
+            df_db = pd.read_sql(SHIPPING_ROWS, engine, params={'since': since_date()})
             print(f"[Shipping Loader] DB returned {len(df_db)} rows")
             
             if not df_db.empty:
@@ -1983,7 +1859,6 @@ def load_shipping_data():
                 block = block.dropna(subset=['Date'])
                 block['Date'] = safe_parse_date_column(block['Date'])
                 block = block[block['Date'].notna()]
-                block['Date'] = pd.to_datetime(block['Date'])
                 
                 # Filter Valid Shifts
                 block = block[block['Shift'].astype(str).str.contains(r'1|2|3')]
@@ -2043,32 +1918,43 @@ def get_filter_options():
         engine = get_db_engine()
         if engine:
             with engine.connect() as conn:
-                from sqlalchemy import text
-                
                 # 1. Shifts
                 try:
-                    res_shift = conn.execute(text("SELECT DISTINCT shift FROM production_logs ORDER BY shift")).fetchall()
+                    res_shift = conn.execute(PRODUCTION_SHIFTS, {'since': since_date()}).fetchall()
                     options['shift'] = [str(row[0]) for row in res_shift if row[0] is not None]
                 except:
                     options['shift'] = ["Shift 1", "Shift 2"]
 
-                # 2. Fronts (Active Only - appearing in 2026)
-                res_front = conn.execute(text("SELECT DISTINCT front FROM production_logs WHERE date >= '2026-01-01' ORDER BY front")).fetchall()
-                options['front'] = [row[0] for row in res_front if row[0] is not None]
-                
-                # 3. Excavators
-                res_exca = conn.execute(text("SELECT DISTINCT excavator FROM production_logs WHERE date >= '2026-01-01' ORDER BY excavator")).fetchall()
-                options['excavator'] = [row[0] for row in res_exca if row[0] is not None]
-                
-                # 4. Material
-                res_mat = conn.execute(text("SELECT DISTINCT commodity FROM production_logs WHERE date >= '2026-01-01' ORDER BY commodity")).fetchall()
-                options['material'] = [row[0] for row in res_mat if row[0] is not None]
+                # 2-4. Fronts, Excavators, Material: the dimension tables
+                # (names referenced by production_logs, utils/dimensions.py)
+                options['front'] = dimension_names(conn, Front)
+                options['excavator'] = dimension_names(conn, Excavator)
+                options['material'] = dimension_names(conn, Commodity)
                 
     except Exception as e:
         print(f"Filter Load Error: {e}")
         
     return options
 
+@st.cache_data(ttl=CACHE_TTL)
+def load_production_rollup(by=(), filters=None, active=False):
+    """
+    Production sums (Tonnase, Rit, Rows) grouped by `by`, e.g. ('date',),
+    under the sidebar filters, from the sync-time rollups (utils/rollups.py).
+    Same totals as apply_global_filters(load_produksi()).groupby(...).sum(),
+    over the rows with Tonnase > 0 only when `active`.
+    """
+    try:
+        engine = get_db_engine()
+        if engine:
+            df = pd.read_sql(production_rollup_query(tuple(by), filters, active), engine)
+            if 'Date' in df.columns:
+                df['Date'] = pd.to_datetime(df['Date'])
+            return df
+    except Exception as e:
+        print(f"Rollup Query Error: {e}")
+    return pd.DataFrame()
+
 @st.cache_data(ttl=CACHE_TTL)
 def get_production_kpi_summary(start_date=None, end_date=None):
     """
@@ -2078,20 +1964,12 @@ def get_production_kpi_summary(start_date=None, end_date=None):
     try:
         engine = get_db_engine()
         if engine:
-             # Basic SQL construction
-             where_clause = "WHERE date >= '2026-01-01'"
+             # 2026 floor, narrowed to [start_date, end_date] when both are given
+             since, until = since_date(), date.max
              if start_date and end_date:
-                 where_clause += f" AND date BETWEEN '{start_date}' AND '{end_date}'"
+                 since, until = max(since, as_date(start_date)), as_date(end_date)
                  
-             query = f"""
-             SELECT 
-                SUM(tonnase) as total_ton, 
-                SUM(rit) as total_rit,
-                MAX(date) as last_date
-             FROM production_logs 
-             {where_clause}
-             """
-             df = pd.read_sql(query, engine)
+             df = pd.read_sql(PRODUCTION_KPI, engine, params={'since': since, 'until': until})
              if not df.empty:
                  return df.iloc[0]
     except Exception as e:
@@ -1,8 +1,14 @@
 import os
+from datetime import datetime
+import pandas as pd
 import streamlit as st
-from sqlalchemy import create_engine
+from sqlalchemy import and_, bindparam, create_engine, inspect, select, text
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import sessionmaker
-from utils.models import Base
+from utils.models import Base, SystemLog, ProductionLog, StockpileLog, DowntimeLog, SyncRun
+from utils.bulk_writer import frame_to_rows, time_slot_columns, downtime_minutes_columns
+from utils.rollups import ROLLUPS, refresh_rollups
+from utils.dimensions import DIMENSIONS, rebuild_dimensions
 
 # Load environment variables (dotenv is optional)
 try:
@@ -29,9 +35,11 @@ _message_printed = False
 # _engine = None
 
 @st.cache_resource
-def get_db_engine():
+def create_db_engine():
     """
-    Get SQLAlchemy engine (Singleton via Streamlit Cache)
+    Get SQLAlchemy engine (Singleton via Streamlit Cache), whatever the
+    schema version. For the processes that upgrade the schema (sync, worker,
+    init_db); the dashboard uses get_db_engine.
     """
     
     # if not DATABASE_URL:
@@ -60,13 +68,222 @@ def get_db_engine():
         print(f"Error creating DB engine: {e}")
         return None
 
+# Engines whose schema get_db_engine found current (checked once per process)
+_current_schema = set()
+
+def get_db_engine():
+    """
+    Engine of the dashboard. Raises RuntimeError while the database is behind
+    the MIGRATIONS: the loaders read columns and tables that only exist after
+    them, and the dashboard does not migrate inside a request. A sync, the
+    worker or init_db upgrade the schema.
+    """
+    engine = create_db_engine()
+    if engine is not None and id(engine) not in _current_schema:
+        check_schema(engine)
+        _current_schema.add(id(engine))
+    return engine
+
+# ============================================================
+# SCHEMA MIGRATIONS
+# ============================================================
+# create_all() only creates missing tables and never touches existing ones,
+# so anything an existing deployment needs beyond new nullable columns
+# (indexes, backfills) is a numbered migration, applied once per database in
+# order. The applied version is kept in system_logs.schema_version.
+# Steps must be idempotent: a fresh database already got the models' indexes
+# from create_all, and the version is only bumped after the step succeeded.
+
+SCHEMA_VERSION_KEY = 'schema_version'
+MIGRATION_LOCK_ID = 7210421  # pg_advisory_xact_lock key; one migrating process at a time
+
+def _create_indexes(*names):
+    """Migration step creating the named indexes declared in utils/models"""
+    def step(conn):
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                if index.name in names:
+                    index.create(conn, checkfirst=True)
+    return step
+
+def _rebuild_rollups(conn):
+    """Migration step filling the rollup tables from their source tables"""
+    for source_name in ROLLUPS:
+        refresh_rollups(conn, source_name)
+
+def _rebuild_dimensions(conn):
+    """Migration step filling the dimension tables and keys from the text columns"""
+    for source_name in DIMENSIONS:
+        rebuild_dimensions(conn, source_name)
+
+def _drop_dimension_text_columns(conn):
+    """
+    Migration step dropping the text columns the dimension keys replace,
+    with the indexes on them. The keys are (re)assigned first, so no name
+    is lost, and the rollups rebuilt from them (a database that ran
+    migration 2 before 5 rolled up rows without keys). Databases created
+    without the columns are left as they are.
+    """
+    _rebuild_dimensions(conn)
+    _rebuild_rollups(conn)
+    inspector = inspect(conn)
+    for source_name, dims in DIMENSIONS.items():
+        existing = {c['name'] for c in inspector.get_columns(source_name)}
+        legacy = [c for c in dims if c in existing]
+        for index in inspector.get_indexes(source_name):
+            if set(index['column_names']) & set(legacy):
+                conn.execute(text(f'DROP INDEX IF EXISTS {index["name"]}'))
+        for column in legacy:
+            conn.execute(text(f'ALTER TABLE {source_name} DROP COLUMN {column}'))
+
+# Typed time columns derived at sync: table -> (text columns, derive function)
+DERIVED_TIME_COLUMNS = [
+    (ProductionLog, ('time',), time_slot_columns),
+    (StockpileLog, ('time',), time_slot_columns),
+    (DowntimeLog, ('start', 'end'), downtime_minutes_columns),
+]
+
+def _backfill_time_columns(conn):
+    """Migration step deriving the typed time columns of rows synced before they existed"""
+    for model, sources, derive in DERIVED_TIME_COLUMNS:
+        table = model.__table__
+        # One UPDATE per distinct source value (a few dozen time slots)
+        distinct = pd.DataFrame(
+            conn.execute(select(*[table.c[c] for c in sources]).distinct()).fetchall(), columns=list(sources)
+        ).astype(object)
+        if distinct.empty:
+            continue
+        derived = pd.DataFrame(derive(*[distinct[c] for c in sources]))
+        rows = frame_to_rows(pd.concat([distinct.add_prefix('_'), derived], axis=1))
+        match = and_(*[table.c[c].is_not_distinct_from(bindparam(f'_{c}')) for c in sources])
+        conn.execute(table.update().where(match), rows)
+
+def _backfill_drop_counts(conn):
+    """Migration step zeroing the drop counts of sync runs recorded before they were"""
+    table = SyncRun.__table__
+    for column in (table.c.stream_dropped, table.c.parser_dropped):
+        conn.execute(table.update().where(column.is_(None)).values({column: 0}))
+
+# (version, description, step(conn)) - append only, never renumber
+MIGRATIONS = [
+    # The text-column indexes of 1 are no longer declared (migration 6 drops them)
+    (1, "Composite indexes for the dashboard loader queries", _create_indexes(
+        'ix_production_logs_date_shift',
+        'ix_production_logs_date_excavator',
+        'ix_production_logs_date_front',
+        'ix_downtime_logs_tanggal_alat',
+        'ix_stockpile_logs_date_shift',
+        'ix_shipping_logs_tanggal',
+    )),
+    (2, "Backfill the production rollups", _rebuild_rollups),
+    (3, "Typed hour / slot / minute columns for existing rows", _backfill_time_columns),
+    (4, "Date + hour indexes for the hourly charts", _create_indexes(
+        'ix_production_logs_date_hour',
+        'ix_stockpile_logs_date_hour',
+    )),
+    (5, "Dimension tables and keys for the production text columns", _rebuild_dimensions),
+    (6, "Drop the production text columns (names via the dimension keys)", _drop_dimension_text_columns),
+    (7, "Date + dimension key indexes for the production filters", _create_indexes(
+        'ix_production_logs_date_excavator_id',
+        'ix_production_logs_date_front_id',
+    )),
+    (8, "Stream / parser drop counts for the sync runs ledger", _backfill_drop_counts),
+    (9, "Active-row sums and the dump / truck rollups for the Produksi and Ritase views", _rebuild_rollups),
+]
+
+def _schema_version(conn):
+    table = SystemLog.__table__
+    value = conn.execute(select(table.c.value).where(table.c.key == SCHEMA_VERSION_KEY)).scalar()
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+def _set_schema_version(conn, version):
+    table = SystemLog.__table__
+    now = datetime.utcnow()
+    updated = conn.execute(
+        table.update().where(table.c.key == SCHEMA_VERSION_KEY).values(value=str(version), updated_at=now)
+    ).rowcount
+    if not updated:
+        conn.execute(table.insert().values(key=SCHEMA_VERSION_KEY, value=str(version), updated_at=now))
+
+def schema_version(engine):
+    """Last migration applied to this database (0 = none)"""
+    with engine.connect() as conn:
+        return _schema_version(conn)
+
+def check_schema(engine):
+    """Raise RuntimeError unless every migration is applied to this database"""
+    latest = MIGRATIONS[-1][0] if MIGRATIONS else 0
+    try:
+        version = schema_version(engine)
+    except SQLAlchemyError:
+        version = 0  # No system_logs table yet
+    if version < latest:
+        raise RuntimeError(
+            f"Database schema version {version} is behind {latest}: run a sync, "
+            f"the sync worker or `python -m utils.db_manager` to upgrade it"
+        )
+
+def migrate(engine):
+    """
+    Apply pending MIGRATIONS in order, each in its own transaction together
+    with the version bump. Returns the versions applied by this call.
+    """
+    latest = MIGRATIONS[-1][0] if MIGRATIONS else 0
+    if schema_version(engine) >= latest:
+        return []
+
+    applied = []
+    for version, description, step in MIGRATIONS:
+        with engine.begin() as conn:
+            if engine.dialect.name == 'postgresql':
+                # Concurrent starters (dashboard + worker) wait here, then see the new version
+                conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {'key': MIGRATION_LOCK_ID})
+            if _schema_version(conn) >= version:
+                continue
+            step(conn)
+            _set_schema_version(conn, version)
+        print(f"Schema migration {version}: {description}")
+        applied.append(version)
+    return applied
+
+def _add_missing_columns(engine):
+    """
+    Add columns introduced after a table was created. create_all() never
+    alters existing tables, so new nullable columns (e.g. row_key / row_hash
+    for incremental sync) are added here.
+    """
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            existing = {c['name'] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                col_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {col_type}'))
+                if column.index:
+                    conn.execute(text(f'CREATE INDEX IF NOT EXISTS ix_{table.name}_{column.name} ON {table.name} ({column.name})'))
+                print(f"Schema upgrade: added {table.name}.{column.name}")
+
+def upgrade_schema(engine):
+    """
+    Bring the database up to date with utils/models: create missing tables,
+    add missing columns, then apply pending migrations.
+    """
+    Base.metadata.create_all(engine)
+    _add_missing_columns(engine)
+    return migrate(engine)
+
 def init_db():
     """Create tables if they don't exist"""
-    engine = get_db_engine()
+    engine = create_db_engine()
     if engine:
         print(f"Connecting to database at {DATABASE_URL.split('@')[1] if '@' in DATABASE_URL else '...'}")
-        Base.metadata.create_all(engine)
-        print("Database initialized successfully (Tables created/verified).")
+        upgrade_schema(engine)
+        print(f"Database initialized successfully (Tables created/verified, schema version {schema_version(engine)}).")
     else:
         print("Failed to initialize database: No Engine.")
 
@@ -0,0 +1,140 @@
+import pandas as pd
+from sqlalchemy import column as sql_column, inspect, select, table as sql_table
+
+from utils.models import Base, ProductionLog, Blok, Front, Commodity, Excavator, Unit, DumpLocation
+
+# ==============================================================================
+# DIMENSIONS
+# ==============================================================================
+# The names production_logs repeats on every row (excavator, front, ...)
+# numbered once in small dimension tables; every row carries the SmallInteger
+# <column>_id of its names. A sync assigns the keys of the rows it writes and
+# drops the names no row references any more, in the same transaction as the
+# write (see utils/sync_manager); schema migration 5 fills them for existing
+# rows (see utils/db_manager.MIGRATIONS). Loaders read the keys and decode
+# them into pandas Categoricals straight from the dimension.
+#
+# The keys replace the text columns: production_logs stores no names (schema
+# migration 6 dropped them). What still needs the names - the sync natural
+# keys and row hashes (on the frame, before the keys are assigned) and the
+# rollups (named_source below) - gets them from the dimensions.
+
+PRODUCTION_DIMENSIONS = {
+    'blok': Blok,
+    'front': Front,
+    'commodity': Commodity,
+    'excavator': Excavator,
+    'dump_truck': Unit,
+    'dump_loc': DumpLocation,
+}
+
+# Source table -> {text column: dimension model}
+DIMENSIONS = {ProductionLog.__tablename__: PRODUCTION_DIMENSIONS}
+
+def key_column(column):
+    """Name of the dimension key column of text column `column`"""
+    return f"{column}_id"
+
+# Every key column (assigned from the frame's names at sync)
+KEY_COLUMNS = {key_column(c) for dims in DIMENSIONS.values() for c in dims}
+
+def _ids(conn, model):
+    """{name: id} of a dimension"""
+    table = model.__table__
+    return dict(conn.execute(select(table.c.name, table.c.id)).fetchall())
+
+def assign_dimension_keys(conn, source_name, frame):
+    """
+    `frame` (model columns of table `source_name`) with the <column>_id key
+    of every dimension column, adding the names the dimensions do not have
+    yet. Runs on `conn`, inside the caller's transaction.
+    """
+    keys = {}
+    for column, model in DIMENSIONS.get(source_name, {}).items():
+        if column not in frame.columns:
+            continue
+        ids = _ids(conn, model)
+        missing = [name for name in frame[column].dropna().unique() if name not in ids]
+        if missing:
+            conn.execute(model.__table__.insert(), [{'name': name} for name in missing])
+            ids = _ids(conn, model)
+        keys[key_column(column)] = frame[column].map(ids).astype('Int64')
+    return frame.assign(**keys)
+
+def prune_dimensions(conn, source_name):
+    """Delete the dimension names no row of table `source_name` references any more"""
+    source = Base.metadata.tables[source_name]
+    for column, model in DIMENSIONS.get(source_name, {}).items():
+        table = model.__table__
+        key = source.c[key_column(column)]
+        conn.execute(table.delete().where(table.c.id.not_in(select(key).where(key.is_not(None)).distinct())))
+
+def named_source(source_name):
+    """
+    Table `source_name` with the names of its keys: a subquery of every
+    column of the table plus each dimension name, labelled as the text
+    column it replaces (rows without a key get NULL).
+    """
+    source = Base.metadata.tables[source_name]
+    dims = DIMENSIONS.get(source_name, {})
+    joined = source
+    for column, model in dims.items():
+        joined = joined.outerjoin(model.__table__, model.__table__.c.id == source.c[key_column(column)])
+    names = [model.__table__.c.name.label(column) for column, model in dims.items()]
+    return select(*source.columns, *names).select_from(joined).subquery(source_name)
+
+def rebuild_dimensions(conn, source_name):
+    """
+    Fill the dimensions of table `source_name` from its legacy text columns
+    and (re)assign the key of every row, in SQL. Only databases from before
+    schema migration 6 have these columns; without them this does nothing.
+    Runs on `conn`, inside the caller's transaction.
+    """
+    dims = DIMENSIONS.get(source_name, {})
+    existing = {c['name'] for c in inspect(conn).get_columns(source_name)}
+    legacy = [c for c in dims if c in existing]
+    if not legacy:
+        return
+    # The text columns are no longer in the models
+    source = sql_table(source_name, *[sql_column(c) for c in legacy], *[sql_column(key_column(c)) for c in legacy])
+    for column in legacy:
+        table = dims[column].__table__
+        text = source.c[column]
+        new_names = select(text).where(text.is_not(None), text.not_in(select(table.c.name))).distinct()
+        conn.execute(table.insert().from_select(['name'], new_names))
+        lookup = select(table.c.id).where(table.c.name == text).scalar_subquery()
+        conn.execute(source.update().values({key_column(column): lookup}))
+    prune_dimensions(conn, source_name)
+
+# ------------------------------------------------------------------------------
+# Loader side
+# ------------------------------------------------------------------------------
+
+def encoded_columns(source_name):
+    """Columns of table `source_name` a loader reads (the keys, decoded by decode_dimensions)"""
+    return [c.name for c in Base.metadata.tables[source_name].columns]
+
+def decode_dimensions(conn, source_name, df):
+    """
+    Replace the <column>_id keys of a frame read from table `source_name`
+    by <column> Categoricals whose categories are the dimension names
+    (sorted). Keys without a name (none synced yet) become NaN.
+    """
+    decoded = {}
+    for column, model in DIMENSIONS.get(source_name, {}).items():
+        key = key_column(column)
+        if key not in df.columns:
+            continue
+        table = model.__table__
+        rows = conn.execute(select(table.c.id, table.c.name).order_by(table.c.name)).fetchall()
+        ids = pd.Index([row[0] for row in rows])
+        codes = ids.get_indexer(pd.to_numeric(df[key]))
+        categories = pd.Index([row[1] for row in rows])
+        decoded[key] = (column, pd.Categorical.from_codes(codes, categories=categories))
+    # One drop for all keys (each drop copies the frame)
+    return df.drop(columns=list(decoded)).assign(**dict(decoded.values()))
+
+def dimension_names(conn, model):
+    """Names of a dimension, sorted"""
+    table = model.__table__
+    return [row[0] for row in conn.execute(select(table.c.name).order_by(table.c.name))]
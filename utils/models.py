@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine, Column, Integer, String, Float, Date, DateTime, Text, BigInteger
+from sqlalchemy import create_engine, Column, Integer, String, Float, Date, DateTime, Text, BigInteger, SmallInteger, Index
 from sqlalchemy.orm import declarative_base
 from datetime import datetime
 
@@ -7,29 +7,52 @@ Base = declarative_base()
 # 1. PRODUCTION (Produksi_UTSG_Harian.xlsx)
 class ProductionLog(Base):
     __tablename__ = 'production_logs'
+    __table_args__ = (
+        # Date range + dashboard filter (migration 1 in utils/db_manager.MIGRATIONS)
+        Index('ix_production_logs_date_shift', 'date', 'shift'),
+        Index('ix_production_logs_date_excavator_id', 'date', 'excavator_id'),
+        Index('ix_production_logs_date_front_id', 'date', 'front_id'),
+        Index('ix_production_logs_date_hour', 'date', 'hour'),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     date = Column(Date, index=True, nullable=False) # 'Date'
     time = Column(String(50))                       # 'Time'
     shift = Column(Integer, default=1)              # 'Shift'
-    blok = Column(String(100))                      # 'BLOK'
-    front = Column(String(100))                     # 'Front'
-    commodity = Column(String(100))                 # 'Commodity' (Fixed typo)
-    excavator = Column(String(100))                 # 'Excavator'
-    dump_truck = Column(String(100))                # 'Dump Truck'
-    dump_loc = Column(String(100))                  # 'Dump Loc'
+    
+    # Names as dimension keys, assigned at sync (utils/dimensions.py); the
+    # names themselves are only stored once, in the dimension tables
+    blok_id = Column(SmallInteger)                  # 'BLOK' -> bloks.id
+    front_id = Column(SmallInteger)                 # 'Front' -> fronts.id
+    commodity_id = Column(SmallInteger)             # 'Commodity' -> commodities.id
+    excavator_id = Column(SmallInteger)             # 'Excavator' -> excavators.id
+    dump_truck_id = Column(SmallInteger)            # 'Dump Truck' -> units.id
+    dump_loc_id = Column(SmallInteger)              # 'Dump Loc' -> dump_locations.id
+    
     rit = Column(Integer, default=0)                # 'Rit'
     tonnase = Column(Float, default=0.0)             # 'Tonnase'
     
+    # Derived from 'Time' at sync (utils/bulk_writer.time_slot_columns)
+    hour = Column(SmallInteger)                        # Hour of day 0-23
+    slot_start = Column(SmallInteger)                  # Slot start, minutes of day
+    slot_end = Column(SmallInteger)                    # Slot end, minutes of day
+    
+    # Incremental sync identity (see utils/sync_manager.incremental_sync_report)
+    row_key = Column(String(64), index=True)           # Natural key digest
+    row_hash = Column(String(40))                      # Content digest
+    
     created_at = Column(DateTime, default=datetime.utcnow)
 
     def __repr__(self):
-        return f"<ProductionLog(date={self.date}, dt={self.dump_truck}, rit={self.rit})>"
+        return f"<ProductionLog(date={self.date}, dt={self.dump_truck_id}, rit={self.rit})>"
 
 
 # 2. DOWNTIME / GANGGUAN (Gangguan_Produksi.xlsx)
 class DowntimeLog(Base):
     __tablename__ = 'downtime_logs'
+    __table_args__ = (
+        Index('ix_downtime_logs_tanggal_alat', 'tanggal', 'alat'),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     tanggal = Column(Date, index=True, nullable=False) # 'Tanggal'
@@ -60,6 +83,15 @@ class DowntimeLog(Base):
     link_lampiran = Column(Text)                       # 'Link/Lampiran'
     extra = Column(Text)                               # 'Extra'
     
+    # Derived from 'Start' / 'End' at sync (utils/bulk_writer.downtime_minutes_columns)
+    start_min = Column(SmallInteger)                   # Minutes of day
+    end_min = Column(SmallInteger)                     # Minutes of day
+    duration_min = Column(SmallInteger)                # end - start, across midnight
+    
+    # Incremental sync identity (see utils/sync_manager.incremental_sync_report)
+    row_key = Column(String(64), index=True)           # Natural key digest
+    row_hash = Column(String(40))                      # Content digest
+    
     created_at = Column(DateTime, default=datetime.utcnow)
 
     def __repr__(self):
@@ -69,6 +101,10 @@ class DowntimeLog(Base):
 # 3. STOCKPILE (Monitoring.xlsx -> Sheet Stockpile Hopper)
 class StockpileLog(Base):
     __tablename__ = 'stockpile_logs'
+    __table_args__ = (
+        Index('ix_stockpile_logs_date_shift', 'date', 'shift'),
+        Index('ix_stockpile_logs_date_hour', 'date', 'hour'),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     date = Column(Date, index=True, nullable=False)    # 'Date'
@@ -78,6 +114,15 @@ class StockpileLog(Base):
     unit = Column(String(100), nullable=True)          # 'Unit'
     ritase = Column(Float, default=0.0)                # 'Ritase'
     
+    # Derived from 'Time' at sync (utils/bulk_writer.time_slot_columns)
+    hour = Column(SmallInteger)                        # Hour of day 0-23
+    slot_start = Column(SmallInteger)                  # Slot start, minutes of day
+    slot_end = Column(SmallInteger)                    # Slot end, minutes of day
+    
+    # Incremental sync identity (see utils/sync_manager.incremental_sync_report)
+    row_key = Column(String(64), index=True)           # Natural key digest
+    row_hash = Column(String(40))                      # Content digest
+    
     created_at = Column(DateTime, default=datetime.utcnow)
 
     def __repr__(self):
@@ -89,7 +134,7 @@ class ShippingLog(Base):
     __tablename__ = 'shipping_logs'
 
     id = Column(Integer, primary_key=True)
-    tanggal = Column(Date)                              # 'Tanggal' (Matched to Excel)
+    tanggal = Column(Date, index=True)                 # 'Tanggal' (Matched to Excel)
     shift = Column(Integer)                            # 'Shift'
     ap_ls = Column(Float, default=0.0)                 # 'AP_LS'
     ap_ls_mk3 = Column(Float, default=0.0)             # 'AP_LS_MK3'
@@ -97,6 +142,10 @@ class ShippingLog(Base):
     total_ls = Column(Float, default=0.0)              # 'Total_LS'
     total_ss = Column(Float, default=0.0)              # 'Total SS'
     
+    # Incremental sync identity (see utils/sync_manager.incremental_sync_report)
+    row_key = Column(String(64), index=True)           # Natural key digest
+    row_hash = Column(String(40))                      # Content digest
+    
     created_at = Column(DateTime, default=datetime.utcnow)
 
     def __repr__(self):
@@ -131,6 +180,10 @@ class DailyPlanLog(Base):
     # Let's add a 'type' column to distinguish Schema vs Realisasi if needed.
     # For now, adhering to load_daily_plan columns.
     
+    # Incremental sync identity (see utils/sync_manager.incremental_sync_report)
+    row_key = Column(String(64), index=True)           # Natural key digest
+    row_hash = Column(String(40))                      # Content digest
+    
     created_at = Column(DateTime, default=datetime.utcnow)
 
 # 6. TARGET LOGS (From Analisa Produksi)
@@ -141,11 +194,163 @@ class TargetLog(Base):
     date = Column(Date, index=True, nullable=False)    # 'Date'
     plan = Column(Float, default=0.0)                  # 'Plan' (Target Production)
     
+    # Incremental sync identity (see utils/sync_manager.incremental_sync_report)
+    row_key = Column(String(64), index=True)           # Natural key digest
+    row_hash = Column(String(40))                      # Content digest
+    
     created_at = Column(DateTime, default=datetime.utcnow)
 
     def __repr__(self):
         return f"<TargetLog(date={self.date}, plan={self.plan})>"
 
+# 6b. PRODUCTION ROLLUPS (Maintained by the sync, see utils/rollups.py)
+# Sums of production_logs per key; NULL keys are kept so per-date totals add up.
+# The active_* sums only count rows with tonnase > 0, as the Produksi and
+# Ritase charts do.
+class ProductionDaily(Base):
+    __tablename__ = 'production_daily'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    date = Column(Date, index=True, nullable=False)
+    shift = Column(Integer)
+    tonnase = Column(Float, default=0.0)
+    rit = Column(Integer, default=0)
+    row_count = Column(Integer, default=0)
+    active_tonnase = Column(Float, default=0.0)        # Same sums over the rows with tonnase > 0
+    active_rit = Column(Integer, default=0)
+    active_row_count = Column(Integer, default=0)
+
+    def __repr__(self):
+        return f"<ProductionDaily(date={self.date}, shift={self.shift}, ton={self.tonnase})>"
+
+class ProductionFrontDaily(Base):
+    __tablename__ = 'production_front_daily'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    date = Column(Date, index=True, nullable=False)
+    shift = Column(Integer)
+    front = Column(String(100))
+    commodity = Column(String(100))
+    tonnase = Column(Float, default=0.0)
+    rit = Column(Integer, default=0)
+    row_count = Column(Integer, default=0)
+    active_tonnase = Column(Float, default=0.0)        # Same sums over the rows with tonnase > 0
+    active_rit = Column(Integer, default=0)
+    active_row_count = Column(Integer, default=0)
+
+    def __repr__(self):
+        return f"<ProductionFrontDaily(date={self.date}, front={self.front}, ton={self.tonnase})>"
+
+class ProductionShiftUnit(Base):
+    __tablename__ = 'production_shift_unit'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    date = Column(Date, index=True, nullable=False)
+    shift = Column(Integer)
+    excavator = Column(String(100))
+    front = Column(String(100))
+    commodity = Column(String(100))
+    tonnase = Column(Float, default=0.0)
+    rit = Column(Integer, default=0)
+    row_count = Column(Integer, default=0)
+    active_tonnase = Column(Float, default=0.0)        # Same sums over the rows with tonnase > 0
+    active_rit = Column(Integer, default=0)
+    active_row_count = Column(Integer, default=0)
+
+    def __repr__(self):
+        return f"<ProductionShiftUnit(date={self.date}, excavator={self.excavator}, ton={self.tonnase})>"
+
+class ProductionDumpDaily(Base):
+    __tablename__ = 'production_dump_daily'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    date = Column(Date, index=True, nullable=False)
+    shift = Column(Integer)
+    dump_loc = Column(String(100))
+    tonnase = Column(Float, default=0.0)
+    rit = Column(Integer, default=0)
+    row_count = Column(Integer, default=0)
+    active_tonnase = Column(Float, default=0.0)        # Same sums over the rows with tonnase > 0
+    active_rit = Column(Integer, default=0)
+    active_row_count = Column(Integer, default=0)
+
+    def __repr__(self):
+        return f"<ProductionDumpDaily(date={self.date}, dump_loc={self.dump_loc}, ton={self.tonnase})>"
+
+class ProductionTruckDaily(Base):
+    __tablename__ = 'production_truck_daily'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    date = Column(Date, index=True, nullable=False)
+    shift = Column(Integer)
+    dump_truck = Column(String(100))
+    tonnase = Column(Float, default=0.0)
+    rit = Column(Integer, default=0)
+    row_count = Column(Integer, default=0)
+    active_tonnase = Column(Float, default=0.0)        # Same sums over the rows with tonnase > 0
+    active_rit = Column(Integer, default=0)
+    active_row_count = Column(Integer, default=0)
+
+    def __repr__(self):
+        return f"<ProductionTruckDaily(date={self.date}, dump_truck={self.dump_truck}, rit={self.rit})>"
+
+# 6c. DIMENSIONS (Maintained by the sync, see utils/dimensions.py)
+# One row per distinct name referenced by production_logs; the fact rows
+# carry the id in a SmallInteger <column>_id next to the text column.
+class Blok(Base):
+    __tablename__ = 'bloks'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String(100), unique=True, nullable=False)
+
+    def __repr__(self):
+        return f"<Blok({self.id}={self.name})>"
+
+class Front(Base):
+    __tablename__ = 'fronts'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String(100), unique=True, nullable=False)
+
+    def __repr__(self):
+        return f"<Front({self.id}={self.name})>"
+
+class Commodity(Base):
+    __tablename__ = 'commodities'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String(100), unique=True, nullable=False)
+
+    def __repr__(self):
+        return f"<Commodity({self.id}={self.name})>"
+
+class Excavator(Base):
+    __tablename__ = 'excavators'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String(100), unique=True, nullable=False)
+
+    def __repr__(self):
+        return f"<Excavator({self.id}={self.name})>"
+
+class Unit(Base):
+    __tablename__ = 'units'                           # Dump trucks
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String(100), unique=True, nullable=False)
+
+    def __repr__(self):
+        return f"<Unit({self.id}={self.name})>"
+
+class DumpLocation(Base):
+    __tablename__ = 'dump_locations'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String(100), unique=True, nullable=False)
+
+    def __repr__(self):
+        return f"<DumpLocation({self.id}={self.name})>"
+
 # 7. SYSTEM LOGS (For Sync Status)
 class SystemLog(Base):
     __tablename__ = 'system_logs'
@@ -156,3 +361,29 @@ class SystemLog(Base):
 
     def __repr__(self):
         return f"<SystemLog({self.key}={self.value})>"
+
+# 8. SYNC RUNS (One row per source per sync run)
+class SyncRun(Base):
+    __tablename__ = 'sync_runs'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    run_id = Column(String(32), index=True)            # Shared by all sources of one run
+    started_at = Column(DateTime, index=True)          # Run start (UTC)
+    source = Column(String(50))                        # ONEDRIVE_LINKS key, e.g. 'monitoring'
+    outcome = Column(String(20))                       # success / unchanged / empty / failed
+    
+    download_bytes = Column(BigInteger, default=0)
+    download_ms = Column(Integer, default=0)
+    parse_ms = Column(Integer, default=0)
+    rows_parsed = Column(Integer, default=0)           # Rows returned by the parsers
+    rows_kept = Column(Integer, default=0)             # Rows left after the year filter
+    rows_dropped = Column(Integer, default=0)          # Stream + parser + year filter
+    stream_dropped = Column(Integer, default=0)        # Dated before the window, never parsed
+    parser_dropped = Column(Integer, default=0)        # Filled rows the parsers filtered out
+    write_ms = Column(Integer, default=0)              # Stage + apply, all tables of the source
+    error = Column(Text)
+    
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<SyncRun(run={self.run_id}, source={self.source}, outcome={self.outcome})>"
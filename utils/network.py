@@ -1,14 +1,31 @@
+import os
 import requests
-from io import BytesIO
+import tempfile
 import base64
+import hashlib
 import time
 
+REQUEST_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+}
+
+MB = 1024 * 1024
+DOWNLOAD_CHUNK_SIZE = 256 * 1024
+# Downloads stay in memory up to this size, then spill to a temp file on disk
+DOWNLOAD_SPOOL_BYTES = int(float(os.getenv("DOWNLOAD_SPOOL_MB", "8")) * MB)
+# Hard cap per workbook; larger bodies abort the download
+DOWNLOAD_MAX_BYTES = int(float(os.getenv("DOWNLOAD_MAX_MB", "200")) * MB)
+
 def convert_onedrive_link(share_link, cache_bust=False):
     """Convert OneDrive share link ke direct download link"""
     if not share_link or not isinstance(share_link, str) or share_link.strip() == "":
         return None
     
     share_link = share_link.strip()
+
+    # STRATEGY 0: Already a direct download URL (e.g. benchmarks.fake_onedrive)
+    if "download=1" in share_link.split('?', 1)[-1].split('&'):
+        return f"{share_link}&t={int(time.time())}" if cache_bust else share_link
     
     # STRATEGY 1: Simple 'download=1' param replacement
     if "1drv.ms" in share_link or "onedrive.live.com" in share_link:
@@ -32,8 +49,44 @@ def convert_onedrive_link(share_link, cache_bust=False):
     except Exception:
         return None
 
-def download_from_onedrive(share_link, timeout=60, cache_bust=True):
-    """Download file from OneDrive"""
+def stream_to_spool(response, progress=None, max_bytes=None):
+    """
+    Copy a streamed response body chunk by chunk into a SpooledTemporaryFile
+    (in memory up to DOWNLOAD_SPOOL_BYTES, on disk beyond that).
+    Returns (file positioned at 0, sha256 hex digest, size in bytes).
+    progress(done_bytes, total_bytes or None) is called after every chunk.
+    """
+    max_bytes = DOWNLOAD_MAX_BYTES if max_bytes is None else max_bytes
+    total = int(response.headers.get('Content-Length') or 0) or None
+    if max_bytes and total and total > max_bytes:
+        response.close()
+        raise ValueError(f"File too large: {total/MB:.1f} MB (limit {max_bytes/MB:.0f} MB)")
+    
+    spool = tempfile.SpooledTemporaryFile(max_size=DOWNLOAD_SPOOL_BYTES)
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+            if not chunk:
+                continue
+            size += len(chunk)
+            if max_bytes and size > max_bytes:
+                raise ValueError(f"File too large: over {max_bytes/MB:.0f} MB")
+            digest.update(chunk)
+            spool.write(chunk)
+            if progress:
+                progress(size, total)
+    except Exception:
+        spool.close()
+        raise
+    finally:
+        response.close()
+    
+    spool.seek(0)
+    return spool, digest.hexdigest(), size
+
+def download_from_onedrive(share_link, timeout=60, cache_bust=True, progress=None, max_bytes=None):
+    """Download file from OneDrive (file-like object, see stream_to_spool)"""
     direct_url = convert_onedrive_link(share_link, cache_bust=cache_bust)
     
     if not direct_url:
@@ -41,15 +94,62 @@ def download_from_onedrive(share_link, timeout=60, cache_bust=True):
         return None
     
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }
-        response = requests.get(direct_url, headers=headers, timeout=timeout)
+        response = requests.get(direct_url, headers=REQUEST_HEADERS, timeout=timeout, stream=True)
         response.raise_for_status()
-        print(f"Download success. Size: {len(response.content)/1024:.2f} KB")
-        return BytesIO(response.content)
+        spool, _, size = stream_to_spool(response, progress, max_bytes)
+        print(f"Download success. Size: {size/1024:.2f} KB")
+        return spool
     except Exception as e:
         print(f"Download error: {e}")
         if cache_bust:
              raise e
         return None
+
+def fetch_from_onedrive(share_link, timeout=60, etag=None, last_modified=None, sha256=None,
+                        progress=None, max_bytes=None):
+    """
+    Conditional download for sync. Sends If-None-Match / If-Modified-Since
+    from the previous fetch (no cache-busting param, so validators apply)
+    and compares the SHA-256 of the body with the previous digest.
+    
+    Returns None for an invalid link, else a dict:
+      changed       - False on 304 or identical bytes
+      buffer        - workbook file object (None when unchanged)
+      etag, last_modified, sha256, size
+    Network / HTTP errors are raised to the caller.
+    """
+    direct_url = convert_onedrive_link(share_link, cache_bust=False)
+    if not direct_url:
+        print(f"Invalid OneDrive link provided.")
+        return None
+    
+    headers = dict(REQUEST_HEADERS)
+    headers['Cache-Control'] = 'no-cache'  # Revalidate with origin, never a stale proxy copy
+    if etag: headers['If-None-Match'] = etag
+    if last_modified: headers['If-Modified-Since'] = last_modified
+    
+    response = requests.get(direct_url, headers=headers, timeout=timeout, stream=True)
+    if response.status_code == 304:
+        response.close()
+        print("Not modified (304).")
+        return {'changed': False, 'buffer': None, 'etag': etag,
+                'last_modified': last_modified, 'sha256': sha256, 'size': 0}
+    try:
+        response.raise_for_status()
+    except Exception:
+        response.close()
+        raise
+    
+    spool, digest, size = stream_to_spool(response, progress, max_bytes)
+    changed = digest != sha256
+    if not changed:
+        spool.close()
+    print(f"Download success. Size: {size/1024:.2f} KB ({'changed' if changed else 'identical content'})")
+    return {
+        'changed': changed,
+        'buffer': spool if changed else None,
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified'),
+        'sha256': digest,
+        'size': size,
+    }
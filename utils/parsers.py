@@ -1,6 +1,14 @@
+import numpy as np
+import os
 import pandas as pd
 import re
-from datetime import datetime, timedelta, time
+from hashlib import sha256
+from io import BytesIO
+from datetime import date, datetime, timedelta, time
+from functools import lru_cache
+from importlib.util import find_spec
+from itertools import chain, islice
+from openpyxl.cell.cell import ERROR_CODES
 
 # ============================================================
 # PARSING HELPERS
@@ -43,53 +51,660 @@ def parse_excel_time(time_val):
         return time_val
     except: return None
 
+# Excel day serials: days since 1899-12-30 (Excel's 1900 leap-year bug included)
+EXCEL_EPOCH = pd.Timestamp(1899, 12, 30)
+# Serials datetime64[ns] can hold (1677..2262); larger ones are left as NaT
+_SERIAL_BOUNDS = ((date(1677, 9, 22) - date(1899, 12, 30)).days, (date(2262, 4, 11) - date(1899, 12, 30)).days)
+
+def _dates_from_serials(values):
+    """Day serials (floats) -> datetime64[ns]; fractions dropped, like int(value)"""
+    days = np.trunc(np.asarray(values, dtype=float))
+    days[~((days >= _SERIAL_BOUNDS[0]) & (days <= _SERIAL_BOUNDS[1]))] = np.nan
+    return pd.to_datetime(days, unit='D', origin=EXCEL_EPOCH)
+
+def _naive(stamp):
+    """Timestamp without its time zone (wall-clock kept, like .date())"""
+    return stamp.tz_localize(None) if stamp.tzinfo is not None else stamp
+
+def _dates_from_objects(values, parse):
+    """datetime64[ns] from `parse` over whole array; per value when types/zones are mixed"""
+    try:
+        stamps = pd.DatetimeIndex(parse(values))
+        return (stamps.tz_localize(None) if stamps.tz is not None else stamps).as_unit('ns')
+    except Exception:
+        out = []
+        for value in values:
+            try:
+                stamp = parse(value)
+                out.append(_naive(stamp) if pd.notna(stamp) else pd.NaT)
+            except Exception:
+                out.append(pd.NaT)
+        return pd.DatetimeIndex(out).as_unit('ns')
+
+def _dates_from_strings(values):
+    """
+    Date strings -> datetime64[ns], each distinct string parsed once: ISO
+    dates in one vectorized pass, anything else the way pd.to_datetime
+    reads a single string.
+    """
+    uniques = pd.unique(np.asarray(values, dtype=object))
+    parsed = pd.Series(_dates_from_objects(uniques, lambda v: pd.to_datetime(v, format='ISO8601', errors='coerce')),
+                       index=uniques)
+    rest = parsed.isna().to_numpy()
+    if rest.any():
+        # one at a time: an array would be read with the first string's format
+        parsed[rest] = _dates_from_objects(uniques[rest], lambda v: [pd.to_datetime(x, errors='coerce') for x in v])
+    return pd.DatetimeIndex(parsed.reindex(values).to_numpy())
+
+# Cell type -> 1 datetime, 2 number, 3 string, 4 anything else (not a date)
+_DATE_KINDS = {datetime: 1, pd.Timestamp: 1, int: 2, float: 2, bool: 2, str: 3, type(None): 4}
+
+def _date_kind(value):
+    if isinstance(value, (datetime, pd.Timestamp)): return 1
+    if isinstance(value, (int, float)): return 2
+    if isinstance(value, str): return 3
+    return 4
+
 def safe_parse_date_column(date_series):
-    return date_series.apply(parse_excel_date)
+    """
+    Excel date column -> datetime64[ns] at midnight (NaT when not a date).
+    Same rules as parse_excel_date, one pass per kind of cell: datetimes
+    are truncated to the day, numbers read as Excel day serials, strings
+    parsed by pd.to_datetime.
+    """
+    series = pd.Series(date_series)
+    if pd.api.types.is_datetime64_any_dtype(series):
+        if getattr(series.dt, 'tz', None) is not None:
+            series = series.dt.tz_localize(None)
+        return series.dt.normalize().astype('datetime64[ns]')
+
+    out = pd.Series(pd.NaT, index=series.index, dtype='datetime64[ns]')
+    if pd.api.types.is_bool_dtype(series) or pd.api.types.is_numeric_dtype(series):
+        out[:] = _dates_from_serials(series.to_numpy(dtype=float, na_value=np.nan))
+        return out
+
+    values = series.to_numpy(dtype=object)
+    kinds = np.array([_DATE_KINDS.get(type(v)) or _date_kind(v) for v in values], dtype=np.int8)
+    for kind, convert in ((1, lambda v: _dates_from_objects(v, pd.to_datetime)),
+                          (2, lambda v: _dates_from_serials(v.astype(float))),
+                          (3, _dates_from_strings)):
+        mask = kinds == kind
+        if mask.any():
+            out[mask] = convert(values[mask])
+    return out.dt.normalize()
+
+# 'PC 850 01', 'PC850-01', 'PC85001', 'PC-400-05' ... -> 'PC 850-01'
+_EXCAVATOR_NOISE = re.compile(r'[^A-Z0-9]')
+_EXCAVATOR_COMPACT = re.compile(r'^PC(\d{3})(\d{2})$')
+_EXCAVATOR_SPACED = re.compile(r'^PC[-\s]*(\d{3})[-\s]*(\d{2})$')
+
+@lru_cache(maxsize=4096)
+def _normalize_excavator_text(name):
+    # Memoized per process; the sync worker keeps its parser processes between
+    # syncs (sync_manager.run_worker), so a few dozen names are parsed once
+    name = name.strip().upper()
+    match = _EXCAVATOR_COMPACT.match(_EXCAVATOR_NOISE.sub('', name)) or _EXCAVATOR_SPACED.match(name)
+    if match: return f"PC {match.group(1)}-{match.group(2)}"
+    return name
 
 def normalize_excavator_name(name):
     if pd.isna(name) or not isinstance(name, str):
         return name
-    name = str(name).strip().upper()
-    clean = re.sub(r'[^A-Z0-9]', '', name)
-    match = re.match(r'^PC(\d{3})(\d{2})$', clean)
-    if match: return f"PC {match.group(1)}-{match.group(2)}"
-    match = re.match(r'^PC[-\s]*(\d{3})[-\s]*(\d{2})$', name)
-    if match: return f"PC {match.group(1)}-{match.group(2)}"
-    return name
+    return _normalize_excavator_text(str(name))
 
 def normalize_excavator_column(df):
+    """normalize_excavator_name once per distinct value of df['Excavator']"""
     if 'Excavator' in df.columns:
-        df['Excavator'] = df['Excavator'].apply(normalize_excavator_name)
+        col = df['Excavator']
+        codes, uniques = pd.factorize(col)
+        names = np.array([normalize_excavator_name(v) for v in uniques] + [None], dtype=object)
+        changed = np.append(names[:-1] != np.asarray(uniques, dtype=object), False)
+        hit = changed[codes]  # code -1 (missing) hits the trailing False
+        if hit.any():
+            df['Excavator'] = col.mask(hit, pd.Series(names[codes], index=col.index))
     return df
 
+# ============================================================
+# ROW VALIDITY (column-wise "has real data" tests)
+# ============================================================
+# The parsers drop rows that only carry a date (and a shift). These are the
+# per-cell tests they used to run row by row, evaluated on whole columns.
+# Text cells go through the original Python test once per distinct value.
+
+def _float_test(value, test):
+    try:
+        return test(float(value))
+    except Exception:
+        return False
+
+def _is_zero(value):
+    return _float_test(value, lambda v: v == 0)
+
+def _is_positive(value):
+    return _float_test(value, lambda v: v > 0)
+
+def _by_distinct(series, func):
+    """func(value) per distinct value of an object column, mapped back"""
+    values = pd.unique(series.to_numpy(dtype=object))
+    lookup = {v: func(v) for v in values}
+    return series.map(lookup).to_numpy(dtype=bool)
+
+def has_data(series, blank=('', '-', 'nan', 'None'), lower=False, zero_is_blank=False):
+    """
+    Per cell: not null, str(value).strip() (lower-cased when `lower`) not in
+    `blank`, and - with zero_is_blank - not a number equal to zero
+    (float(value) == 0). Boolean ndarray.
+    """
+    if pd.api.types.is_bool_dtype(series) or pd.api.types.is_numeric_dtype(series):
+        # str() of a number is never blank; NaN is the only 'nan'
+        mask = series.notna()
+        if zero_is_blank:
+            mask &= series != 0
+        return mask.to_numpy(dtype=bool)
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series.notna().to_numpy(dtype=bool)
+
+    present = series.notna().to_numpy(dtype=bool)
+    text = series.astype(object).where(present, '').astype(str).str.strip()
+    if lower:
+        text = text.str.lower()
+    mask = present & ~text.isin(blank).to_numpy(dtype=bool)
+    if zero_is_blank and mask.any():
+        mask[mask] = ~_by_distinct(series[mask], _is_zero)
+    return mask
+
+def positive_number(series):
+    """Per cell: float(value) > 0 (values float() rejects are False). Boolean ndarray"""
+    if pd.api.types.is_bool_dtype(series) or pd.api.types.is_numeric_dtype(series):
+        return (series > 0).fillna(False).to_numpy(dtype=bool)
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return np.zeros(len(series), dtype=bool)
+    mask = np.zeros(len(series), dtype=bool)
+    present = series.notna().to_numpy(dtype=bool)
+    if present.any():
+        mask[present] = _by_distinct(series[present], _is_positive)
+    return mask
+
+def any_has_data(df, columns, **kwargs):
+    """Row mask: has_data() in at least one of `columns` (missing columns count as empty)"""
+    mask = np.zeros(len(df), dtype=bool)
+    for col in columns:
+        if col in df.columns:
+            mask |= has_data(df[col], **kwargs)
+    return mask
+
+# Production: any of these holds a non-blank, non-zero value
+# ('Tonnase' is renamed to 'Tonase' before the check, so it never counts)
+PRODUCTION_DATA_COLUMNS = ['Time', 'Excavator', 'Dump Truck', 'Front', 'Commodity',
+                           'Dump Loc', 'BLOK', 'Rit', 'Tonnase']
+STOCKPILE_BLANK = ('', '-', 'nan', 'unknown', 'none')
+
+def production_valid_mask(df):
+    """Rows with real data besides Date/Shift (Shift alone is not enough)"""
+    return pd.Series(any_has_data(df, PRODUCTION_DATA_COLUMNS, zero_is_blank=True), index=df.index)
+
+def stockpile_valid_mask(df, final=False):
+    """
+    Ritase > 0, or real text in Loader / Unit / Jam. The final pass (after
+    the defaults are filled in) also counts Shift and keeps 'none'.
+    """
+    rit = positive_number(df['Ritase']) if 'Ritase' in df.columns else np.zeros(len(df), dtype=bool)
+    if final:
+        text = any_has_data(df, ['Loader', 'Unit', 'Jam', 'Shift'], blank=STOCKPILE_BLANK[:-1], lower=True)
+    else:
+        text = any_has_data(df, ['Loader', 'Unit', 'Jam'], blank=STOCKPILE_BLANK, lower=True)
+    return pd.Series(rit | text, index=df.index)
+
+# ============================================================
+# READER BACKENDS (pd.ExcelFile engines)
+# ============================================================
+# Fastest first. calamine (Rust, optional python-calamine package) reads
+# our workbooks several times faster than openpyxl into identical frames
+# (python -m benchmarks.bench_readers); openpyxl is always installed and
+# is the fallback. EXCEL_READER=openpyxl|calamine pins one engine.
+EXCEL_READERS = ['calamine', 'openpyxl']
+EXCEL_READER = os.getenv("EXCEL_READER", "").strip().lower() or None
+READER_MODULES = {'calamine': 'python_calamine', 'openpyxl': 'openpyxl'}
+
+@lru_cache(maxsize=None)
+def reader_installed(engine):
+    return find_spec(READER_MODULES.get(engine, engine)) is not None
+
+def available_readers(preferred=None):
+    """Engines to try, in order: `preferred` (or EXCEL_READER) first, then the installed ones"""
+    preferred = preferred or EXCEL_READER
+    order = ([preferred] if preferred else []) + [e for e in EXCEL_READERS if e != preferred]
+    return [e for e in order if reader_installed(e)]
+
+def _openpyxl_rows(book, sheet, min_row, min_col=0, max_col=None):
+    ws = book[sheet]
+    ws.reset_dimensions()  # Stored dimensions can be stale; read what is there
+    for values in ws.iter_rows(min_row=min_row + 1, min_col=min_col + 1, max_col=max_col, values_only=True):
+        yield tuple(_stream_cell(v) for v in values)
+
+def _calamine_rows(book, sheet, min_row, min_col=0, max_col=None):
+    ws = book.get_sheet_by_name(sheet)
+    # iter_rows() starts at the first used column; shift the range to match
+    first = ws.start[1] if ws.start else 0
+    lead = ('',) * max(first - min_col, 0)
+    lo = max(min_col - first, 0)
+    hi = None if max_col is None else max(max_col - first, 0)
+    for values in islice(ws.iter_rows(), min_row, None):
+        yield tuple(_calamine_cell(v) for v in chain(lead, values[lo:hi]))
+
+# Engine -> row iterator over its book (read-only, lazily converted rows)
+ROW_READERS = {'openpyxl': _openpyxl_rows, 'calamine': _calamine_rows}
+
+# Engines whose row iterator loads the whole sheet first (calamine has no
+# row-range read) -> the engine that streams it in bounded memory instead.
+# Used for the rows() of a min_date stream, which skips the sheet's history:
+# openpyxl holds far less at once there, but parses several times slower.
+BOUNDED_READERS = {'calamine': 'openpyxl'}
+
+# ============================================================
+# WORKBOOK HANDLE (open once, read each sheet once)
+# ============================================================
+
+def _header_names(row):
+    """read_excel column names: blank -> 'Unnamed: i', repeats -> 'name.1'"""
+    names, seen = [], {}
+    for i, val in enumerate(row):
+        name = f"Unnamed: {i}" if pd.isna(val) else val
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+def _infer_column(values):
+    col = pd.Series(values, dtype=object)
+    try:
+        return pd.to_numeric(col)  # read_excel turns numeric text ('1') into numbers too
+    except (ValueError, TypeError):
+        return col.infer_objects()
+
+def frame_from_raw(raw, header=0):
+    """
+    Same result as pd.read_excel(..., header=header), built from a sheet
+    already read with header=None: names from row `header` (blank ->
+    'Unnamed: i', repeats -> 'name.1'), dtypes re-inferred below it.
+    """
+    row = raw.iloc[header] if header < len(raw) else [None] * raw.shape[1]
+    names = _header_names(row)
+    body = raw.iloc[header + 1:]
+    columns = {name: _infer_column(body.iloc[:, i].tolist()) for i, name in enumerate(names)}
+    return pd.DataFrame(columns, columns=names)
+
+HEADER_SCAN_ROWS = 2048
+
+def _header_patterns(groups):
+    return ['|'.join(re.escape(w) for w in words) for words in groups]
+
+def _header_positions(block, patterns):
+    """Positions of the rows of a header=None block matching every pattern"""
+    # Numeric / datetime columns cannot hold header words
+    text_cols = [c for c in block.columns
+                 if not (pd.api.types.is_numeric_dtype(block[c]) or pd.api.types.is_datetime64_any_dtype(block[c]))]
+    if not text_cols or block.empty:
+        return np.array([], dtype=int)
+    # fillna: string-dtype columns keep their empty cells as NaN, which str.cat spreads to the row
+    cells = [block[c].astype(str).fillna('') for c in text_cols]
+    text = cells[0].str.cat(cells[1:], sep=' ').str.lower() if len(cells) > 1 else cells[0].str.lower()
+    match = np.ones(len(block), dtype=bool)
+    for pattern in patterns:
+        match &= text.str.contains(pattern, regex=True).to_numpy(dtype=bool)
+    return np.flatnonzero(match)
+
+def _row_matches(row, groups):
+    """One row (tuple or Series of values) passes find_header_row()'s matcher"""
+    return len(_header_positions(pd.DataFrame([tuple(row)]), _header_patterns(groups))) > 0
+
+def find_header_row(raw, groups, start=0, chunk=HEADER_SCAN_ROWS):
+    """
+    First row at or after `start` of a header=None sheet where every group
+    of words has one word in some cell, e.g. [('date', 'tanggal'), ('shift',)].
+    Vectorized over blocks of `chunk` rows, stopping at the first block
+    with a match. None when no row matches.
+    """
+    patterns = _header_patterns(groups)
+    for offset in range(start, len(raw), chunk):
+        block = raw.iloc[offset:offset + chunk]
+        rows = _header_positions(block, patterns)
+        if len(rows):
+            return int(block.index[rows[0]])
+    return None
+
+def _header_blocks(rows, groups, chunk=HEADER_SCAN_ROWS):
+    """
+    find_header_row()'s matcher over an iterator of row tuples
+    (Workbook.rows): yields (block, positions of the matching rows in it)
+    for consecutive blocks of `chunk` rows
+    """
+    patterns = _header_patterns(groups)
+    while True:
+        block = list(islice(rows, chunk))
+        if not block:
+            return
+        width = max(len(row) for row in block)
+        frame = pd.DataFrame([row + (np.nan,) * (width - len(row)) for row in block])
+        yield block, _header_positions(frame, patterns)
+
+def layout_fingerprint(sheet_names):
+    """
+    Short digest of a workbook's sheet list (names, in order). A header row
+    found in one version of a workbook is only a hint for versions with the
+    same layout: a sheet added, removed, renamed or moved voids the hints.
+    """
+    return sha256('\n'.join(str(s) for s in sheet_names).encode()).hexdigest()[:12]
+
+class Workbook:
+    """
+    One open workbook shared by several parsers. The file is decompressed
+    and indexed once; each sheet is read at most once (header=None) and
+    header-based frames are derived from that cached read.
+    Every parser accepts a Workbook or anything pd.ExcelFile accepts.
+
+    header_hints ({sheet: (layout, row)}) are header positions found in an
+    earlier version of the same workbook, under its layout fingerprint (see
+    layout_fingerprint); only the ones of the current layout are kept, in
+    self.header_hints ({sheet: row}). locate_header() and SheetStream try
+    them first and record what they find there; located_hints() returns
+    them keyed for the next version. self.dated ({sheet: bool}) records
+    whether each sheet streamed with a min_date had its date column, and
+    self.dropped counts the rows read but not returned: 'stream' (dated
+    before a SheetStream's min_date) and 'parser' (see count_parser_drops).
+
+    engine pins a reader backend; by default the first of
+    available_readers() that opens the file is used (self.engine).
+    """
+    def __init__(self, source, header_hints=None, engine=None):
+        self._source = source
+        self._bounded = None  # pd.ExcelFile of BOUNDED_READERS[engine], opened on demand
+        self.xls = None
+        for name in available_readers(engine):
+            try:
+                self.xls = pd.ExcelFile(source, engine=name)
+                break
+            except:
+                if hasattr(source, 'seek'): source.seek(0)
+        if self.xls is None:
+            self.xls = pd.ExcelFile(source)
+        self._raw = {}
+        self.layout = layout_fingerprint(self.sheet_names)
+        self.header_hints = {sheet: row for sheet, (layout, row) in (header_hints or {}).items()
+                             if layout == self.layout}
+        self.dated = {}
+        self.dropped = {'stream': 0, 'parser': 0}
+
+    @property
+    def engine(self):
+        return self.xls.engine
+
+    @property
+    def sheet_names(self):
+        return self.xls.sheet_names
+
+    def raw(self, sheet):
+        """Sheet read with header=None (cached)"""
+        if sheet not in self._raw:
+            self._raw[sheet] = pd.read_excel(self.xls, sheet_name=sheet, header=None)
+        return self._raw[sheet]
+
+    def frame(self, sheet, header=0):
+        """Sheet as pd.read_excel(..., header=header) would return it"""
+        return frame_from_raw(self.raw(sheet), header)
+
+    def streaming(self, sheet):
+        """True when rows() streams `sheet` from the file instead of raw()"""
+        return sheet not in self._raw and self.engine in ROW_READERS
+
+    def rows(self, sheet, min_row=0, min_col=0, max_col=None, bounded=False):
+        """
+        Lazily iterate the sheet's rows from row index `min_row` (0-based, as
+        in raw()) as tuples of values, without building a DataFrame. Streams
+        the book pd.ExcelFile opened (see ROW_READERS); other engines and
+        cached sheets use raw(). min_col/max_col (0-based, max exclusive)
+        keep a column range; rows can come back shorter than it.
+        bounded=True streams engines that load whole sheets with their
+        BOUNDED_READERS engine instead (same values, bounded memory).
+        """
+        if not self.streaming(sheet):
+            yield from self.raw(sheet).iloc[min_row:, min_col:max_col].itertuples(index=False, name=None)
+            return
+        if bounded and self.engine in BOUNDED_READERS:
+            book = self._bounded_book()
+            if book is not None:
+                yield from ROW_READERS[BOUNDED_READERS[self.engine]](book, sheet, min_row, min_col, max_col)
+                return
+        yield from ROW_READERS[self.engine](self.xls.book, sheet, min_row, min_col, max_col)
+
+    def _bounded_book(self):
+        if self._bounded is None:
+            engine = BOUNDED_READERS[self.engine]
+            if not reader_installed(engine):
+                return None
+            if hasattr(self._source, 'seek'): self._source.seek(0)
+            self._bounded = pd.ExcelFile(self._source, engine=engine)
+        return self._bounded.book
+
+    def locate_header(self, sheet, groups, start=0):
+        """Header row of `sheet` (see find_header_row): the hinted row if it still matches, else a scan"""
+        raw = self.raw(sheet)
+        hint = self.header_hints.get(sheet)
+        if hint is not None and start <= hint < len(raw) and _row_matches(raw.iloc[hint], groups):
+            return hint
+        found = find_header_row(raw, groups, start)
+        if found is not None:
+            self.header_hints[sheet] = found
+        return found
+
+    def located_hints(self):
+        """self.header_hints keyed by this workbook's layout, for header_hints"""
+        return {sheet: (self.layout, row) for sheet, row in self.header_hints.items()}
+
+    def covers_min_date(self, sheets=None):
+        """
+        True when `sheets` (default: all) were streamed with a min_date and
+        each had its date column, so no kept row means none dated since
+        """
+        dated = [v for sheet, v in self.dated.items() if sheets is None or sheet in sheets]
+        return bool(dated) and all(dated)
+
+    def close(self):
+        self._raw.clear()
+        if self._bounded is not None:
+            self._bounded.close()
+        self.xls.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def open_workbook(source):
+    return source if isinstance(source, Workbook) else Workbook(source)
+
+def filled_rows(frame):
+    """Rows of `frame` with at least one value"""
+    return int(frame.notna().any(axis=1).sum())
+
+def count_parser_drops(wb, read, kept):
+    """Add to wb.dropped['parser'] the `read` filled rows a parser's filters left out of `kept`"""
+    wb.dropped['parser'] += read - len(kept)
+
+# ============================================================
+# STREAMING READER (append-only sheets)
+# ============================================================
+# Stockpile Hopper and the Produksi monthly sheets only grow at the bottom.
+# SheetStream walks them row by row and keeps only the rows a sync needs.
+# With openpyxl (read-only) memory follows the rows kept instead of the
+# sheet's history; calamine loads the whole sheet before the first row, so
+# a min_date stream reads calamine workbooks through BOUNDED_READERS. The
+# column-range rows() copy (shipping blocks) stays on calamine: that sheet
+# is small, and whole it costs no more than openpyxl's stream
+# (python -m benchmarks.bench_readers, reader memory).
+STREAM_BATCH_ROWS = 5000
+
+def _stream_cell(value):
+    """openpyxl value -> the value pd.read_excel would hold for that cell"""
+    if value is None:
+        return np.nan
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        return int(value) if value == int(value) else float(value)
+    if isinstance(value, str) and value in ERROR_CODES:
+        return np.nan
+    return value
+
+def _calamine_cell(value):
+    """python-calamine value -> _stream_cell()'s value for the same cell"""
+    if isinstance(value, str) and value == '':
+        return np.nan  # calamine's empty cell
+    if isinstance(value, date) and not isinstance(value, datetime):
+        value = datetime(value.year, value.month, value.day)  # as openpyxl and read_excel
+    return _stream_cell(value)
+
+def _trimmed(row):
+    """Row without its trailing empty cells"""
+    end = len(row)
+    while end and row[end - 1] != row[end - 1]:
+        end -= 1
+    return row[:end]
+
+def _stream_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return parse_excel_date(value)
+
+class SheetStream:
+    """
+    Header row and dated rows of one sheet, read lazily.
+
+    The header is the hinted row (wb.header_hints) if it still matches
+    `groups`, else the first matching row at or after `start` (from the
+    top when the sheet is not longer than `start`), else `default`.
+    Iterating yields column batches - one tuple per column, up to
+    `batch_size` rows - of the non-empty rows below the header dated on
+    or after `min_date` (date column: first header containing one of
+    `date_names`).
+    """
+    def __init__(self, wb, sheet, groups, start=0, default=None, min_date=None,
+                 date_names=('date', 'tanggal'), batch_size=STREAM_BATCH_ROWS):
+        self.wb, self.sheet, self.groups = wb, sheet, groups
+        self.min_date, self.batch_size = min_date, batch_size
+        self.header_idx, self.header, self._rows = self._locate(start, default)
+        self.names = _header_names(self.header) if self.header is not None else []
+        self.date_pos = next((i for i, name in enumerate(self.names)
+                              if any(w in str(name).lower() for w in date_names)), None)
+        if min_date is not None:
+            # Without a date column no row is kept, which says nothing about the dates
+            wb.dated[sheet] = self.header is not None and self.date_pos is not None
+
+    def _locate(self, start, default):
+        if not self.wb.streaming(self.sheet):
+            # Sheet already in memory: vectorized scan of the cached read
+            raw = self.wb.raw(self.sheet)
+            idx = self.wb.locate_header(self.sheet, self.groups, start if len(raw) > start else 0)
+            idx = default if idx is None else idx
+            if idx is None or idx >= len(raw):
+                return None, None, iter(())
+            rows = self.wb.rows(self.sheet, idx)
+            return idx, next(rows), rows
+
+        # A min_date stream skips the sheet's history: keep it out of memory
+        bounded = self.min_date is not None
+        hint = self.wb.header_hints.get(self.sheet)
+        if hint is not None and hint >= start:
+            rows = self.wb.rows(self.sheet, hint, bounded=bounded)
+            first = next(rows, None)
+            if first is not None and _row_matches(first, self.groups):
+                return hint, first, rows
+
+        rows = self.wb.rows(self.sheet, bounded=bounded)
+        early = None  # First match above `start`, with the rows after it
+        offset = 0
+        for block, found in _header_blocks(rows, self.groups):
+            later = [int(k) for k in found if offset + k >= start]
+            if later:
+                k = later[0]
+                self.wb.header_hints[self.sheet] = offset + k
+                return offset + k, block[k], chain(block[k + 1:], rows)
+            if offset + len(block) > start:
+                early = None  # The sheet is longer than `start`
+            elif early is not None:
+                early[2].extend(block)
+            elif len(found):
+                k = int(found[0])
+                early = (offset + k, block[k], block[k + 1:])
+            offset += len(block)
+        if early is not None:
+            self.wb.header_hints[self.sheet] = early[0]
+            return early[0], early[1], iter(early[2])
+        if default is not None:
+            rows = self.wb.rows(self.sheet, default, bounded=bounded)
+            first = next(rows, None)
+            if first is not None:
+                return default, first, rows
+        return None, None, iter(())
+
+    def _keep(self, row):
+        # v == v is False only for NaN (empty cells)
+        if not any(v == v and v != '' for v in row):
+            return False
+        if self.min_date is None:
+            return True
+        value = row[self.date_pos] if self.date_pos is not None and self.date_pos < len(row) else None
+        day = _stream_date(value) if value is not None and value == value else None
+        if day is not None and day >= self.min_date:
+            return True
+        self.wb.dropped['stream'] += 1
+        return False
+
+    def __iter__(self):
+        width = len(self.names)
+        pad = (np.nan,) * width
+        batch = []
+        for row in self._rows:
+            if self._keep(row):
+                batch.append((row + pad)[:width])
+                if len(batch) >= self.batch_size:
+                    yield list(zip(*batch))
+                    batch = []
+        if batch:
+            yield list(zip(*batch))
+
+    def frame(self):
+        """The kept rows as wb.frame(sheet, header_idx) would hold them"""
+        batches = list(self)
+        columns = {name: _infer_column(list(chain.from_iterable(b[i] for b in batches)))
+                   for i, name in enumerate(self.names)}
+        return pd.DataFrame(columns, columns=self.names)
+
 # ============================================================
 # 1. PRODUCTION PARSER
 # ============================================================
+PRODUCTION_HEADER_WORDS = [('date', 'tanggal'), ('shift', 'dump truck', 'unit')]
 
-def parse_production_data(source):
+def parse_production_data(source, min_date=None):
+    """min_date: keep only rows dated on/after it (streamed, older rows are never loaded)"""
     try:
-        try:
-            xls = pd.ExcelFile(source, engine='openpyxl')
-        except:
-            if hasattr(source, 'seek'): source.seek(0)
-            xls = pd.ExcelFile(source)
+        wb = open_workbook(source)
         valid_dfs = []
-        target_sheets = [s for s in xls.sheet_names if '2026' in str(s)]
+        target_sheets = [s for s in wb.sheet_names if '2026' in str(s)]
         if not target_sheets:
-            target_sheets = [s for s in xls.sheet_names if s.lower() not in ['menu', 'dashboard', 'summary', 'ref', 'config']]
+            target_sheets = [s for s in wb.sheet_names if s.lower() not in ['menu', 'dashboard', 'summary', 'ref', 'config']]
             
         for sheet in target_sheets:
             try:
-                # Header Scanning - Reading Full Sheet (Match Stockpile Logic)
-                df_raw = pd.read_excel(xls, sheet_name=sheet, header=None)
-                header_idx = 0
-                for i in range(len(df_raw)):
-                    row_str = df_raw.iloc[i].astype(str).str.cat(sep=' ').lower()
-                    if ('date' in row_str or 'tanggal' in row_str) and \
-                       ('shift' in row_str or 'dump truck' in row_str or 'unit' in row_str):
-                        header_idx = i; break
-                
-                temp_df = pd.read_excel(xls, sheet_name=sheet, header=header_idx)
+                # Header Scanning - Streaming the Sheet (Match Stockpile Logic)
+                temp_df = SheetStream(wb, sheet, PRODUCTION_HEADER_WORDS, default=0, min_date=min_date).frame()
+                read = len(temp_df)  # SheetStream keeps filled rows only
                 temp_df.columns = [str(c).strip() for c in temp_df.columns]
                 
                 # Column Rename to Standard (for DB Mapping)
@@ -124,37 +739,17 @@ def parse_production_data(source):
                     if req not in temp_df.columns: temp_df[req] = None
 
                 # FILTER EMPTY ROWS (User Request)
-                # Remove rows where Date is present but other keys are empty or '-'
-                # Critical columns: Time, Shift, Excavator, Dump Truck
-                def is_valid_row(row):
-                    # Check if at least one critical column has real data (not None, NaN, or '-')
-                    # Broadened check to include ALL data columns so we don't accidentally drop sparse rows
-                    # EXCLUDE SHIFT: Shift alone is not enough to keep a row (User Bug Report)
-                    criticals = [
-                        row['Time'], row['Excavator'], row['Dump Truck'], 
-                        row['Front'], row['Commodity'], row['Dump Loc'], row['BLOK'],
-                        row.get('Rit', 0), row.get('Tonnase', 0)
-                    ]
-                    for val in criticals:
-                        s = str(val).strip()
-                        # Allow 0 for Rit/Tonase if explicitly valid? No, usually 0 means empty in this excel
-                        if pd.notna(val) and s != '' and s != '-' and s != 'nan' and s != 'None':
-                            # Special check for numerics 0
-                            try:
-                                if float(val) == 0: continue 
-                            except: pass
-                            
-                            return True # Found something valid
-                    return False
-
-                valid_mask = temp_df.apply(is_valid_row, axis=1)
-                temp_df = temp_df[valid_mask]
+                # Remove rows where Date is present but other keys are empty, '-' or 0
+                # Broadened check to include ALL data columns so we don't accidentally drop sparse rows
+                # EXCLUDE SHIFT: Shift alone is not enough to keep a row (User Bug Report)
+                temp_df = temp_df[production_valid_mask(temp_df)]
                     
                 # Numerics
                 for n in ['Rit', 'Tonnase']:
                     if n in temp_df.columns: 
                         temp_df[n] = pd.to_numeric(temp_df[n], errors='coerce').fillna(0)
                 
+                count_parser_drops(wb, read, temp_df)
                 valid_dfs.append(temp_df)
             except: continue
                 
@@ -165,15 +760,52 @@ def parse_production_data(source):
 # ============================================================
 # 2. DOWNTIME PARSER (Indonesian)
 # ============================================================
+# 2026 rows hold a 'Crusher' value the header lacks, so from 'Alat' on every
+# value sits under the previous column's header (Durasi -> [Crusher] -> Alat
+# -> Remarks -> Kelompok ...). The repair moves each one column along.
+DOWNTIME_SHIFTED_COLUMNS = [
+    'Crusher', 'Alat', 'Remarks', 'Kelompok Masalah', 'Gangguan', 'Info CCR',
+    'Sub Komponen', 'Keterangan', 'Penyebab', 'Identifikasi Masalah', 'Action',
+    'Plan', 'PIC', 'Status', 'Due Date', 'Spare Part', 'Info Spare Part', 'Link/Lampiran',
+]
+
+def shifted_downtime_rows(df):
+    """Rows with the extra Crusher cell: crusher names in 'Alat', or Tahun 2026"""
+    if 'Alat' not in df.columns:
+        return pd.Series(False, index=df.index)
+    mask = df['Alat'].astype(str).str.contains(r'LSC|MS |Batu', case=False, na=False)
+    if 'Tahun' in df.columns: mask = mask | (df['Tahun'] == 2026)
+    return mask
+
+def repair_shifted_columns(df, mask, columns=DOWNTIME_SHIFTED_COLUMNS):
+    """
+    For the rows in `mask`, columns[i] <- columns[i + 1] wherever columns[i + 1]
+    exists (missing targets are added empty), as one 2-D block copy. Same
+    result as assigning the pairs one by one in order; target columns become
+    object dtype. Modifies and returns df.
+    """
+    pairs = [(new, old) for new, old in zip(columns, columns[1:]) if old in df.columns]
+    rows = np.flatnonzero(np.asarray(mask, dtype=bool))
+    if not pairs or not len(rows):
+        return df
+    targets, sources = [new for new, _ in pairs], [old for _, old in pairs]
+    for col in targets:
+        if col not in df.columns: df[col] = None
+    # One object block over targets + the last source, each column boxed once
+    # (object: an all-empty column reads as float64 and would reject text)
+    names = list(dict.fromkeys(targets + sources))
+    values = df[names].to_numpy(dtype=object)
+    pos = {name: i for i, name in enumerate(names)}
+    block = values[:, [pos[c] for c in targets]]
+    block[rows] = values[np.ix_(rows, [pos[c] for c in sources])]
+    df[targets] = pd.DataFrame(block, index=df.index, columns=targets, dtype=object)
+    return df
+
 
 def parse_downtime_data(source):
     try:
-        try:
-            xls = pd.ExcelFile(source, engine='openpyxl')
-        except:
-            if hasattr(source, 'seek'): source.seek(0)
-            xls = pd.ExcelFile(source)
-        sheet_names = xls.sheet_names
+        wb = open_workbook(source)
+        sheet_names = wb.sheet_names
         
         target_sheets = []
         if 'All' in sheet_names: target_sheets = ['All']
@@ -192,8 +824,9 @@ def parse_downtime_data(source):
                          
         for sheet in target_sheets:
             try:
-                df_sheet = pd.read_excel(xls, sheet_name=sheet)
+                df_sheet = wb.frame(sheet)
                 if df_sheet.empty: continue
+                read = filled_rows(df_sheet)
                 
                 df_sheet.columns = [str(c).strip() for c in df_sheet.columns]
                 
@@ -208,24 +841,7 @@ def parse_downtime_data(source):
                 df_sheet = df_sheet.dropna(subset=['Tanggal'])
                 
                 # Shifted Column Logic 2026
-                if 'Alat' in df_sheet.columns:
-                    mask_shifted = df_sheet['Alat'].astype(str).str.contains(r'LSC|MS |Batu', case=False, na=False)
-                    if 'Tahun' in df_sheet.columns: mask_shifted = mask_shifted | (df_sheet['Tahun'] == 2026)
-                    if mask_shifted.any():
-                        shift_map = [
-                            ('Crusher', 'Alat'), ('Alat', 'Remarks'), ('Remarks', 'Kelompok Masalah'),
-                            ('Kelompok Masalah', 'Gangguan'), ('Gangguan', 'Info CCR'),
-                            ('Info CCR', 'Sub Komponen'), ('Sub Komponen', 'Keterangan'),
-                            ('Keterangan', 'Penyebab'), ('Penyebab', 'Identifikasi Masalah'),
-                            ('Identifikasi Masalah', 'Action'), ('Action', 'Plan'),
-                            ('Plan', 'PIC'), ('PIC', 'Status'), ('Status', 'Due Date'),
-                            ('Due Date', 'Spare Part'), ('Spare Part', 'Info Spare Part'),
-                            ('Info Spare Part', 'Link/Lampiran')
-                        ]
-                        for new_col, old_col in shift_map:
-                            if old_col in df_sheet.columns:
-                                if new_col not in df_sheet.columns: df_sheet[new_col] = None
-                                df_sheet.loc[mask_shifted, new_col] = df_sheet.loc[mask_shifted, old_col]
+                df_sheet = repair_shifted_columns(df_sheet, shifted_downtime_rows(df_sheet))
                                 
                 # Ensure cols
                 for col in standard_cols:
@@ -240,6 +856,7 @@ def parse_downtime_data(source):
                 if 'End' in df_sheet.columns:
                     df_sheet['End'] = df_sheet['End'].apply(parse_excel_time)
                 
+                count_parser_drops(wb, read, df_sheet)
                 all_dfs.append(df_sheet)
             except: continue
         
@@ -253,47 +870,33 @@ def parse_downtime_data(source):
 # ============================================================
 # 3. STOCKPILE PARSER (Monitoring.xlsx -> Sheet Stockpile Hopper)
 # ============================================================
-def parse_stockpile_hopper(source):
+STOCKPILE_HEADER_WORDS = [('date',), ('dumping',), ('unit',)]
+
+def parse_stockpile_hopper(source, min_date=None):
+    """min_date: keep only rows dated on/after it (streamed, older rows are never loaded)"""
     try:
-        try:
-            xls = pd.ExcelFile(source, engine='openpyxl')
-        except:
-            if hasattr(source, 'seek'): source.seek(0)
-            xls = pd.ExcelFile(source)
+        wb = open_workbook(source)
         # Use exact sheet name
-        if 'Stockpile Hopper' not in xls.sheet_names:
+        if 'Stockpile Hopper' not in wb.sheet_names:
             return pd.DataFrame()
 
-        # Read header scan - READING FULL SHEET to find 2026 header
-        df_raw = pd.read_excel(xls, sheet_name='Stockpile Hopper', header=None)
-            
-        # Header Scanning - Strict Match based on User User and Debug Findings (Row ~3399)
+        # Header scan - STREAMING the sheet to find the 2026 header
         # looking for: Date, Time, Shift, Dumping, Unit, Ritase
-        header_idx = None
-        
-        # Header Scanning: User confirmed header is at Row 3399 for 2026 data
-        # We must scan the FULL sheet again.
-        header_idx = None
-        df_raw = pd.read_excel(xls, sheet_name='Stockpile Hopper', header=None)
-        
-        # Optimization: Start scanning from row 3000 to save time and avoid old headers (2025 data)
-        # User confirmed 2026 data starts at 3399.
-        start_scan = 3000 if len(df_raw) > 3000 else 0
-        
-        for i in range(start_scan, len(df_raw)):
-            row_str = df_raw.iloc[i].astype(str).str.cat(sep=' ').lower()
-            # Strict check again because we know where it is roughly
-            # Row 3399: Date, Time, Shift, Dumping, Unit, Rit
-            if 'date' in row_str and 'dumping' in row_str and 'unit' in row_str:
-                header_idx = i
-                print(f"Found Stockpile Header at row {i}")
-                break
+        # User confirmed header is at Row 3399 for 2026 data
+        # Optimization: Start scanning from row 3000 (when the sheet is longer) to
+        # save time and avoid old headers (2025 data)
+        # Row 3399: Date, Time, Shift, Dumping, Unit, Rit
+        stream = SheetStream(wb, 'Stockpile Hopper', STOCKPILE_HEADER_WORDS, start=3000, min_date=min_date)
+        header_idx = stream.header_idx
+        if header_idx is not None:
+            print(f"Found Stockpile Header at row {header_idx}")
         
         if header_idx is None:
             print("Stockpile Header not found.")
             return pd.DataFrame() 
 
-        df = pd.read_excel(xls, sheet_name='Stockpile Hopper', header=header_idx)
+        df = stream.frame()
+        read = len(df)  # SheetStream keeps filled rows only
         
         # Standardize Columns
         # Excel: Date/Tanggal, Time/Jam, Shift, Dumping, Unit, Ritase
@@ -320,30 +923,9 @@ def parse_stockpile_hopper(source):
         
         # FILTER EMPTY ROWS (Stockpile) - MOVED UP
         # Remove rows where Date is present but other keys are empty or '-'
-        # Critical columns: Loader, Unit, Ritase, Jam, Shift
-        def is_valid_stockpile_row(row):
-            # Check Ritase
-            rit = row['Ritase'] if 'Ritase' in row else 0
-            try:
-                if float(rit) > 0: return True
-            except: pass
-            
-            # Check Text Cols
-            # Use safe get
-            loader = row.get('Loader', '')
-            unit = row.get('Unit', '')
-            jam = row.get('Jam', '')
-            # EXCLUDE SHIFT: Shift alone is not enough (User Bug Report)
-            
-            criticals = [loader, unit, jam]
-            for val in criticals:
-                s = str(val).strip().lower()
-                if pd.notna(val) and s != '' and s != '-' and s != 'nan' and s != 'unknown' and s != 'none':
-                    return True
-            return False
-
-        valid_mask = df.apply(is_valid_stockpile_row, axis=1)
-        df = df[valid_mask]
+        # Critical columns: Ritase, Loader, Unit, Jam
+        # EXCLUDE SHIFT: Shift alone is not enough (User Bug Report)
+        df = df[stockpile_valid_mask(df)]
 
         if 'Jam' in df.columns:
             # Just clean whitespace, keep text
@@ -376,31 +958,10 @@ def parse_stockpile_hopper(source):
         if 'Unit' not in df.columns: df['Unit'] = 'Unknown'
         
         # FILTER EMPTY ROWS (Stockpile)
-        # Remove rows where Date is present but other keys are empty or '-'
-        # Critical columns: Loader, Unit, Ritase, Jam, Shift
-        def is_valid_stockpile_row(row):
-            # Check if at least one critical column has real data
-            # Ritase must be > 0 or Loader/Unit/Jam/Shift must be valid text
-            
-            # Check Ritase
-            rit = row['Ritase'] if 'Ritase' in row else 0
-            try:
-                if float(rit) > 0: return True
-            except: pass
-            
-            # Check Text Cols
-            # Broader check: include Jam and Shift
-            criticals = [row['Loader'], row['Unit'], row['Jam'], row['Shift']]
-            for val in criticals:
-                s = str(val).strip().lower()
-                # 0 is considered "data" for Shift (e.g. Shift 0?) unlikely but safe.
-                # But 'unknown' is default filler, so ignore that.
-                if pd.notna(val) and s != '' and s != '-' and s != 'nan' and s != 'unknown':
-                    return True
-            return False
-
-        valid_mask = df.apply(is_valid_stockpile_row, axis=1)
-        df = df[valid_mask]
+        # Ritase must be > 0 or Loader/Unit/Jam/Shift must be valid text
+        # 'unknown' is the default filler, so it does not count
+        df = df[stockpile_valid_mask(df, final=True)]
+        count_parser_drops(wb, read, df)
 
         return df[['Tanggal', 'Jam', 'Shift', 'Loader', 'Unit', 'Ritase']]
     except: return pd.DataFrame()
@@ -408,97 +969,100 @@ def parse_stockpile_hopper(source):
 # ============================================================
 # 4. SHIPPING PARSER (Monitoring.xlsx -> Sheet TONASE Pengiriman)
 # ============================================================
+# Side-by-side 7-column blocks, one per year, each headed 'Tanggal' on row 3
+SHIPPING_SAMPLE_ROWS = 3
+
+def find_shipping_blocks(head, header_row_idx=2, year='2026'):
+    """
+    First columns of the 'Tanggal' blocks in header row `header_row_idx`
+    whose first SHIPPING_SAMPLE_ROWS data rows mention `year`. `head` holds
+    the sheet's first rows as tuples (Workbook.rows()).
+    """
+    if len(head) <= header_row_idx:
+        return []
+    starts = []
+    for c, val in enumerate(head[header_row_idx]):
+        if str(val).strip().lower() != 'tanggal':
+            continue
+        samples = head[header_row_idx + 1:header_row_idx + 1 + SHIPPING_SAMPLE_ROWS]
+        if any(c < len(row) and year in str(row[c]) for row in samples):
+            starts.append(c)
+    return starts
+
 def parse_shipping_data(source):
     try:
-        if hasattr(source, 'seek'):
-            source.seek(0)
-        try:
-            xls = pd.ExcelFile(source, engine='openpyxl')
-        except:
-            if hasattr(source, 'seek'): source.seek(0)
-            xls = pd.ExcelFile(source)
+        wb = open_workbook(source)
             
         # Use exact sheet name with trailing space
         target_sheet = 'TONASE Pengiriman '
-        if target_sheet not in xls.sheet_names:
+        if target_sheet not in wb.sheet_names:
             # Fallback check without space
-            if 'TONASE Pengiriman' in xls.sheet_names:
+            if 'TONASE Pengiriman' in wb.sheet_names:
                 target_sheet = 'TONASE Pengiriman'
             else:
                 return pd.DataFrame()
         
-        # Read full sheet to scan horizontal blocks
+        # Phase 1: header row + first data rows only, to find the 2026 blocks
         # Header is typically at row index 2 (Excel Row 3)
-        df_raw = pd.read_excel(xls, sheet_name=target_sheet, header=None)
-        
         header_row_idx = 2  # Confirmed by debug
-        scan_limit_col = df_raw.shape[1]
-        
+        block_width = 7
+        head = list(islice(wb.rows(target_sheet), header_row_idx + SHIPPING_SAMPLE_ROWS + 1))
+        starts = find_shipping_blocks(head, header_row_idx)
+        if not starts: return pd.DataFrame()
+
+        # Phase 2: only the columns of those blocks (the 2024/2025 blocks are never read)
+        lo, hi = min(starts), max(starts) + block_width
+        pad = (np.nan,) * (hi - lo)
+        columns = list(zip(*((row + pad)[:hi - lo] for row in wb.rows(target_sheet, 0, lo, hi))))
+        # Sheet width as pd.read_excel sees it: a block must fit inside it
+        scan_limit_col = max((len(_trimmed(row)) for row in head), default=0)
+
         found_dfs = []
-        
-        for c in range(scan_limit_col):
-            val = str(df_raw.iloc[header_row_idx, c]).strip().lower()
-            if 'tanggal' == val:
-                # Check data to confirm year 2026
-                # Look ahead a few rows to confirm it's a valid data block
-                is_valid_block = False
-                try:
-                    for r_offset in range(1, 4): # Check first 3 data rows
-                        if header_row_idx + r_offset >= len(df_raw): break
-                        sample_val = str(df_raw.iloc[header_row_idx+r_offset, c])
-                        if '2026' in sample_val:
-                             is_valid_block = True
-                             break
-                except: pass
-                
-                if is_valid_block:
-                     # Extract Block (7 cols)
-                     block_width = 7
-                     if c + block_width > scan_limit_col: continue
-
-                     df = df_raw.iloc[header_row_idx+1:, c : c+block_width].copy()
-                     
-                     # Rename Cols
-                     cols = ['Date', 'Shift', 'AP_LS', 'AP_LS_MK3', 'AP_SS', 'Total_LS', 'Total_SS']
-                     current_cols = len(df.columns)
-                     df.columns = cols[:current_cols]
-                     
-                     # Clean Data
-                     df = df.dropna(subset=['Date'])
-                     
-                     # Clean Numerics
-                     num_cols = ['AP_LS', 'AP_LS_MK3', 'AP_SS', 'Total_LS', 'Total_SS']
-                     for col in num_cols:
-                        if col in df.columns:
-                            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-                     
-                     # Drop if all numeric are 0 (Empty rows)
-                     # Only keep rows with at least some data
-                     # But be careful not to drop valid 0s if that's possible?
-                     # User said "hilangkan saja klo datanya masih 0 semua"
-                     mask = (df[num_cols].sum(axis=1) > 0)
-                     df = df[mask]
-                     
-                     if not df.empty:
-                        # Date Convert
-                        df['Date'] = safe_parse_date_column(df['Date'])
-                        df = df.dropna(subset=['Date'])
-                        
-                        # Shift Convert
-                        if 'Shift' in df.columns:
-                            def clean_shift(x):
-                                x = str(x).lower().replace('shift', '').strip()
-                                import re
-                                m = re.search(r'\d+', x)
-                                if m: return int(m.group())
-                                if x == 'i': return 1
-                                if x == 'ii': return 2
-                                if x == 'iii': return 3
-                                return 1
-                            df['Shift'] = df['Shift'].apply(clean_shift)
-                        
-                        found_dfs.append(df)
-        
+        cols = ['Date', 'Shift', 'AP_LS', 'AP_LS_MK3', 'AP_SS', 'Total_LS', 'Total_SS']
+        for c in starts:
+            block = columns[c - lo:c - lo + block_width]
+            if c + block_width > scan_limit_col and not any(v == v for v in block[-1]):
+                continue
+
+            # Same dtypes as the full-sheet read: inferred over the whole column
+            df = pd.DataFrame({name: _infer_column(values) for name, values in zip(cols, block)})
+            df = df.iloc[header_row_idx+1:]
+            read = filled_rows(df)
+
+            # Clean Data
+            df = df.dropna(subset=['Date'])
+
+            # Clean Numerics
+            num_cols = ['AP_LS', 'AP_LS_MK3', 'AP_SS', 'Total_LS', 'Total_SS']
+            for col in num_cols:
+                df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+
+            # Drop if all numeric are 0 (Empty rows)
+            # User said "hilangkan saja klo datanya masih 0 semua"
+            mask = (df[num_cols].sum(axis=1) > 0)
+            df = df[mask]
+
+            if df.empty:
+                count_parser_drops(wb, read, df)
+            else:
+                # Date Convert
+                df['Date'] = safe_parse_date_column(df['Date'])
+                df = df.dropna(subset=['Date'])
+
+                # Shift Convert
+                def clean_shift(x):
+                    x = str(x).lower().replace('shift', '').strip()
+                    m = re.search(r'\d+', x)
+                    if m: return int(m.group())
+                    if x == 'i': return 1
+                    if x == 'ii': return 2
+                    if x == 'iii': return 3
+                    return 1
+                df['Shift'] = df['Shift'].apply(clean_shift)
+
+                count_parser_drops(wb, read, df)
+                found_dfs.append(df)
+
         if found_dfs:
             final_df = pd.concat(found_dfs, ignore_index=True)
             return final_df
@@ -515,16 +1079,15 @@ def parse_shipping_data(source):
 def parse_daily_plan_data(source):
     try:
         # Header is at Row 3 (Index 2)
-        try:
-            df = pd.read_excel(source, sheet_name='Scheduling', header=2, engine='openpyxl')
-        except:
-            if hasattr(source, 'seek'): source.seek(0)
-            df = pd.read_excel(source, sheet_name='Scheduling', header=2)
+        wb = open_workbook(source)
+        df = wb.frame('Scheduling', 2)
         if df.empty: return pd.DataFrame()
+        read = filled_rows(df)
         
         if 'Tanggal' in df.columns:
             df['Tanggal'] = safe_parse_date_column(df['Tanggal'])
             df = df.dropna(subset=['Tanggal'])
+            count_parser_drops(wb, read, df)
         else: return pd.DataFrame()
         
         # Map columns
@@ -546,57 +1109,38 @@ def parse_daily_plan_data(source):
 # ============================================================
 # 6. TARGET PARSER (Analisa Produksi -> RKAP)
 # ============================================================
+# Indonesian month names that differ from the English ones (%B)
+MONTHS_ID = {
+    'januari': 'january', 'februari': 'february', 'maret': 'march', 'mei': 'may',
+    'juni': 'june', 'juli': 'july', 'agustus': 'august', 'oktober': 'october',
+    'desember': 'december',
+}
+
+def parse_month_header(header):
+    """'Januari 2025' / 'March 2026' -> (2025, 1) / (2026, 3); None if not a month header"""
+    try:
+        m_str = header.lower()
+        for id_name, en_name in MONTHS_ID.items():
+            m_str = m_str.replace(id_name, en_name)
+        dt_month = pd.to_datetime(m_str, format='%B %Y')
+        return dt_month.year, dt_month.month
+    except Exception:
+        return None
+
 def parse_target_data(source):
     try:
-        try:
-            xls = pd.ExcelFile(source, engine='openpyxl')
-        except:
-            if hasattr(source, 'seek'): source.seek(0)
-            xls = pd.ExcelFile(source)
-        if 'Analisa Produksi' not in xls.sheet_names:
+        wb = open_workbook(source)
+        if 'Analisa Produksi' not in wb.sheet_names:
             return pd.DataFrame()
             
-        df = pd.read_excel(xls, sheet_name='Analisa Produksi', header=0)
+        df = wb.frame('Analisa Produksi', 0)
         
-        # Structure is dynamic: "Januari 2025", "Februari 2025" columns
-        # We need to unpivot (melt) this.
-        
-        # 1. Identify Month Columns
-        # Regex for 'Month Year' (Bahasa or English)
-        # e.g. "Januari 2025", "Feb 2026"
-        month_cols = []
-        for c in df.columns:
-            if re.match(r'.*\d{4}', str(c)):
-                month_cols.append(c)
-                
+        # One column per month ("Januari 2025", "Feb 2026"), one row per day
+        month_cols = [c for c in df.columns if re.match(r'.*\d{4}', str(c))]
         if not month_cols: return pd.DataFrame()
-        
-        # 2. Extract values
-        # Rows might be dates (1, 2, 3...) or Full Dates
-        # Based on previous code in loader, it seemed to just grab the column?
-        # Let's assume the rows 1..31 correspond to days.
-        # But wait, looking at the previous loader attempt:
-        # It relies on 'Unnamed: 0' or similar being the day?
-        # Actually, let's assume the first column is Day (1-31).
-        
-        # Let's Inspect Row 0-35
-        # Usually: Col 0 = Date/Day. Other Cols = Plan values.
-        
-        # Safe strategy: Melt everything
-        df_melted = df.melt(var_name='MonthYear', value_name='Plan')
-        
-        # But we need the Day info.
-        # Let's assume Index is Day-1? Or Column 0 is Day?
-        # Re-read with header=None to check structure?
-        # Let's stick to the previous loader logic which seemed to work (lines 1840+)
-        # Wait, the previous loader FAILED or was slow.
-        # Let's assume simple structure:
-        # Col 0: "Tanggal" (1, 2, ..., 31)
-        # Col 1: "Januari 2025"
-        # Col 2: "Februari 2025"...
-        
+
+        # Day of month (1-31): the Tanggal / Date column, else the first one
         if 'Tanggal' not in df.columns and 'Date' not in df.columns:
-            # Maybe the first column is implicitly Date
             df = df.rename(columns={df.columns[0]: 'Day'})
         else:
             col = 'Tanggal' if 'Tanggal' in df.columns else 'Date'
@@ -607,33 +1151,84 @@ def parse_target_data(source):
         df = df.dropna(subset=['Day'])
         df = df[(df['Day'] >= 1) & (df['Day'] <= 31)]
         
-        records = []
-        for _, row in df.iterrows():
-            day = int(row['Day'])
-            for m_col in month_cols:
-                # Parse Month Year from Header
-                try:
-                    # m_col: "Januari 2025"
-                    # Translate ID -> EN
-                    m_str = m_col.lower().replace('januari', 'january').replace('februari', 'february') \
-                                         .replace('maret', 'march').replace('mei', 'may') \
-                                         .replace('juni', 'june').replace('juli', 'july') \
-                                         .replace('agustus', 'august').replace('oktober', 'october') \
-                                         .replace('desember', 'december')
-                    
-                    dt_month = pd.to_datetime(m_str, format='%B %Y')
-                    
-                    # Construct valid date
-                    try:
-                        full_date = datetime(dt_month.year, dt_month.month, day).date()
-                        plan_val = pd.to_numeric(row[m_col], errors='coerce')
-                        if pd.notna(plan_val):
-                            records.append({'Date': full_date, 'Plan': float(plan_val)})
-                    except ValueError:
-                        continue # Dayout of range (e.g. Feb 30)
-                except:
-                    continue
-                    
-        return pd.DataFrame(records)
+        # Month headers -> (year, month), once per column
+        months = {}
+        for m_col in month_cols:
+            if m_col in df.columns:
+                ym = parse_month_header(m_col)
+                if ym: months[m_col] = ym
+        if not months or df.empty: return pd.DataFrame()
+
+        # Unpivot (day x month) by array arithmetic, dates included
+        # Invalid days (e.g. Feb 30) become NaT and are dropped with empty plans
+        plans = df[list(months)].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+        years, month_nums = (np.array(v) for v in zip(*months.values()))
+        days = np.trunc(df['Day'].to_numpy(dtype=float)).astype(int)
+        n_days, n_months = plans.shape
+        dates = pd.to_datetime(pd.DataFrame({
+            'year': np.tile(years, n_days), 'month': np.tile(month_nums, n_days),
+            'day': np.repeat(days, n_months),
+        }), errors='coerce').astype('datetime64[ns]')
+
+        out = pd.DataFrame({'Date': dates, 'Plan': plans.ravel()})
+        out = out[out['Date'].notna() & out['Plan'].notna()].reset_index(drop=True)
+        return out if not out.empty else pd.DataFrame()
     except: return pd.DataFrame()
 
+
+# ============================================================
+# 7. SOURCE PARSE JOBS (one per OneDrive workbook)
+# ============================================================
+# Module-level so they can be shipped to a process pool: each takes the raw
+# workbook bytes (or the path of a spilled temp file for large workbooks),
+# opens it once and returns {report key: parsed DataFrame}, plus the header
+# rows it located under HEADER_HINTS_KEY ({sheet: (layout, row)}, see
+# Workbook.located_hints) so the next sync of the same workbook can pass
+# them back as header_hints. min_date bounds the
+# streamed append-only sheets (Produksi, Stockpile Hopper); the report keys
+# whose frames are known to hold every row dated since it are listed under
+# MIN_DATE_COVERED_KEY (see Workbook.covers_min_date). ROWS_DROPPED_KEY
+# holds the rows the job read but did not return (Workbook.dropped).
+HEADER_HINTS_KEY = '_header_hints'
+MIN_DATE_COVERED_KEY = '_min_date_covered'
+ROWS_DROPPED_KEY = '_rows_dropped'
+
+def _workbook_source(data):
+    return BytesIO(data) if isinstance(data, (bytes, bytearray)) else data
+
+def parse_produksi_source(data, header_hints=None, min_date=None):
+    with Workbook(_workbook_source(data), header_hints) as wb:
+        frame = parse_production_data(wb, min_date)
+        return {
+            'Produksi': frame,
+            HEADER_HINTS_KEY: wb.located_hints(),
+            MIN_DATE_COVERED_KEY: ['Produksi'] if wb.covers_min_date() else [],
+            ROWS_DROPPED_KEY: wb.dropped,
+        }
+
+def parse_monitoring_source(data, header_hints=None, min_date=None):
+    with Workbook(_workbook_source(data), header_hints) as wb:
+        return {
+            'Shipping': parse_shipping_data(wb),
+            'Stockpile': parse_stockpile_hopper(wb, min_date),
+            'Targets': parse_target_data(wb),
+            HEADER_HINTS_KEY: wb.located_hints(),
+            MIN_DATE_COVERED_KEY: ['Stockpile'] if wb.covers_min_date(['Stockpile Hopper']) else [],
+            ROWS_DROPPED_KEY: wb.dropped,
+        }
+
+def parse_daily_plan_source(data, header_hints=None, min_date=None):
+    with Workbook(_workbook_source(data), header_hints) as wb:
+        return {
+            'Daily Plan': parse_daily_plan_data(wb),
+            HEADER_HINTS_KEY: wb.located_hints(),
+            ROWS_DROPPED_KEY: wb.dropped,
+        }
+
+def parse_gangguan_source(data, header_hints=None, min_date=None):
+    with Workbook(_workbook_source(data), header_hints) as wb:
+        return {
+            'Downtime': parse_downtime_data(wb),
+            HEADER_HINTS_KEY: wb.located_hints(),
+            ROWS_DROPPED_KEY: wb.dropped,
+        }
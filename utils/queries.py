@@ -0,0 +1,122 @@
+from datetime import date, datetime
+
+import pandas as pd
+from sqlalchemy import Date, DateTime, String, bindparam, func, select, type_coerce
+
+from utils.models import (
+    ProductionLog, DowntimeLog, StockpileLog, ShippingLog, DailyPlanLog, TargetLog,
+    SyncRun, SystemLog, ProductionDaily
+)
+from utils.dimensions import encoded_columns
+from utils.rollups import PRODUCTION_SINCE
+
+# ==============================================================================
+# LOADER QUERIES
+# ==============================================================================
+# The statements of the loaders in utils/data_loader, built once with SQLAlchemy
+# Core and bound parameters for every date instead of SQL text with the dates
+# formatted in. A new start date is then a new parameter, not a new
+# statement. SQLAlchemy compiles each statement once per engine (compiled
+# cache). The driver can reuse what the database prepared for the same
+# text: sqlite3 keeps prepared statements per connection, and PostgreSQL
+# drivers that prepare server-side (psycopg 3 after a few executions) reuse
+# the plan. Dates are bound as datetime.date (see as_date).
+#
+#     pd.read_sql(PRODUCTION_ROWS, conn, params={'since': since_date(start_date)})
+
+def as_date(value):
+    """datetime.date of a date / ISO string / Timestamp loader argument"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return pd.Timestamp(value).date()
+
+def since_date(start_date=None):
+    """Lower date bound of a loader: `start_date` when given, else the 2026 floor"""
+    return as_date(start_date) if start_date else PRODUCTION_SINCE
+
+def driver_value(column):
+    """
+    `column` read as the driver returns it. SQLite stores dates as ISO text
+    that SQLAlchemy parses row by row in Python for Date / DateTime columns;
+    the loaders pass them through pd.to_datetime anyway, which parses the
+    text in one vectorized call. PostgreSQL drivers return dates either way.
+    """
+    if isinstance(column.type, (Date, DateTime)):
+        return type_coerce(column, String).label(column.name)
+    return column
+
+_production = ProductionLog.__table__
+_downtime = DowntimeLog.__table__
+_stockpile = StockpileLog.__table__
+_shipping = ShippingLog.__table__
+_daily_plan = DailyPlanLog.__table__
+_target = TargetLog.__table__
+_sync_runs = SyncRun.__table__
+_system = SystemLog.__table__
+
+# Natural key / content digests of the incremental sync: two long strings
+# per row that no view reads
+SYNC_DIGESTS = ('row_key', 'row_hash')
+
+# load_produksi: dimension keys instead of the repeated names (utils/dimensions.py)
+PRODUCTION_COLUMNS = [c for c in encoded_columns(_production.name) if c not in SYNC_DIGESTS]
+PRODUCTION_ROWS = select(*[driver_value(_production.c[c]) for c in PRODUCTION_COLUMNS]).where(
+    _production.c.date >= bindparam('since')
+)
+
+# get_production_kpi_summary: totals between two dates (until = date.max for no upper bound)
+PRODUCTION_KPI = select(
+    func.sum(_production.c.tonnase).label('total_ton'),
+    func.sum(_production.c.rit).label('total_rit'),
+    func.max(_production.c.date).label('last_date'),
+).where(_production.c.date >= bindparam('since'), _production.c.date <= bindparam('until'))
+
+# get_filter_options: the shifts of the daily rollup (a few rows per date)
+# since `since`, through its date index
+_daily = ProductionDaily.__table__
+PRODUCTION_SHIFTS = select(_daily.c.shift).where(_daily.c.date >= bindparam('since')).distinct().order_by(
+    _daily.c.shift
+)
+
+# load_gangguan_all
+DOWNTIME_ROWS = select(_downtime).where(_downtime.c.tanggal >= bindparam('since'))
+
+# load_stockpile_hopper: latest synced first
+STOCKPILE_ROWS = select(_stockpile).where(_stockpile.c.date >= bindparam('since')).order_by(
+    _stockpile.c.created_at.desc(), _stockpile.c.id.desc()
+)
+
+# Latest date first, then id (= Excel order within the date). Not by id alone:
+# ORDER BY id makes SQLite walk the whole table in rowid order instead of
+# searching the tanggal index
+
+# load_shipping_data
+SHIPPING_ROWS = select(
+    _shipping.c.tanggal, _shipping.c.shift, _shipping.c.ap_ls, _shipping.c.ap_ls_mk3,
+    _shipping.c.ap_ss, _shipping.c.total_ls, _shipping.c.total_ss,
+).where(_shipping.c.tanggal >= bindparam('since')).order_by(_shipping.c.tanggal.desc(), _shipping.c.id)
+
+# load_daily_plan (every row) / load_daily_plan_data
+DAILY_PLAN_ALL = select(_daily_plan)
+DAILY_PLAN_ROWS = select(_daily_plan).where(_daily_plan.c.tanggal >= bindparam('since')).order_by(
+    _daily_plan.c.tanggal.desc(), _daily_plan.c.id
+)
+
+# load_analisa_produksi_all
+TARGET_ROWS = select(_target).order_by(_target.c.date)
+
+# load_sync_history: every source of the last `runs` sync runs, latest first
+_latest_runs = select(_sync_runs.c.run_id).group_by(_sync_runs.c.run_id).order_by(
+    func.max(_sync_runs.c.started_at).desc()
+).limit(bindparam('runs'))
+SYNC_HISTORY = select(
+    _sync_runs.c.run_id, _sync_runs.c.started_at, _sync_runs.c.source, _sync_runs.c.outcome,
+    _sync_runs.c.download_bytes, _sync_runs.c.download_ms, _sync_runs.c.parse_ms, _sync_runs.c.write_ms,
+    _sync_runs.c.rows_parsed, _sync_runs.c.rows_kept, _sync_runs.c.rows_dropped,
+    _sync_runs.c.stream_dropped, _sync_runs.c.parser_dropped, _sync_runs.c.error,
+).where(_sync_runs.c.run_id.in_(_latest_runs)).order_by(_sync_runs.c.started_at.desc(), _sync_runs.c.source)
+
+# refresh_after_sync (components/sidebar.py): stamp of the last completed sync
+LAST_SYNC_AT = select(_system.c.value).where(_system.c.key == 'last_sync_at')
@@ -0,0 +1,163 @@
+from datetime import date
+
+import pandas as pd
+from sqlalchemy import case, func, select
+
+from utils.models import (
+    ProductionLog, ProductionDaily, ProductionFrontDaily, ProductionShiftUnit,
+    ProductionDumpDaily, ProductionTruckDaily,
+)
+from utils.dimensions import named_source
+
+# ==============================================================================
+# PRODUCTION ROLLUPS
+# ==============================================================================
+# production_logs summed per key at sync time, so views that only chart totals
+# read a few hundred rollup rows instead of the whole year of raw rows.
+# A sync refreshes the rollups for the dates it touched, in the same
+# transaction as the production_logs write (see utils/sync_manager); schema
+# migration 2 backfills them (see utils/db_manager.MIGRATIONS). The rollups
+# keep the names; production_logs has their dimension keys (utils/dimensions).
+# Each rollup also sums the active rows (tonnase > 0) apart: the Produksi and
+# Ritase views chart those only.
+
+# Coarsest first: queries use the first rollup that has every column they need
+PRODUCTION_ROLLUPS = [
+    (ProductionDaily, ('date', 'shift')),
+    (ProductionFrontDaily, ('date', 'shift', 'front', 'commodity')),
+    (ProductionShiftUnit, ('date', 'shift', 'excavator', 'front', 'commodity')),
+    # Hauling side, without the loading side (front / excavator / commodity):
+    # those keys would make them nearly as fine as production_logs, which
+    # the views filtered on them read instead
+    (ProductionDumpDaily, ('date', 'shift', 'dump_loc')),
+    (ProductionTruckDaily, ('date', 'shift', 'dump_truck')),
+]
+
+# Measure columns of the rollups: all rows, then the active ones
+MEASURES = ('tonnase', 'rit', 'row_count')
+ACTIVE_MEASURES = ('active_tonnase', 'active_rit', 'active_row_count')
+
+# Source table -> its rollups
+ROLLUPS = {ProductionLog.__tablename__: PRODUCTION_ROLLUPS}
+
+# Same floor as load_produksi
+PRODUCTION_SINCE = date(2026, 1, 1)
+
+# Rollup column -> column name in the load_produksi frame
+PRODUCTION_LABELS = {
+    'date': 'Date', 'shift': 'Shift', 'front': 'Front', 'excavator': 'Excavator',
+    'commodity': 'Commodity', 'dump_loc': 'Dump Loc', 'dump_truck': 'Dump Truck', 'blok': 'BLOK',
+}
+
+# Shift selections that mean "no shift filter" (as in apply_global_filters)
+ALL_SHIFTS = ("All Dispatch", "All Displatch", "All")
+
+def _as_dates(values):
+    """Distinct datetime.date values of dates / ISO strings / Timestamps"""
+    parsed = pd.to_datetime(pd.Series(list(values), dtype=object), errors='coerce').dropna()
+    return sorted(set(parsed.dt.date))
+
+def refresh_rollups(conn, source_name, dates=None, since=None):
+    """
+    Recompute the rollups of table `source_name` for `dates`, for every date
+    from `since` on, or entirely when both are None. Runs on `conn`, inside
+    the caller's transaction.
+    """
+    rollups = ROLLUPS.get(source_name)
+    if not rollups:
+        return
+    if dates is not None:
+        dates = _as_dates(dates)
+        if not dates:
+            return
+
+    source = named_source(source_name)
+    active = source.c.tonnase > 0
+    for model, keys in rollups:
+        rollup = model.__table__
+        query = select(
+            *[source.c[k] for k in keys],
+            func.coalesce(func.sum(source.c.tonnase), 0.0),
+            func.coalesce(func.sum(source.c.rit), 0),
+            func.count(),
+            func.coalesce(func.sum(case((active, source.c.tonnase), else_=0.0)), 0.0),
+            func.coalesce(func.sum(case((active, source.c.rit), else_=0)), 0),
+            func.coalesce(func.sum(case((active, 1), else_=0)), 0),
+        ).group_by(*[source.c[k] for k in keys])
+        delete = rollup.delete()
+        if dates is not None:
+            query = query.where(source.c.date.in_(dates))
+            delete = delete.where(rollup.c.date.in_(dates))
+        elif since is not None:
+            query = query.where(source.c.date >= since)
+            delete = delete.where(rollup.c.date >= since)
+
+        conn.execute(delete)
+        conn.execute(rollup.insert().from_select([*keys, *MEASURES, *ACTIVE_MEASURES], query))
+
+# ------------------------------------------------------------------------------
+# Aggregate queries for the views
+# ------------------------------------------------------------------------------
+
+def _filter_clauses(filters):
+    """{column: clause builder} for the sidebar filters, as apply_global_filters applies them"""
+    clauses = {}
+    date_range = filters.get('date_range')
+    if date_range and len(date_range) == 2:
+        start, end = (pd.Timestamp(d).date() for d in date_range)
+        clauses['date'] = lambda c: c.between(start, end)
+
+    selected_shift = filters.get('shift')
+    if selected_shift and selected_shift not in ALL_SHIFTS:
+        target_shift = 1 if "1" in str(selected_shift) else (2 if "2" in str(selected_shift) else 3)
+        clauses['shift'] = lambda c: c == target_shift
+
+    for key, column in (('front', 'front'), ('excavator', 'excavator'), ('material', 'commodity')):
+        selected = filters.get(key)
+        if selected:
+            clauses[column] = lambda c, values=list(selected): c.in_(values)
+    return clauses
+
+def production_rollup_query(by=(), filters=None, active=False):
+    """
+    SELECT of the tonnase / rit / row sums of production_logs grouped by `by`
+    (e.g. ('date',) or ('excavator',)) under the sidebar `filters`, read from
+    the coarsest rollup that has every column involved (production_logs
+    itself when none has). active=True sums only the rows with tonnase > 0,
+    and leaves out the groups that have none.
+
+    Columns are labelled as in load_produksi ('Date', 'Excavator', ...) plus
+    'Tonnase', 'Rit' and 'Rows'. Groups with an empty key are left out, as
+    DataFrame.groupby does.
+    """
+    clauses = _filter_clauses(filters or {})
+    needed = set(by) | set(clauses)
+
+    table = named_source(ProductionLog.__tablename__)
+    tonnase, rit, rows = table.c.tonnase, table.c.rit, func.count()
+    where = [table.c.tonnase > 0] if active else []
+    for model, keys in PRODUCTION_ROLLUPS:
+        if needed <= set(keys):
+            table = model.__table__
+            tonnase, rit, row_count = (table.c[m] for m in (ACTIVE_MEASURES if active else MEASURES))
+            rows = func.sum(row_count)
+            where = []
+            break
+
+    group = [table.c[c] for c in by]
+    query = select(
+        *[col.label(PRODUCTION_LABELS[col.name]) for col in group],
+        func.coalesce(func.sum(tonnase), 0.0).label('Tonnase'),
+        func.coalesce(func.sum(rit), 0).label('Rit'),
+        func.coalesce(rows, 0).label('Rows'),
+    ).where(
+        table.c.date >= PRODUCTION_SINCE,
+        *where,
+        *[clause(table.c[c]) for c, clause in clauses.items()],
+        *[col.is_not(None) for col in group],
+    )
+    if group:
+        query = query.group_by(*group).order_by(*group)
+        if active:
+            query = query.having(rows > 0)
+    return query
@@ -1,335 +1,1297 @@
+import os
+import sys
+import time
+import shutil
+import socket
+import argparse
+import tempfile
+import threading
+import uuid
+import multiprocessing
+import numpy as np
 import pandas as pd
 import streamlit as st
 import traceback
-from datetime import datetime
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
 from config.settings import ONEDRIVE_LINKS
-from utils.network import download_from_onedrive
+from utils.network import fetch_from_onedrive, DOWNLOAD_SPOOL_BYTES, DOWNLOAD_CHUNK_SIZE
 from utils.parsers import (
-    parse_shipping_data, 
-    parse_daily_plan_data, 
-    parse_stockpile_hopper, 
-    parse_production_data, 
-    parse_downtime_data, 
-    parse_target_data
+    parse_produksi_source,
+    parse_monitoring_source,
+    parse_daily_plan_source,
+    parse_gangguan_source,
+    HEADER_HINTS_KEY,
+    MIN_DATE_COVERED_KEY,
+    ROWS_DROPPED_KEY
 )
 from utils.models import (
-    ShippingLog, 
-    DailyPlanLog, 
-    StockpileLog, 
-    ProductionLog, 
-    DowntimeLog, 
-    TargetLog
+    ShippingLog,
+    DailyPlanLog,
+    StockpileLog,
+    ProductionLog,
+    DowntimeLog,
+    TargetLog,
+    SystemLog,
+    SyncRun
 )
-from utils.db_manager import get_db_engine
+from utils.db_manager import create_db_engine, upgrade_schema
+from utils.rollups import ROLLUPS, refresh_rollups
+from utils.dimensions import DIMENSIONS, assign_dimension_keys, key_column, prune_dimensions
+from utils.bulk_writer import (
+    write_frame, frame_to_rows, text_column, int_column, float_column, date_column,
+    time_slot_columns, downtime_minutes_columns
+)
+from sqlalchemy import select, bindparam, or_, func, MetaData, Table, Column, Integer, String
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import sessionmaker
 
 # ==============================================================================
 # HELPERS
 # ==============================================================================
 
-def format_time_val(val):
-    if pd.isna(val): return None
-    s = str(val).strip()
-    if ' ' in s:
-        try:
-            dt = pd.to_datetime(s)
-            return dt.strftime('%H:%M:%S')
-        except: pass
-    return s
-
-def filter_records_by_year(records, date_attr='date', year=2026):
-    """Filter list of objects/dicts by year"""
-    filtered = []
-    cutoff = datetime(year, 1, 1).date()
-    
-    for r in records:
-        val = getattr(r, date_attr, None)
-        if isinstance(val, (datetime, pd.Timestamp)):
-            val = val.date()
-            
-        if val and val >= cutoff:
-            filtered.append(r)
-            
-    return filtered
+def format_time_column(series):
+    """'1899-12-30 07:30:00' style values -> '07:30:00'; other values kept as text"""
+    s = series.astype(str).str.strip()
+    has_space = series.notna() & s.str.contains(' ', regex=False)
+    if has_space.any():
+        parsed = pd.to_datetime(s[has_space], errors='coerce')
+        s.loc[has_space] = parsed.dt.strftime('%H:%M:%S').where(parsed.notna(), s[has_space])
+    return s.where(series.notna(), None).astype(object)
+
+def filter_frame_by_year(frame, date_col='date', year=2026):
+    """Keep rows dated on/after Jan 1st of `year`"""
+    if frame.empty:
+        return frame
+    dates = pd.to_datetime(frame[date_col], errors='coerce')
+    return frame[dates >= pd.Timestamp(year, 1, 1)].reset_index(drop=True)
+
+def _optional(df, col):
+    """Column if the parser produced it, else an all-None Series"""
+    if col in df.columns:
+        return df[col]
+    return pd.Series(None, index=df.index, dtype=object)
 
 # ==============================================================================
 # PERIOD-BASED SYNC CONFIGURATION
 # ==============================================================================
-SYNC_PERIOD_DAYS = 30  # Only sync last 30 days (keeps sync time constant)
+# SYNC_MODE='window' replaces only the rows dated within the last
+# SYNC_PERIOD_DAYS days, so sync cost stays constant as the year fills up.
+# Every SYNC_RECONCILE_DAYS days one run reconciles the whole year instead
+# (incremental diff, fresh downloads), tracked in system_logs.last_full_sync.
+SYNC_PERIOD_DAYS = int(os.getenv("SYNC_PERIOD_DAYS", "30"))
+SYNC_RECONCILE_DAYS = int(os.getenv("SYNC_RECONCILE_DAYS", "7"))
 
-def filter_records_by_period(records, date_attr='date', days=SYNC_PERIOD_DAYS):
-    """Filter records to only include last N days"""
-    from datetime import timedelta
-    filtered = []
-    cutoff = (datetime.now() - timedelta(days=days)).date()
-    
-    for r in records:
-        val = getattr(r, date_attr, None)
-        if isinstance(val, (datetime, pd.Timestamp)):
-            val = val.date()
-        elif isinstance(val, str):
-            try:
-                val = pd.to_datetime(val).date()
-            except:
-                continue
-            
-        if val and val >= cutoff:
-            filtered.append(r)
-            
-    return filtered
+def period_cutoff(days=SYNC_PERIOD_DAYS):
+    """First date inside the sync window"""
+    return (datetime.now() - timedelta(days=days)).date()
+
+def filter_frame_by_period(frame, date_col='date', days=SYNC_PERIOD_DAYS):
+    """Keep rows dated within the last N days"""
+    if frame.empty:
+        return frame
+    dates = pd.to_datetime(frame[date_col], errors='coerce')
+    return frame[dates >= pd.Timestamp(period_cutoff(days))].reset_index(drop=True)
+
+def reconcile_due(session, days=SYNC_RECONCILE_DAYS):
+    """True when the last full reconcile is older than `days` days (or never ran)"""
+    log_entry = session.query(SystemLog).filter_by(key='last_full_sync').first()
+    if not log_entry or not log_entry.value:
+        return True
+    try:
+        last = datetime.fromisoformat(log_entry.value)
+    except ValueError:
+        return True
+    return datetime.utcnow() - last >= timedelta(days=days)
+
+# ==============================================================================
+# FRAME BUILDERS (Parser output -> model columns, latest Excel row first)
+# ==============================================================================
+
+DAYS_ID = {
+    'Monday': 'Senin', 'Tuesday': 'Selasa', 'Wednesday': 'Rabu',
+    'Thursday': 'Kamis', 'Friday': 'Jumat', 'Saturday': 'Sabtu', 'Sunday': 'Minggu'
+}
+
+def build_production_frame(df):
+    src = df.iloc[::-1]
+    out = pd.DataFrame(index=src.index)
+    out['date'] = date_column(src['Date'])
+
+    shift = src['Shift'].astype(str).str.lower().str.replace('shift', '', regex=False).str.strip()
+    out['shift'] = int_column(shift.where(src['Shift'].notna()), default=1)
+
+    out['time'] = text_column(src['Time'])
+    out = out.assign(**time_slot_columns(out['time']))
+    out['excavator'] = text_column(src['Excavator'])
+    out['commodity'] = text_column(_optional(src, 'Commodity'))
+
+    # Truck numbers typed as 12.0 -> '12'; codes like 'DT-07' kept as text
+    dt_raw = src['Dump Truck']
+    dt_str = dt_raw.astype(str)
+    is_number = dt_raw.notna() & dt_str.str.replace('.0', '', regex=False).str.isdigit()
+    as_int = np.trunc(pd.to_numeric(dt_raw.where(is_number), errors='coerce')).astype('Int64').astype(str)
+    out['dump_truck'] = text_column(dt_str.where(~is_number, as_int).where(dt_raw.notna()))
+
+    out['rit'] = int_column(src['Rit'])
+    tonnase = _optional(src, 'tonnase')
+    if 'Tonase' in src.columns:
+        tonnase = tonnase.combine_first(src['Tonase'])
+    out['tonnase'] = float_column(tonnase)
+
+    out['front'] = text_column(src['Front'])
+    out['dump_loc'] = text_column(src['Dump Loc'])
+    out['blok'] = text_column(_optional(src, 'BLOK'))
+    return out.reset_index(drop=True)
+
+def build_shipping_frame(df):
+    src = df.iloc[::-1]
+    out = pd.DataFrame(index=src.index)
+    out['tanggal'] = date_column(src['Date'])
+    out['shift'] = int_column(src['Shift'], default=1)
+    for col, excel_col in [('ap_ls', 'AP_LS'), ('ap_ls_mk3', 'AP_LS_MK3'), ('ap_ss', 'AP_SS'),
+                           ('total_ls', 'Total_LS'), ('total_ss', 'Total_SS')]:
+        out[col] = float_column(src[excel_col])
+    return out.reset_index(drop=True)
+
+def build_stockpile_frame(df):
+    src = df.iloc[::-1]
+    out = pd.DataFrame(index=src.index)
+    out['date'] = date_column(src['Tanggal'])
+    out['time'] = text_column(src['Jam'], keep_null=False)
+    out = out.assign(**time_slot_columns(out['time']))
+    out['shift'] = int_column(src['Shift'], default=1)
+    out['dumping'] = text_column(src['Loader'], keep_null=False) if 'Loader' in src.columns else None
+    out['unit'] = text_column(src['Unit'], keep_null=False) if 'Unit' in src.columns else None
+    out['ritase'] = float_column(_optional(src, 'Ritase'))
+    return out.reset_index(drop=True)
+
+def build_target_frame(df):
+    out = pd.DataFrame(index=df.index)
+    out['date'] = date_column(df['Date'])
+    out['plan'] = float_column(df['Plan'])
+    return out.reset_index(drop=True)
+
+def _day_name_id(val):
+    try:
+        day_eng = pd.to_datetime(val).day_name()
+        return DAYS_ID.get(day_eng, day_eng)
+    except:
+        return str(val)
+
+def build_daily_plan_frame(df):
+    src = df.iloc[::-1]
+    out = pd.DataFrame(index=src.index)
+    out['tanggal'] = date_column(src['Tanggal'])
+
+    # 'Hari' holds a handful of distinct values -> resolve each once
+    hari = _optional(src, 'Hari')
+    hari_names = {v: _day_name_id(v) for v in hari.dropna().unique()}
+    from_tanggal = pd.to_datetime(src['Tanggal'], errors='coerce').dt.day_name().map(DAYS_ID)
+    out['hari'] = hari.map(hari_names).where(hari.notna(), from_tanggal).astype(object)
+    out['hari'] = out['hari'].where(out['hari'].notna(), None)
+
+    out['shift'] = text_column(_optional(src, 'Shift'))
+    for col, excel_col in [('batu_kapur', 'Batu Kapur'), ('silika', 'Silika'), ('clay', 'Clay')]:
+        out[col] = float_column(src[excel_col]) if excel_col in src.columns else 0.0
+    for col, excel_col in [('alat_muat', 'Alat Muat'), ('alat_angkut', 'Alat Angkut'), ('blok', 'Blok'),
+                           ('grid', 'Grid'), ('rom', 'ROM'), ('keterangan', 'Keterangan')]:
+        out[col] = text_column(src[excel_col], keep_null=False) if excel_col in src.columns else None
+    return out.reset_index(drop=True)
+
+DOWNTIME_TEXT_COLUMNS = {
+    'shift': 'Shift', 'gangguan': 'Gangguan', 'alat': 'Alat',
+    'kelompok_masalah': 'Kelompok Masalah', 'info_ccr': 'Info CCR', 'remarks': 'Remarks',
+    'penyebab': 'Penyebab', 'action': 'Action', 'status': 'Status', 'crusher': 'Crusher',
+    'sub_komponen': 'Sub Komponen', 'keterangan': 'Keterangan',
+    'identifikasi_masalah': 'Identifikasi Masalah', 'plan': 'Plan', 'pic': 'PIC',
+    'due_date': 'Due Date', 'spare_part': 'Spare Part', 'info_spare_part': 'Info Spare Part',
+    'link_lampiran': 'Link/Lampiran', 'extra': 'Extra',
+}
+
+def build_downtime_frame(df):
+    src = df.iloc[::-1]
+    out = pd.DataFrame(index=src.index)
+    out['tanggal'] = date_column(src['Tanggal'])
+    out['start'] = format_time_column(src['Start'])
+    out['end'] = format_time_column(src['End'])
+    out = out.assign(**downtime_minutes_columns(out['start'], out['end']))
+    out['durasi'] = float_column(src['Durasi'], decimals=2)
+    for col, excel_col in DOWNTIME_TEXT_COLUMNS.items():
+        out[col] = text_column(src[excel_col])
+    return out.reset_index(drop=True)
 
-def safe_bulk_insert_report(session, model_class, records, label="Data", date_column='date'):
+# ==============================================================================
+# INCREMENTAL (UPSERT) SYNC CONFIGURATION
+# ==============================================================================
+# 'incremental' : Only write rows that were inserted / changed / deleted (default)
+# 'full'        : Delete ALL rows and re-insert everything (legacy behaviour)
+# 'window'      : Replace only the last SYNC_PERIOD_DAYS days (see PERIOD above)
+SYNC_MODE = os.getenv("SYNC_MODE", "incremental").lower()
+
+# Natural key per table: the columns that identify "the same row" between syncs.
+# Repeated keys (e.g. one truck logged twice in the same hour) are disambiguated
+# with an occurrence ordinal counted in Excel order, so appending rows never
+# changes the key of an existing row.
+SYNC_KEYS = {
+    'production_logs': ['date', 'shift', 'time', 'excavator', 'dump_truck'],
+    'downtime_logs': ['tanggal', 'shift', 'start', 'alat'],
+    'stockpile_logs': ['date', 'time', 'shift', 'unit'],
+    'shipping_logs': ['tanggal', 'shift'],
+    'daily_plan_logs': ['tanggal', 'shift', 'alat_muat', 'blok'],
+    'target_logs': ['date'],
+}
+
+# Bookkeeping columns that are never part of the content hash
+SYNC_META_COLUMNS = {'id', 'created_at', 'row_key', 'row_hash'}
+
+# Computed from hashed columns at sync (utils/bulk_writer), so hashing them
+# adds nothing; left out, adding one never marks every existing row changed
+SYNC_DERIVED_COLUMNS = {'hour', 'slot_start', 'slot_end', 'start_min', 'end_min', 'duration_min'}
+
+DELETE_CHUNK_SIZE = 500
+
+def _hash_rows(frame):
+    """64-bit content hash per row as 16 hex chars (vectorized)"""
+    hashed = pd.util.hash_pandas_object(frame.astype(object), index=False)
+    return hashed.map('{:016x}'.format)
+
+def sync_value_columns(model_class):
+    """Model columns that carry Excel content (hashed to detect changes)"""
+    return [c.name for c in model_class.__table__.columns if c.name not in SYNC_META_COLUMNS]
+
+def sync_content_columns(model_class):
+    """
+    Frame columns hashed into row_hash: the value columns with each dimension
+    key (utils/dimensions) replaced by the name it stands for, in table order,
+    minus the derived ones. Keys depend on the order names were first synced,
+    the names do not.
+    """
+    names = {key_column(c): c for c in DIMENSIONS.get(model_class.__tablename__, {})}
+    return [names.get(c, c) for c in sync_value_columns(model_class) if c not in SYNC_DERIVED_COLUMNS]
+
+def assign_row_identity(model_class, frame):
+    """
+    Add a stable natural key (row_key) and content hash (row_hash) to a
+    latest-first model frame.
+    """
+    key_cols = SYNC_KEYS[model_class.__tablename__]
+    content_cols = [c for c in sync_content_columns(model_class) if c in frame.columns]
+
+    frame = frame.reset_index(drop=True)
+    base = _hash_rows(frame[key_cols])
+    # Count duplicate keys in Excel order (oldest first) so ordinals are append-stable
+    oldest_first = base.iloc[::-1]
+    ordinal = oldest_first.groupby(oldest_first).cumcount().sort_index()
+
+    frame['row_key'] = _hash_rows(pd.DataFrame({'key': base, 'n': ordinal}))
+    frame['row_hash'] = _hash_rows(frame[content_cols])
+    return frame
+
+# ------------------------------------------------------------------------------
+# Staging: every table is first loaded into <table>_staging and validated
+# there. The live table is only touched by one short apply transaction, so
+# dashboards never see a half-written table while the bulk load runs.
+# ------------------------------------------------------------------------------
+STAGING_METADATA = MetaData()
+
+# Refuse to apply a staged copy with fewer rows than this share of the live
+# table (a truncated workbook would otherwise wipe the dashboard); 0 disables.
+# In window mode the staged window is compared with the live rows of the
+# same window, unless the parser confirmed it read every row of the window
+# (then it may legitimately shrink or empty). Not checked on a forced sync
+SYNC_MIN_ROW_RATIO = float(os.getenv("SYNC_MIN_ROW_RATIO", "0.5"))
+
+def staging_table(model_class):
+    """<table>_staging: the model columns (no keys / indexes) plus the sync plan"""
+    table = model_class.__table__
+    name = f"{table.name}_staging"
+    if name in STAGING_METADATA.tables:
+        return STAGING_METADATA.tables[name]
+    return Table(
+        name, STAGING_METADATA,
+        *[Column(c.name, c.type) for c in table.columns],
+        Column('sync_pos', Integer),    # Frame position (latest Excel row first)
+        Column('sync_op', String(8)),   # 'insert' | 'update' | 'keep'
+    )
+
+def stage_frame(session, model_class, frame):
+    """(Re)create the staging table and bulk load `frame` into it, own transaction"""
+    staging = staging_table(model_class)
+    conn = session.connection()
+    staging.drop(conn, checkfirst=True)  # Recreated so it always matches the model
+    staging.create(conn)
+    write_frame(conn, staging, frame.assign(sync_pos=np.arange(len(frame))))
+    session.commit()
+    return staging
+
+def drop_staging(session, staging):
+    try:
+        staging.drop(session.connection(), checkfirst=True)
+        session.commit()
+    except Exception as e:
+        session.rollback()
+        print(f"Failed to drop {staging.name}: {e}")
+
+def validate_staging(conn, model_class, staging, frame, date_column, min_ratio=SYNC_MIN_ROW_RATIO, live_where=None):
+    """
+    Row count / date range of the staged copy against the parsed frame, and
+    its row count against `min_ratio` of the live table, or of its rows
+    matching `live_where` (0 = not checked)
+    """
+    date_col = staging.c[date_column]
+    staged, first, last = conn.execute(
+        select(func.count(), func.min(date_col), func.max(date_col)).select_from(staging)
+    ).one()
+    if staged != len(frame):
+        return f"staged {staged} of {len(frame)} rows"
+
+    dates = frame[date_column].dropna()
+    if not dates.empty and (first, last) != (dates.min(), dates.max()):
+        return f"staged dates {first}..{last}, parsed {dates.min()}..{dates.max()}"
+
+    if not min_ratio:
+        return None
+    live_rows = select(func.count()).select_from(model_class.__table__)
+    if live_where is not None:
+        live_rows = live_rows.where(live_where)
+    live = conn.execute(live_rows).scalar()
+    if live and staged < live * min_ratio:
+        return f"only {staged} rows staged vs {live} live"
+    return None
+
+def _insert_from_staging(conn, table, staging, columns, op=None):
+    query = select(*[staging.c[c] for c in columns]).order_by(staging.c.sync_pos)
+    if op is not None:
+        query = query.where(staging.c.sync_op == op)
+    conn.execute(table.insert().from_select(columns, query))
+
+def incremental_sync_report(session, model_class, frame, label="Data", date_column='date', force=False):
+    """
+    INCREMENTAL SYNC: Diff parsed rows against the table by natural key and
+    content hash, then only delete / update / insert what actually changed.
+
+    New rows get ids below the current minimum so that ordering by id keeps
+    the "latest Excel row first" convention the views rely on. Rollups of the
+    table (utils/rollups.py) are refreshed for the touched dates only, and
+    dimension names (utils/dimensions.py) only pruned when rows went away
+    or changed.
+    """
+    if frame is None or frame.empty:
+        return f"⚠️ {label}: Empty (No Data in Excel)"
+
+    table = model_class.__table__
+    staging = None
+    try:
+        frame = assign_row_identity(model_class, frame)
+        frame = assign_dimension_keys(session.connection(), table.name, frame)
+        value_cols = [c for c in sync_value_columns(model_class) if c in frame.columns]
+
+        # 1. PLAN (read only): diff parsed keys / hashes against the live table
+        # Rolled-up tables also need the dates of the rows they remove / update
+        rolled = table.name in ROLLUPS
+        identity = [table.c.id, table.c.row_key, table.c.row_hash] + ([table.c[date_column]] if rolled else [])
+        existing = pd.read_sql(select(*identity), session.connection())
+        session.commit()
+        # Rows from a previous full sync have no key; they are replaced once
+        stale = existing['row_key'].isna() | existing['row_key'].duplicated()
+        live = existing[~stale]
+
+        merged = frame[['row_key', 'row_hash']].merge(
+            live.rename(columns={'row_hash': 'db_hash'}), on='row_key', how='left'
+        )
+        is_new = merged['id'].isna().to_numpy()
+        is_changed = ~is_new & (merged['row_hash'] != merged['db_hash']).to_numpy()
+
+        deleted_ids = live.loc[~live['row_key'].isin(frame['row_key']), 'id']
+        remove_ids = [int(i) for i in pd.concat([existing.loc[stale, 'id'], deleted_ids])]
+
+        frame['sync_op'] = np.select([is_new, is_changed], ['insert', 'update'], 'keep')
+        insert_cols = [c for c in frame.columns if c in table.c] + ['created_at']
+        min_id = live['id'].min() if not live.empty else None
+        if is_new.any() and min_id is not None and not pd.isna(min_id):
+            # frame is latest-first -> lowest id goes to the latest row
+            ids = pd.array([pd.NA] * len(frame), dtype='Int64')
+            ids[is_new] = np.arange(int(min_id) - int(is_new.sum()), int(min_id))
+            frame['id'] = ids
+            insert_cols.append('id')
+
+        # 2. STAGE + VALIDATE (live table untouched)
+        staging = stage_frame(session, model_class, frame)
+        conn = session.connection()
+        problem = validate_staging(conn, model_class, staging, frame, date_column,
+                                   min_ratio=0 if force else SYNC_MIN_ROW_RATIO)
+        if problem:
+            session.rollback()
+            return f"❌ {label}: Validation failed ({problem})"
+
+        # 3. APPLY (one short transaction)
+        for i in range(0, len(remove_ids), DELETE_CHUNK_SIZE):
+            conn.execute(table.delete().where(table.c.id.in_(remove_ids[i:i + DELETE_CHUNK_SIZE])))
+
+        if is_changed.any():
+            changed = frame.loc[is_changed, value_cols + ['row_hash']].copy()
+            changed['_id'] = merged.loc[is_changed, 'id'].astype(int).to_numpy()
+            conn.execute(table.update().where(table.c.id == bindparam('_id')), frame_to_rows(changed))
+
+        if is_new.any():
+            _insert_from_staging(conn, table, staging, insert_cols, op='insert')
+
+        if rolled:
+            old_ids = remove_ids + [int(i) for i in merged.loc[is_changed, 'id']]
+            touched = pd.concat([frame.loc[is_new | is_changed, date_column],
+                                 existing.loc[existing['id'].isin(old_ids), date_column]])
+            refresh_rollups(conn, table.name, dates=touched)
+        if remove_ids or is_changed.any():
+            prune_dimensions(conn, table.name)
+
+        session.commit()
+
+        inserted, updated = int(is_new.sum()), int(is_changed.sum())
+        unchanged = len(frame) - inserted - updated
+        return (f"✅ {label}: {inserted} inserted, {updated} updated, "
+                f"{len(deleted_ids)} deleted ({unchanged} unchanged)")
+    except Exception as e:
+        session.rollback()
+        return f"❌ {label}: Error ({str(e)[:50]})"
+    finally:
+        if staging is not None:
+            drop_staging(session, staging)
+
+def sync_table_report(session, model_class, frame, label="Data", date_column='date', mode=None, force=False,
+                      covered=False):
+    """
+    Write one table using `mode` (default: the configured SYNC_MODE);
+    force=True skips the SYNC_MIN_ROW_RATIO check. covered=True: the parser
+    confirmed `frame` holds every row of the sync window (window mode)
+    """
+    mode = mode or SYNC_MODE
+    if mode == 'full':
+        return safe_bulk_insert_report(session, model_class, frame, label, date_column=date_column, force=force)
+    if mode == 'window':
+        return window_sync_report(session, model_class, frame, label, date_column=date_column,
+                                  force=force, covered=covered)
+    return incremental_sync_report(session, model_class, frame, label, date_column=date_column, force=force)
+
+def safe_bulk_insert_report(session, model_class, frame, label="Data", date_column='date', force=False):
     """
     FULL SYNC: Delete ALL data and insert ALL records.
     This ensures 100% data accuracy - any changes in Excel will be reflected.
-    
-    Trade-off: Slightly slower as data grows, but guaranteed accuracy.
+
+    The records are bulk loaded into the staging table first; the delete and
+    the INSERT ... SELECT from staging then run in one short transaction.
     """
-    if not records:
+    if frame is None or frame.empty:
         return f"⚠️ {label}: Empty (No Data in Excel)"
-    
+
+    table = model_class.__table__
+    staging = None
+    try:
+        # Stamp keys so a later incremental sync can diff against these rows
+        frame = assign_row_identity(model_class, frame)
+        frame = assign_dimension_keys(session.connection(), table.name, frame)
+        insert_cols = [c for c in frame.columns if c in table.c and c != 'id'] + ['created_at']
+
+        staging = stage_frame(session, model_class, frame)
+        conn = session.connection()
+        problem = validate_staging(conn, model_class, staging, frame, date_column,
+                                   min_ratio=0 if force else SYNC_MIN_ROW_RATIO)
+        if problem:
+            session.rollback()
+            return f"❌ {label}: Validation failed ({problem})"
+
+        # Full Replace
+        conn.execute(table.delete())
+        _insert_from_staging(conn, table, staging, insert_cols)
+        refresh_rollups(conn, table.name)
+        prune_dimensions(conn, table.name)
+        session.commit()
+
+        return f"✅ {label}: Success ({len(frame)} rows synced)"
+    except Exception as e:
+        session.rollback()
+        return f"❌ {label}: Error ({str(e)[:50]})"
+    finally:
+        if staging is not None:
+            drop_staging(session, staging)
+
+def window_sync_report(session, model_class, frame, label="Data", date_column='date', days=SYNC_PERIOD_DAYS,
+                       force=False, covered=False):
+    """
+    WINDOW SYNC: Replace only the rows dated within the last `days` days
+    (date-bounded DELETE + insert from staging); older rows are untouched.
+
+    Window rows get ids below the oldest rows kept, so ordering by id keeps
+    the "latest Excel row first" convention the views rely on. Unless
+    `covered` (the parser confirmed it read every row of the window) or
+    `force`, the window is held to SYNC_MIN_ROW_RATIO of its live rows.
+    """
+    # No rows can be a valid window (nothing dated since the cutoff); no columns is not
+    if frame is None or len(frame.columns) == 0:
+        return f"⚠️ {label}: Empty (No Data in Excel)"
+
+    table = model_class.__table__
+    staging = None
     try:
-        # Delete ALL records (Full Replace)
-        session.query(model_class).delete()
-        
-        # Insert all records
-        session.bulk_save_objects(records)
+        cutoff = period_cutoff(days)
+        in_window = table.c[date_column] >= cutoff
+        # Keys are per date, so they match what incremental mode writes even
+        # when the parsers already dropped the rows before the cutoff
+        frame = filter_frame_by_period(assign_row_identity(model_class, frame), date_column, days)
+        frame = assign_dimension_keys(session.connection(), table.name, frame)
+        insert_cols = [c for c in frame.columns if c in table.c and c != 'id'] + ['created_at']
+
+        kept_min_id = session.connection().execute(select(func.min(table.c.id)).where(~in_window)).scalar()
+        session.commit()
+        if kept_min_id is not None and not frame.empty:
+            frame['id'] = np.arange(kept_min_id - len(frame), kept_min_id)
+            insert_cols.append('id')
+
+        staging = stage_frame(session, model_class, frame)
+        conn = session.connection()
+        # A covered window may shrink or empty (rows age out of it); any other
+        # is compared with the live rows it replaces
+        problem = validate_staging(conn, model_class, staging, frame, date_column,
+                                   min_ratio=0 if force or covered else SYNC_MIN_ROW_RATIO,
+                                   live_where=in_window)
+        if problem:
+            session.rollback()
+            return f"❌ {label}: Validation failed ({problem})"
+
+        # Window Replace
+        removed = conn.execute(table.delete().where(in_window)).rowcount
+        if not frame.empty:
+            _insert_from_staging(conn, table, staging, insert_cols)
+        refresh_rollups(conn, table.name, since=cutoff)
+        prune_dimensions(conn, table.name)
         session.commit()
-        
-        return f"✅ {label}: Success ({len(records)} rows synced)"
+
+        return f"✅ {label}: {len(frame)} rows since {cutoff:%d/%m} replaced ({removed} removed)"
     except Exception as e:
         session.rollback()
         return f"❌ {label}: Error ({str(e)[:50]})"
+    finally:
+        if staging is not None:
+            drop_staging(session, staging)
+
+# ==============================================================================
+# SOURCE PIPELINE (download on threads, parse on processes, write in order)
+# ==============================================================================
+# Number of parser processes; 0 parses on the download threads instead
+PARSE_WORKERS = int(os.getenv("SYNC_PARSE_WORKERS", "4"))
+
+# OneDrive source key -> (report label, parse job returning {report key: DataFrame})
+SYNC_SOURCES = {
+    'produksi': ('Produksi', parse_produksi_source),
+    'monitoring': ('Monitoring', parse_monitoring_source),
+    'daily_plan': ('Daily Plan', parse_daily_plan_source),
+    'gangguan': ('Downtime', parse_gangguan_source),
+}
+
+# Tables are written strictly in this order, whichever download finished first
+# (report key, source key, model, frame builder, date column, label)
+SYNC_TABLES = [
+    ('Produksi', 'produksi', ProductionLog, build_production_frame, 'date', "Production"),
+    ('Shipping', 'monitoring', ShippingLog, build_shipping_frame, 'tanggal', "Shipping"),
+    ('Stockpile', 'monitoring', StockpileLog, build_stockpile_frame, 'date', "Stockpile"),
+    ('Targets', 'monitoring', TargetLog, build_target_frame, 'date', "Targets"),
+    ('Daily Plan', 'daily_plan', DailyPlanLog, build_daily_plan_frame, 'tanggal', "Daily Plan"),
+    ('Downtime', 'gangguan', DowntimeLog, build_downtime_frame, 'tanggal', "Downtime"),
+]
+
+# ------------------------------------------------------------------------------
+# Conditional fetch state: ETag / Last-Modified / SHA-256 of the last workbook
+# that was written successfully, one system_logs row per field per source
+# (e.g. 'fetch_etag:produksi').
+# ------------------------------------------------------------------------------
+FETCH_STATE_FIELDS = ('etag', 'last_modified', 'sha256')
+
+def load_fetch_state(session):
+    """{source key: {'etag': ..., 'last_modified': ..., 'sha256': ...}}"""
+    state = {}
+    for log in session.query(SystemLog).filter(SystemLog.key.like('fetch_%:%')).all():
+        field, _, key = log.key[len('fetch_'):].partition(':')
+        if field in FETCH_STATE_FIELDS:
+            state.setdefault(key, {})[field] = log.value
+    return state
+
+def save_fetch_state(session, key, meta):
+    """Remember the validators of a workbook whose tables were all written"""
+    for field in FETCH_STATE_FIELDS:
+        value = meta.get(field)
+        if value is not None and len(value) > 255:
+            value = None  # Does not fit system_logs.value; never match on it
+        log_key = f"fetch_{field}:{key}"
+        log_entry = session.query(SystemLog).filter_by(key=log_key).first()
+        if value is None:
+            if log_entry:
+                session.delete(log_entry)
+        elif log_entry:
+            log_entry.value = value
+        else:
+            session.add(SystemLog(key=log_key, value=value))
+
+# ------------------------------------------------------------------------------
+# Header hints: the header row each parse job located per sheet, one
+# system_logs row per sheet (e.g. 'header_row:monitoring:Stockpile Hopper'
+# = '<layout>:<row>'). A hint only applies to a workbook with the layout
+# fingerprint it was found in (utils.parsers.layout_fingerprint), and the
+# parsers check a hinted row before trusting it, so a stale hint only
+# costs the scan it would have saved.
+# ------------------------------------------------------------------------------
+def load_header_hints(session):
+    """{source key: {sheet: (layout fingerprint, header row)}}"""
+    hints = {}
+    for log in session.query(SystemLog).filter(SystemLog.key.like('header_row:%:%')).all():
+        _, key, sheet = log.key.split(':', 2)
+        try:
+            layout, row = (log.value or '').rsplit(':', 1)
+            hints.setdefault(key, {})[sheet] = (layout, int(row))
+        except ValueError:
+            continue  # Unreadable, or a row stored before the layout was
+    return hints
+
+def save_header_hints(session, key, hints, previous=None):
+    """Store the header rows a parse job located (only the ones that moved)"""
+    for sheet, (layout, row) in hints.items():
+        log_key = f"header_row:{key}:{sheet}"
+        if len(log_key) > 50 or (previous or {}).get(sheet) == (layout, row):
+            continue
+        _set_system_log(session, log_key, f"{layout}:{row}")
+
+# How often the sync thread relays download progress to the caller
+PROGRESS_INTERVAL_S = 0.5
+
+def _parse_payload(spool, size):
+    """
+    What a parser process receives: the bytes of a small workbook, or the
+    path of a temp file for one that spilled to disk
+    """
+    with spool:
+        if size <= DOWNLOAD_SPOOL_BYTES:
+            return spool.read()
+        fd, path = tempfile.mkstemp(prefix='sync_', suffix='.xlsx')
+        with os.fdopen(fd, 'wb') as out:
+            shutil.copyfileobj(spool, out, DOWNLOAD_CHUNK_SIZE)
+        return path
+
+def _discard_payload(data):
+    if isinstance(data, str) and os.path.exists(data):
+        os.remove(data)
+
+def _download_source(key, previous=None, progress=None):
+    start = time.perf_counter()
+    fetched = fetch_from_onedrive(ONEDRIVE_LINKS[key], progress=progress, **(previous or {}))
+    if fetched and fetched['changed']:
+        fetched['payload'] = _parse_payload(fetched.pop('buffer'), fetched['size'])
+    return fetched, time.perf_counter() - start
+
+def _timed_parse(job, data, header_hints=None, min_date=None):
+    start = time.perf_counter()
+    frames = job(data, header_hints, min_date)
+    return frames, time.perf_counter() - start
+
+def _parse_context():
+    # Plain fork of the multi-threaded Streamlit server is not safe. A
+    # forkserver with the parsers preloaded pays the pandas/openpyxl import
+    # once per server process instead of once per worker per sync.
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        ctx = multiprocessing.get_context('forkserver')
+        ctx.set_forkserver_preload(['utils.parsers'])
+        return ctx
+    return multiprocessing.get_context('spawn')
+
+def _parse_pool():
+    """Process pool for the CPU-bound parsers (None -> parse on threads)"""
+    if PARSE_WORKERS <= 0:
+        return None
+    try:
+        return ProcessPoolExecutor(max_workers=PARSE_WORKERS, mp_context=_parse_context())
+    except Exception as e:
+        print(f"Parser process pool unavailable, parsing on threads: {e}")
+        return None
+
+# The background worker keeps one parser pool for its lifetime (run_worker),
+# so the parser processes and their per-process caches (e.g. the excavator
+# names of utils.parsers._normalize_excavator_text) outlive a single sync.
+# Other syncs (dashboard button, one-shot CLI) use a pool of their own.
+_keep_parse_pool = False
+_kept_parse_pool = None
+
+def _acquire_parse_pool():
+    """(pool, owned): the kept pool (owned=False), or a new pool this sync shuts down"""
+    global _kept_parse_pool
+    if not _keep_parse_pool:
+        return _parse_pool(), True
+    if _kept_parse_pool is None:
+        _kept_parse_pool = _parse_pool()
+    return _kept_parse_pool, False
+
+def _drop_parse_pool(pool):
+    """Forget a broken pool, so the next sync starts a new one"""
+    global _kept_parse_pool
+    if pool is not None and pool is _kept_parse_pool:
+        _kept_parse_pool = None
+        pool.shutdown(wait=False)
+
+def shutdown_parse_pool():
+    """Stop keeping a parser pool and shut the kept one down"""
+    global _keep_parse_pool, _kept_parse_pool
+    _keep_parse_pool = False
+    if _kept_parse_pool is not None:
+        _kept_parse_pool.shutdown()
+        _kept_parse_pool = None
+
+def fetch_and_parse_sources(keys=None, fetch_state=None, progress=None, header_hints=None, min_date=None):
+    """
+    Download every source concurrently and parse each one as soon as its
+    bytes arrive. Returns ({source key: result dict}, stage wall seconds).
+    A result holds 'frames', 'error' or 'unchanged', plus 'fetch' (validators
+    of the downloaded workbook), 'header_hints' (header rows the parser
+    located), 'dropped' (rows the parser read but did not return, by stage),
+    'download_bytes' (transferred, changed or not), 'download_s', 'parse_s',
+    'ready_s'.
+    
+    `fetch_state` ({source key: validators}, see load_fetch_state) turns the
+    downloads into conditional requests; unchanged sources are not parsed.
+    `header_hints` ({source key: {sheet: (layout, row)}}, see
+    load_header_hints) lets the parsers skip their header scans. Rows dated
+    before `min_date` are skipped while the append-only sheets are streamed.
+    `progress(label, done_bytes, total_bytes)` is called on the calling
+    thread (safe for Streamlit widgets) while downloads are running.
+    """
+    keys = list(keys or SYNC_SOURCES.keys())
+    fetch_state = fetch_state or {}
+    header_hints = header_hints or {}
+    results = {key: {'download_s': 0.0, 'parse_s': 0.0, 'download_bytes': 0} for key in keys}
+    started = time.perf_counter()
+
+    # Written by the download threads, relayed by this thread
+    transferred, reported = {}, {}
+
+    def track(key):
+        def on_chunk(done, total):
+            transferred[key] = (done, total)
+        return on_chunk
+
+    def relay_progress():
+        for key, value in list(transferred.items()):
+            if progress and reported.get(key) != value:
+                reported[key] = value
+                progress(SYNC_SOURCES[key][0], *value)
+
+    proc_pool, owned = _acquire_parse_pool()
+    try:
+        with ThreadPoolExecutor(max_workers=len(keys)) as io_pool:
+            parse_pool = proc_pool or io_pool
+
+            def submit_parse(key, job, data):
+                # A dead parser process breaks the pool: the remaining jobs parse on threads
+                nonlocal parse_pool
+                args = (_timed_parse, job, data, header_hints.get(key), min_date)
+                try:
+                    return parse_pool.submit(*args)
+                except BrokenProcessPool:
+                    _drop_parse_pool(proc_pool)
+                    parse_pool = io_pool
+                    return io_pool.submit(*args)
+
+            pending = {
+                io_pool.submit(_download_source, key, fetch_state.get(key), track(key)): ('download', key, None)
+                for key in keys
+            }
+
+            while pending:
+                done, _ = wait(pending, timeout=PROGRESS_INTERVAL_S, return_when=FIRST_COMPLETED)
+                relay_progress()
+                for fut in done:
+                    stage, key, data = pending.pop(fut)
+                    res = results[key]
+                    job = SYNC_SOURCES[key][1]
+
+                    if stage == 'download':
+                        try:
+                            fetched, res['download_s'] = fut.result()
+                        except Exception as e:
+                            res['error'] = f"❌ Error: {str(e)[:50]}"
+                            res['download_bytes'] = transferred.get(key, (0, 0))[0]  # Up to the failure
+                            continue
+                        if not fetched:
+                            res['error'] = "❌ Download Failed"
+                            continue
+                        # Whatever comes of them: identical content was downloaded too (0 on a 304)
+                        res['download_bytes'] = fetched['size']
+                        if not fetched['changed']:
+                            res['unchanged'] = True
+                            continue
+                        data = fetched.pop('payload')
+                        res['fetch'] = fetched
+                        pending[submit_parse(key, job, data)] = ('parse', key, data)
+                        continue
+
+                    try:
+                        try:
+                            res['frames'], res['parse_s'] = fut.result()
+                        except BrokenProcessPool:
+                            _drop_parse_pool(proc_pool)
+                            parse_pool = io_pool
+                            res['frames'], res['parse_s'] = _timed_parse(job, data, header_hints.get(key), min_date)
+                        res['header_hints'] = res['frames'].pop(HEADER_HINTS_KEY, {})
+                        res['covered'] = set(res['frames'].pop(MIN_DATE_COVERED_KEY, ()))
+                        res['dropped'] = res['frames'].pop(ROWS_DROPPED_KEY, {})
+                    except Exception as e:
+                        res['error'] = f"❌ Error: {str(e)[:50]}"
+                    finally:
+                        _discard_payload(data)
+                    res['ready_s'] = time.perf_counter() - started
+    finally:
+        if proc_pool and owned:
+            proc_pool.shutdown()
+
+    return results, time.perf_counter() - started
+
+def timing_report(results, stage_s):
+    """Per-source timings and the speedup over running the sources one by one"""
+    report = {}
+    sequential_s = 0.0
+    for key, res in results.items():
+        sequential_s += res['download_s'] + res['parse_s']
+        if res.get('unchanged'):
+            report[f"⏱ {SYNC_SOURCES[key][0]}"] = f"check {res['download_s']:.1f}s · unchanged"
+            continue
+        if 'frames' not in res:
+            report[f"⏱ {SYNC_SOURCES[key][0]}"] = f"failed after {res['download_s'] + res['parse_s']:.1f}s"
+            continue
+        report[f"⏱ {SYNC_SOURCES[key][0]}"] = (
+            f"download {res['download_s']:.1f}s · parse {res['parse_s']:.1f}s · "
+            f"ready at {res.get('ready_s', stage_s):.1f}s"
+        )
+    if not any('frames' in res for res in results.values()):
+        report["⏱ Fetch & Parse"] = f"{stage_s:.1f}s (nothing to parse)"
+        return report
+    speedup = sequential_s / stage_s if stage_s > 0 else 1.0
+    report["⏱ Fetch & Parse"] = f"{stage_s:.1f}s wall vs {sequential_s:.1f}s sequential ({speedup:.1f}x)"
+    return report
 
 # ==============================================================================
 # MAIN SYNC FUNCTION
 # ==============================================================================
 
-def sync_all_data():
+def sync_all_data(force=False, progress=None):
     """
     Synchronize ALL data from OneDrive to Database.
+    Workbooks that did not change since the last successful sync are skipped
+    (HTTP 304 or identical SHA-256); force=True downloads and writes everything.
+    progress(label, done_bytes, total_bytes) reports download progress.
+    Only one sync runs at a time (lease in system_logs, see acquire_sync_lease).
     Returns a dictionary of status strings.
     """
-    status_report = {}
-    
-    engine = get_db_engine()
+    engine = create_db_engine()
     if not engine:
         return {"ERROR": "Database Connection Failed"}
-        
-    Session = sessionmaker(bind=engine)
-    session = Session()
 
-    # 1. PRODUCTION
     try:
-        source_prod = download_from_onedrive(ONEDRIVE_LINKS['produksi'])
-        if source_prod:
-            df_prod = parse_production_data(source_prod)
-            if not df_prod.empty:
-                records_prod = []
-                for _, row in df_prod.iloc[::-1].iterrows():
-                    kwargs = {
-                        'date': row['Date'],
-                        'shift': int(float(str(row['Shift']).lower().replace('shift', '').strip())) if pd.notna(row['Shift']) else 1,
-                        'time': str(row['Time']) if pd.notna(row['Time']) else None,
-                        'excavator': str(row['Excavator']) if pd.notna(row['Excavator']) else None,
-                        'commodity': str(row['Commodity']) if 'Commodity' in row and pd.notna(row['Commodity']) else None,
-                        'dump_truck': str(int(float(row['Dump Truck']))) if pd.notna(row['Dump Truck']) and str(row['Dump Truck']).replace('.0','').isdigit() else str(row['Dump Truck']) if pd.notna(row['Dump Truck']) else None,
-                        'rit': int(row['Rit']) if pd.notna(row['Rit']) else 0,
-                        'tonnase': float(row['tonnase']) if 'tonnase' in row and pd.notna(row['tonnase']) else float(row['Tonase']) if pd.notna(row['Tonase']) else 0.0,
-                        'front': str(row['Front']) if pd.notna(row['Front']) else None,
-                        'dump_loc': str(row['Dump Loc']) if pd.notna(row['Dump Loc']) else None,
-                        'blok': str(row['BLOK']) if 'BLOK' in row and pd.notna(row['BLOK']) else None,
-                    }
-                    records_prod.append(ProductionLog(**kwargs))
-                
-                records_prod = filter_records_by_year(records_prod, 'date', 2026)
-                status_report['Produksi'] = safe_bulk_insert_report(session, ProductionLog, records_prod, "Production", date_column='date')
-            else:
-                status_report['Produksi'] = "⚠️ Empty Data"
-        else:
-             status_report['Produksi'] = "❌ Download Failed"
+        upgrade_schema(engine)
     except Exception as e:
-        status_report['Produksi'] = f"❌ Error: {str(e)[:50]}"
+        print(f"Schema upgrade failed: {e}")
 
-    # 2. SHIPPING & STOCKPILE (Monitoring.xlsx)
+    owner = _sync_owner()
+    if not acquire_sync_lease(engine, owner):
+        return {"Sync": "⏳ Another sync is already running, skipped"}
+
+    stop, lost = threading.Event(), threading.Event()
+    keeper = threading.Thread(target=_keep_sync_lease, args=(engine, owner, stop, lost), daemon=True)
+    keeper.start()
     try:
-        source_mon = download_from_onedrive(ONEDRIVE_LINKS['monitoring'])
-        if source_mon:
-            # Shipping
-            df_ship = parse_shipping_data(source_mon)
-            if not df_ship.empty:
-                records = []
-                for _, row in df_ship.iloc[::-1].iterrows():
-                    rec = ShippingLog(
-                        tanggal=row['Date'],
-                        shift=int(row['Shift']),
-                        ap_ls=float(row['AP_LS']),
-                        ap_ls_mk3=float(row['AP_LS_MK3']),
-                        ap_ss=float(row['AP_SS']),
-                        total_ls=float(row['Total_LS']),
-                        total_ss=float(row['Total_SS'])
-                    )
-                    records.append(rec)
-                records = filter_records_by_year(records, 'tanggal', 2026)
-                status_report['Shipping'] = safe_bulk_insert_report(session, ShippingLog, records, "Shipping", date_column='tanggal')
-            else:
-                status_report['Shipping'] = "⚠️ Empty Data"
-
-            # Stockpile
-            if hasattr(source_mon, 'seek'): source_mon.seek(0)
-            df_stock = parse_stockpile_hopper(source_mon)
-            if not df_stock.empty:
-                records_st = []
-                for _, row in df_stock.iloc[::-1].iterrows():
-                    rec = StockpileLog(
-                        date=row['Tanggal'],
-                        time=str(row['Jam']),
-                        shift=int(row['Shift']) if pd.notna(row['Shift']) else 1,
-                        dumping=str(row['Loader']) if 'Loader' in row else None,
-                        unit=str(row['Unit']) if 'Unit' in row else None,
-                        ritase=float(row['Ritase']) if 'Ritase' in row else 0.0
-                    )
-                    records_st.append(rec)
-                records_st = filter_records_by_year(records_st, 'date', 2026)
-                status_report['Stockpile'] = safe_bulk_insert_report(session, StockpileLog, records_st, "Stockpile", date_column='date')
-            else:
-                 status_report['Stockpile'] = "⚠️ Empty Data"
-                 
-            # Targets
-            if hasattr(source_mon, 'seek'): source_mon.seek(0)
-            df_tgt = parse_target_data(source_mon)
-            if not df_tgt.empty:
-                records_tgt = []
-                for _, row in df_tgt.iterrows():
-                    rec = TargetLog(date=row['Date'], plan=row['Plan'])
-                    records_tgt.append(rec)
-                records_tgt = filter_records_by_year(records_tgt, 'date', 2026)
-                status_report['Targets'] = safe_bulk_insert_report(session, TargetLog, records_tgt, "Targets", date_column='date')
-            else:
-                status_report['Targets'] = "⚠️ Empty Data"
+        return _run_sync(engine, force, progress, lease_lost=lost)
+    finally:
+        stop.set()
+        keeper.join()
+        release_sync_lease(engine, owner)
 
-        else:
-             status_report['Monitoring'] = "❌ Download Failed"
-    except Exception as e:
-        status_report['Monitoring'] = f"❌ Error: {str(e)[:50]}"
+def _run_sync(engine, force=False, progress=None, lease_lost=None):
+    """
+    The sync itself, run under the lease. Once `lease_lost` is set no further
+    table is written (the table being written finishes its transaction).
+    """
+    status_report = {}
+    run_id, started_at = uuid.uuid4().hex, datetime.utcnow()
+    # Per source: rows parsed / kept, write time, per-table status
+    ledger = {key: {'rows_parsed': 0, 'rows_kept': 0, 'write_s': 0.0, 'tables': []} for key in SYNC_SOURCES}
+
+    Session = sessionmaker(bind=engine)
+    session = Session()
+
+    # Window mode: periodically reconcile the whole year from fresh downloads,
+    # catching edits to rows that have already left the window
+    mode, reconcile = SYNC_MODE, False
+    if mode == 'window':
+        try:
+            reconcile = force or reconcile_due(session)
+        except Exception as e:
+            session.rollback()
+            print(f"Failed to read last_full_sync: {e}")
+        if reconcile:
+            mode = 'incremental'
+            status_report["🔁 Reconcile"] = f"Full-year reconcile (every {SYNC_RECONCILE_DAYS} days)"
+
+    fetch_state = {}
+    if not (force or reconcile):
+        try:
+            fetch_state = load_fetch_state(session)
+        except Exception as e:
+            session.rollback()
+            print(f"Failed to load fetch state: {e}")
 
-    # 3. DAILY PLAN
+    header_hints = {}
     try:
-        source_dp = download_from_onedrive(ONEDRIVE_LINKS['daily_plan'])
-        if source_dp:
-            df_dp = parse_daily_plan_data(source_dp)
-            if not df_dp.empty:
-                records_dp = []
-                days_map = {
-                    'Monday': 'Senin', 'Tuesday': 'Selasa', 'Wednesday': 'Rabu',
-                    'Thursday': 'Kamis', 'Friday': 'Jumat', 'Saturday': 'Sabtu', 'Sunday': 'Minggu'
-                }
-                for _, row in df_dp.iloc[::-1].iterrows():
-                    hari_val = row['Hari'] if 'Hari' in row else None
-                    if pd.notna(hari_val):
-                        try:
-                            dt_hari = pd.to_datetime(hari_val)
-                            day_eng = dt_hari.day_name()
-                            hari_val = days_map.get(day_eng, day_eng)
-                        except: hari_val = str(hari_val)
-                    else:
-                        try:
-                            dt_tgl = pd.to_datetime(row['Tanggal'])
-                            day_eng = dt_tgl.day_name()
-                            hari_val = days_map.get(day_eng, day_eng)
-                        except: hari_val = None
-                        
-                    kwargs = {
-                        'tanggal': row['Tanggal'],
-                        'hari': hari_val,
-                        'shift': str(row['Shift']) if 'Shift' in row and pd.notna(row['Shift']) else None,
-                        'batu_kapur': float(row['Batu Kapur']) if 'Batu Kapur' in row else 0,
-                        'silika': float(row['Silika']) if 'Silika' in row else 0,
-                        'clay': float(row['Clay']) if 'Clay' in row else 0,
-                        'alat_muat': str(row['Alat Muat']) if 'Alat Muat' in row else None,
-                        'alat_angkut': str(row['Alat Angkut']) if 'Alat Angkut' in row else None,
-                        'blok': str(row['Blok']) if 'Blok' in row else None,
-                        'grid': str(row['Grid']) if 'Grid' in row else None,
-                        'rom': str(row['ROM']) if 'ROM' in row else None,
-                        'keterangan': str(row['Keterangan']) if 'Keterangan' in row else None,
-                    }
-                    records_dp.append(DailyPlanLog(**kwargs))
-                    
-                records_dp = filter_records_by_year(records_dp, 'tanggal', 2026)
-                status_report['Daily Plan'] = safe_bulk_insert_report(session, DailyPlanLog, records_dp, "Daily Plan", date_column='tanggal')
-            else:
-                status_report['Daily Plan'] = "⚠️ Empty Data"
-        else:
-             status_report['Daily Plan'] = "❌ Download Failed"
+        header_hints = load_header_hints(session)
     except Exception as e:
-        status_report['Daily Plan'] = f"❌ Error: {str(e)[:50]}"
+        session.rollback()
+        print(f"Failed to load header hints: {e}")
+
+    # Window rows only: the streamed sheets skip everything older while
+    # parsing, in bounded memory (utils/parsers.BOUNDED_READERS). The other
+    # modes read the whole 2026 sheets anyway (the year filter drops the rest)
+    # and keep the fastest reader
+    parse_since = period_cutoff() if mode == 'window' else None
+
+    results, stage_s = fetch_and_parse_sources(
+        fetch_state=fetch_state, progress=progress, header_hints=header_hints, min_date=parse_since
+    )
+
+    for source_key, res in results.items():
+        if not res.get('header_hints'):
+            continue
+        try:
+            save_header_hints(session, source_key, res['header_hints'], header_hints.get(source_key))
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            print(f"Failed to save header hints for {source_key}: {e}")
+
+    # 1. WRITE TABLES (deterministic order)
+    for report_key, source_key, model_class, build_frame, date_col, label in SYNC_TABLES:
+        res = results[source_key]
+        if 'error' in res:
+            status_report[SYNC_SOURCES[source_key][0]] = res['error']
+            continue
+        if res.get('unchanged'):
+            status_report[SYNC_SOURCES[source_key][0]] = "⏭️ Unchanged since last sync (skipped)"
+            continue
+        entry = ledger[source_key]
+        try:
+            if lease_lost is not None and lease_lost.is_set():
+                status_report[report_key] = "❌ Sync lease lost, not written"
+                continue
+            df = res['frames'].get(report_key)
+            # A parsed sheet with no rows since parse_since can be a valid (empty)
+            # window; window_sync_report decides from res['covered']
+            empty_window = mode == 'window' and df is not None and len(df.columns) > 0
+            if df is None or (df.empty and not empty_window):
+                status_report[report_key] = "⚠️ Empty Data"
+                continue
+            frame = filter_frame_by_year(build_frame(df), date_col, 2026)
+            entry['rows_parsed'] += len(df)
+            entry['rows_kept'] += len(frame)
+            write_start = time.perf_counter()
+            status_report[report_key] = sync_table_report(
+                session, model_class, frame, label, date_column=date_col, mode=mode, force=force,
+                covered=report_key in res.get('covered', ())
+            )
+            entry['write_s'] += time.perf_counter() - write_start
+        except Exception as e:
+            status_report[report_key] = f"❌ Error: {str(e)[:50]}"
+        finally:
+            entry['tables'].append(status_report.get(report_key, ""))
+
+    # Remember a workbook only once every table it feeds was written, so a
+    # failed write is retried on the next sync even if the file is unchanged
+    for source_key, res in results.items():
+        if 'fetch' not in res:
+            continue
+        reports = [status_report.get(t[0], "") for t in SYNC_TABLES if t[1] == source_key]
+        if not all(r.startswith("✅") for r in reports):
+            continue
+        try:
+            save_fetch_state(session, source_key, res['fetch'])
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            print(f"Failed to save fetch state for {source_key}: {e}")
+
+    if reconcile and all(status_report.get(t[0], "").startswith("✅") for t in SYNC_TABLES):
+        try:
+            _set_system_log(session, 'last_full_sync', datetime.utcnow().isoformat(timespec='seconds'))
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            print(f"Failed to log full reconcile: {e}")
+
+    status_report.update(timing_report(results, stage_s))
 
-    # 4. DOWNTIME
     try:
-        source_dt = download_from_onedrive(ONEDRIVE_LINKS['gangguan'])
-        if source_dt:
-            df_dt = parse_downtime_data(source_dt)
-            if not df_dt.empty:
-                records_dt = []
-                for _, row in df_dt.iloc[::-1].iterrows():
-                    kwargs = {
-                        'tanggal': row['Tanggal'],
-                        'shift': str(row['Shift']) if pd.notna(row['Shift']) else None,
-                        'start': format_time_val(row['Start']),
-                        'end': format_time_val(row['End']),
-                        'durasi': round(float(row['Durasi']), 2) if pd.notna(row['Durasi']) else 0.0,
-                        'gangguan': str(row['Gangguan']) if pd.notna(row['Gangguan']) else None,
-                        'alat': str(row['Alat']) if pd.notna(row['Alat']) else None,
-                        'kelompok_masalah': str(row['Kelompok Masalah']) if pd.notna(row['Kelompok Masalah']) else None,
-                        'info_ccr': str(row['Info CCR']) if pd.notna(row['Info CCR']) else None,
-                        'remarks': str(row['Remarks']) if pd.notna(row['Remarks']) else None,
-                        'penyebab': str(row['Penyebab']) if pd.notna(row['Penyebab']) else None,
-                        'action': str(row['Action']) if pd.notna(row['Action']) else None,
-                        'status': str(row['Status']) if pd.notna(row['Status']) else None,
-                        'crusher': str(row['Crusher']) if pd.notna(row['Crusher']) else None,
-                        'sub_komponen': str(row['Sub Komponen']) if pd.notna(row['Sub Komponen']) else None,
-                        'keterangan': str(row['Keterangan']) if pd.notna(row['Keterangan']) else None,
-                        'identifikasi_masalah': str(row['Identifikasi Masalah']) if pd.notna(row['Identifikasi Masalah']) else None,
-                        'plan': str(row['Plan']) if pd.notna(row['Plan']) else None,
-                        'pic': str(row['PIC']) if pd.notna(row['PIC']) else None,
-                        'due_date': str(row['Due Date']) if pd.notna(row['Due Date']) else None,
-                        'spare_part': str(row['Spare Part']) if pd.notna(row['Spare Part']) else None,
-                        'info_spare_part': str(row['Info Spare Part']) if pd.notna(row['Info Spare Part']) else None,
-                        'link_lampiran': str(row['Link/Lampiran']) if pd.notna(row['Link/Lampiran']) else None,
-                        'extra': str(row['Extra']) if pd.notna(row['Extra']) else None
-                    }
-                    records_dt.append(DowntimeLog(**kwargs))
-                    
-                records_dt = filter_records_by_year(records_dt, 'tanggal', 2026)
-                status_report['Downtime'] = safe_bulk_insert_report(session, DowntimeLog, records_dt, "Downtime", date_column='tanggal')
-            else:
-                 status_report['Downtime'] = "⚠️ Empty Data"
-        else:
-             status_report['Downtime'] = "❌ Download Failed"
+        record_sync_runs(session, run_id, started_at, results, ledger)
+        session.commit()
     except Exception as e:
-        status_report['Downtime'] = f"❌ Error: {str(e)[:50]}"
+        session.rollback()
+        print(f"Failed to record sync run: {e}")
 
-    # ... (previous code) ...
-    
-    # 5. SAVE SYNC TIME TO DATABASE (PERSISTENT LOG)
+    # 2. SAVE SYNC TIME TO DATABASE (PERSISTENT LOG)
     try:
-        from utils.models import SystemLog
-        
-        # Check if key exists
-        log_entry = session.query(SystemLog).filter_by(key='last_sync').first()
         import pytz
         jakarta_tz = pytz.timezone('Asia/Jakarta')
         current_time_str = datetime.now(jakarta_tz).strftime("%H:%M")
-        
-        if log_entry:
-            log_entry.value = current_time_str
-        else:
-            log_entry = SystemLog(key='last_sync', value=current_time_str)
-            session.add(log_entry)
-            
+
+        _set_system_log(session, 'last_sync', current_time_str)
+        # Data stamp: dashboards clear their caches once when it changes,
+        # so it only moves when a table was actually written
+        if any(status_report.get(t[0], "").startswith("✅") for t in SYNC_TABLES):
+            _set_system_log(session, 'last_sync_at', datetime.utcnow().isoformat(timespec='seconds'))
+
         session.commit()
     except Exception as e:
         print(f"Failed to log sync time: {e}")
 
     session.close()
     return status_report
+
+def _source_outcome(res, tables):
+    """(outcome, error) for one source from its fetch result and table reports"""
+    if 'error' in res:
+        return 'failed', res['error']
+    if res.get('unchanged'):
+        return 'unchanged', None
+    failed = [t for t in tables if t.startswith("❌")]
+    if failed:
+        return 'failed', "; ".join(failed)
+    if tables and all(t.startswith("⚠️") for t in tables):
+        return 'empty', None
+    return 'success', None
+
+# Ledger rows older than this are pruned after every run
+SYNC_RUNS_KEEP_DAYS = int(os.getenv("SYNC_RUNS_KEEP_DAYS", "90"))
+
+def record_sync_runs(session, run_id, started_at, results, ledger):
+    """One sync_runs row per source: where the time went and how many rows survived"""
+    session.query(SyncRun).filter(
+        SyncRun.started_at < started_at - timedelta(days=SYNC_RUNS_KEEP_DAYS)
+    ).delete(synchronize_session=False)
+    for source_key, res in results.items():
+        entry = ledger[source_key]
+        outcome, error = _source_outcome(res, entry['tables'])
+        dropped = res.get('dropped', {})
+        stream_dropped, parser_dropped = dropped.get('stream', 0), dropped.get('parser', 0)
+        session.add(SyncRun(
+            run_id=run_id,
+            started_at=started_at,
+            source=source_key,
+            outcome=outcome,
+            download_bytes=res['download_bytes'],
+            download_ms=int(res['download_s'] * 1000),
+            parse_ms=int(res['parse_s'] * 1000),
+            rows_parsed=entry['rows_parsed'],
+            rows_kept=entry['rows_kept'],
+            rows_dropped=entry['rows_parsed'] - entry['rows_kept'] + stream_dropped + parser_dropped,
+            stream_dropped=stream_dropped,
+            parser_dropped=parser_dropped,
+            write_ms=int(entry['write_s'] * 1000),
+            error=error,
+        ))
+
+def _set_system_log(session, key, value):
+    log_entry = session.query(SystemLog).filter_by(key=key).first()
+    if log_entry:
+        log_entry.value = value
+        log_entry.updated_at = datetime.utcnow()  # Touch even when the value is unchanged
+    else:
+        session.add(SystemLog(key=key, value=value))
+
+# ==============================================================================
+# BACKGROUND WORKER (python -m utils.sync_manager --watch)
+# ==============================================================================
+# The worker syncs on a schedule and on request from the dashboard, so the
+# Streamlit script run only reads results. Coordination is via system_logs:
+#   sync_lease     - owner of the running sync (updated_at = last renewal)
+#   sync_requested - set by the sidebar button, cleared by the worker
+#   sync_worker    - worker identity (updated_at = heartbeat)
+SYNC_LEASE_KEY = 'sync_lease'
+SYNC_REQUEST_KEY = 'sync_requested'
+WORKER_HEARTBEAT_KEY = 'sync_worker'
+
+SYNC_LEASE_SECONDS = int(os.getenv("SYNC_LEASE_SECONDS", "600"))        # Lease expiry without renewal
+SYNC_INTERVAL_SECONDS = int(os.getenv("SYNC_INTERVAL_SECONDS", "900"))  # Scheduled sync period
+WORKER_POLL_SECONDS = 5                                                 # Request check / heartbeat period
+WORKER_STALE_SECONDS = 60                                               # Heartbeat age = worker gone
+
+def _sync_owner():
+    # Unique per call: Streamlit sessions are threads of one process, so
+    # host:pid alone would let two sessions hold the same lease at once
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex}"
+
+def acquire_sync_lease(engine, owner, seconds=SYNC_LEASE_SECONDS):
+    """Take or renew the sync lease. False while another owner holds a live one."""
+    table = SystemLog.__table__
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        taken = conn.execute(
+            table.update()
+            .where(table.c.key == SYNC_LEASE_KEY)
+            .where(or_(table.c.value == owner, table.c.value == '', table.c.value.is_(None),
+                       table.c.updated_at < now - timedelta(seconds=seconds)))
+            .values(value=owner, updated_at=now)
+        ).rowcount
+    if taken:
+        return True
+    try:
+        with engine.begin() as conn:
+            conn.execute(table.insert().values(key=SYNC_LEASE_KEY, value=owner, updated_at=now))
+        return True
+    except IntegrityError:
+        return False  # Row exists and is held by someone else
+
+def release_sync_lease(engine, owner):
+    table = SystemLog.__table__
+    try:
+        with engine.begin() as conn:
+            conn.execute(
+                table.update()
+                .where(table.c.key == SYNC_LEASE_KEY, table.c.value == owner)
+                .values(value='', updated_at=datetime.utcnow())
+            )
+    except Exception as e:
+        print(f"Failed to release sync lease: {e}")
+
+def _keep_sync_lease(engine, owner, stop, lost):
+    """
+    Renew the lease well before expiry until `stop` is set. Sets `lost` and
+    stops renewing once another owner took the lease over, or when renewals
+    kept failing for longer than the lease lasts.
+    """
+    renewed = time.monotonic()
+    while not stop.wait(SYNC_LEASE_SECONDS / 3):
+        try:
+            if acquire_sync_lease(engine, owner):
+                renewed = time.monotonic()
+                continue
+            print(f"Sync lease {owner} taken over by another sync")
+        except Exception as e:
+            print(f"Failed to renew sync lease: {e}")
+            if time.monotonic() - renewed < SYNC_LEASE_SECONDS:
+                continue
+        lost.set()
+        return
+
+def request_sync(requested_by="dashboard"):
+    """Ask the background worker for a sync (picked up within WORKER_POLL_SECONDS)"""
+    engine = create_db_engine()
+    if not engine:
+        return False
+    session = sessionmaker(bind=engine)()
+    try:
+        _set_system_log(session, SYNC_REQUEST_KEY, str(requested_by)[:255])
+        session.commit()
+        return True
+    finally:
+        session.close()
+
+def worker_is_alive(engine=None):
+    """True when a background worker sent a heartbeat recently"""
+    engine = engine or create_db_engine()
+    if not engine:
+        return False
+    table = SystemLog.__table__
+    try:
+        with engine.connect() as conn:
+            beat = conn.execute(
+                select(table.c.updated_at).where(table.c.key == WORKER_HEARTBEAT_KEY)
+            ).scalar()
+    except Exception:
+        return False
+    return beat is not None and datetime.utcnow() - beat < timedelta(seconds=WORKER_STALE_SECONDS)
+
+def _take_sync_request(engine):
+    """Clear the request flag; True if it was set"""
+    table = SystemLog.__table__
+    with engine.begin() as conn:
+        return conn.execute(
+            table.update()
+            .where(table.c.key == SYNC_REQUEST_KEY, table.c.value != '')
+            .values(value='', updated_at=datetime.utcnow())
+        ).rowcount > 0
+
+def _worker_heartbeat(engine, owner, stop):
+    session = sessionmaker(bind=engine)()
+    try:
+        while True:
+            try:
+                _set_system_log(session, WORKER_HEARTBEAT_KEY, owner)
+                session.commit()
+            except Exception as e:
+                session.rollback()
+                print(f"Worker heartbeat failed: {e}")
+            if stop.wait(WORKER_POLL_SECONDS):
+                break
+    finally:
+        session.close()
+
+def run_worker(interval=SYNC_INTERVAL_SECONDS, force=False):
+    """
+    Sync every `interval` seconds and whenever the dashboard requests it,
+    with one parser pool for the worker's lifetime
+    """
+    global _keep_parse_pool
+    engine = create_db_engine()
+    if not engine:
+        print("Database Connection Failed")
+        return 1
+    upgrade_schema(engine)
+
+    owner = _sync_owner()
+    stop = threading.Event()
+    heartbeat = threading.Thread(target=_worker_heartbeat, args=(engine, owner, stop), daemon=True)
+    heartbeat.start()
+    print(f"Sync worker {owner} started (interval {interval}s)")
+    _keep_parse_pool = True
+
+    next_run = time.monotonic()
+    try:
+        while True:
+            try:
+                requested = _take_sync_request(engine)
+                if requested or time.monotonic() >= next_run:
+                    started = datetime.utcnow()
+                    print(f"[{started:%Y-%m-%d %H:%M:%S}] Sync started ({'requested' if requested else 'scheduled'})")
+                    for module, result in sync_all_data(force=force).items():
+                        print(f"  {module}: {result}")
+                    next_run = time.monotonic() + interval
+            except Exception as e:
+                print(f"Worker loop error: {e}")
+                traceback.print_exc()
+            time.sleep(WORKER_POLL_SECONDS)
+    except KeyboardInterrupt:
+        print("Sync worker stopped")
+    finally:
+        shutdown_parse_pool()
+        stop.set()
+        heartbeat.join()
+    return 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sync OneDrive workbooks into the database")
+    parser.add_argument('--watch', action='store_true', help='Run as a background worker')
+    parser.add_argument('--interval', type=int, default=SYNC_INTERVAL_SECONDS,
+                        help='Seconds between scheduled syncs (with --watch)')
+    parser.add_argument('--force', action='store_true', help='Ignore unchanged-workbook checks')
+    args = parser.parse_args(argv)
+
+    if args.watch:
+        return run_worker(args.interval, args.force)
+
+    for module, result in sync_all_data(force=args.force).items():
+        print(f"{module}: {result}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -12,7 +12,7 @@ import pandas as pd
 
 from config import MINING_COLORS, CHART_SEQUENCE, DAILY_PRODUCTION_TARGET, DAILY_INTERNAL_TARGET
 from utils.data_loader import (
-    load_produksi,
+    load_production_rollup,
     load_gangguan_all,
     load_shipping_data,
     load_stockpile_hopper,
@@ -62,10 +62,9 @@ def show_dashboard():
     # 1. GET DATA (From session_state OR disk cache)
     # ----------------------------------------
     # Try session_state first, fallback to disk-cached loaders
-    df_prod = st.session_state.get('df_prod')
-    if df_prod is None or df_prod.empty:
-        df_prod = load_produksi()
-        st.session_state['df_prod'] = df_prod
+    # Production: sync-time rollups already grouped under the sidebar filters
+    filters = st.session_state.get('global_filters', {})
+    prod_daily = load_production_rollup(('date',), filters)
     
     df_gangguan = st.session_state.get('df_gangguan')
     if df_gangguan is None or df_gangguan.empty:
@@ -93,10 +92,6 @@ def show_dashboard():
     # Apply filters to ALL dataframes to ensure consistency
     # Note: apply_global_filters handles date range & shift filtering
     
-    # Production
-    if not df_prod.empty:
-        df_prod = apply_global_filters(df_prod, date_col='Date', shift_col='Shift')
-        
     # Shipping
     if not df_shipping.empty:
         df_shipping = apply_global_filters(df_shipping, date_col='Date', shift_col='Shift')
@@ -126,9 +121,9 @@ def show_dashboard():
     kpi_downtime = 0
     
     # Production
-    if not df_prod.empty:
-        kpi_prod = df_prod['Tonnase'].sum()
-        total_days = df_prod['Date'].nunique()
+    if not prod_daily.empty:
+        kpi_prod = prod_daily['Tonnase'].sum()
+        total_days = len(prod_daily)
         target_prod = DAILY_PRODUCTION_TARGET * total_days if total_days > 0 else DAILY_PRODUCTION_TARGET
         ach_prod = (kpi_prod / target_prod * 100) if target_prod > 0 else 0
     else:
@@ -153,8 +148,8 @@ def show_dashboard():
     # ----------------------------------------
     # Calculate Avg Production
     avg_prod = 0
-    if not df_prod.empty:
-        unique_days = df_prod['Date'].nunique()
+    if not prod_daily.empty:
+        unique_days = len(prod_daily)
         avg_prod = (kpi_prod / unique_days) if unique_days > 0 else 0
 
     st.markdown(f"""
@@ -199,8 +194,8 @@ def show_dashboard():
     with col_trend1:
         with st.container(border=True):
             st.markdown("#### 📈 Tren Produksi Harian")
-            if not df_prod.empty:
-                daily = df_prod.groupby('Date')['Tonnase'].sum().reset_index()
+            if not prod_daily.empty:
+                daily = prod_daily[['Date', 'Tonnase']].copy()
                 
                 # Load Dynamic Plan/Target
                 df_plan = load_analisa_produksi_all()
@@ -285,8 +280,8 @@ def show_dashboard():
             daily_prod = pd.DataFrame()
             daily_ship = pd.DataFrame()
             
-            if not df_prod.empty:
-                daily_prod = df_prod.groupby('Date')['Tonnase'].sum().reset_index()
+            if not prod_daily.empty:
+                daily_prod = prod_daily[['Date', 'Tonnase']].copy()
                 daily_prod.rename(columns={'Tonnase': 'Produksi'}, inplace=True)
                 
             if not df_shipping.empty:
@@ -337,9 +332,10 @@ def show_dashboard():
     with col_ops1:
         with st.container(border=True):
             st.markdown("#### 🚜 Top 5 Unit Excavator (Produksi Tertinggi)")
-            if not df_prod.empty and 'Excavator' in df_prod.columns:
-                # Group by Excavator
-                exca_perf = df_prod.groupby('Excavator')['Tonnase'].sum().reset_index()
+            exca_perf = load_production_rollup(('excavator',), filters) if not prod_daily.empty else pd.DataFrame()
+            if not exca_perf.empty:
+                # Grouped by Excavator
+                exca_perf = exca_perf[['Excavator', 'Tonnase']]
                 exca_perf = exca_perf.sort_values('Tonnase', ascending=True).tail(5) # Top 5
                 
                 fig = px.bar(exca_perf, x='Tonnase', y='Excavator', orientation='h',
@@ -356,11 +352,11 @@ def show_dashboard():
     with col_ops2:
         with st.container(border=True):
             st.markdown("#### 📍 Ritase per Lokasi Kerja (Front)")
-            # Use df_prod 'Front' if available, otherwise load_ritase_by_front?
-            # df_prod usually has 'Front'. Let's check.
+            # Ritase per Front from the production rollup (df_ritase as fallback)
             data_source = pd.DataFrame()
-            if not df_prod.empty and 'Front' in df_prod.columns:
-                 data_source = df_prod.groupby('Front')['Rit'].sum().reset_index()
+            front_rit = load_production_rollup(('front',), filters) if not prod_daily.empty else pd.DataFrame()
+            if not front_rit.empty:
+                 data_source = front_rit[['Front', 'Rit']]
                  data_source.columns = ['Front', 'Total_Ritase']
             elif not df_ritase.empty:
                  data_source = df_ritase # load_ritase_by_front returns summary df
@@ -388,8 +384,8 @@ def show_dashboard():
         recap_df = pd.DataFrame()
         
         # Base: Date Range from Filter or from Data
-        if not df_prod.empty:
-            dates = df_prod['Date'].unique()
+        if not prod_daily.empty:
+            dates = prod_daily['Date'].unique()
         elif not df_shipping.empty:
             dates = df_shipping['Date'].unique()
         else:
@@ -401,8 +397,8 @@ def show_dashboard():
             recap_df['Date'] = pd.to_datetime(recap_df['Date'])
             
             # Merge Production
-            if not df_prod.empty:
-                d_prod = df_prod.groupby('Date')['Tonnase'].sum().reset_index()
+            if not prod_daily.empty:
+                d_prod = prod_daily[['Date', 'Tonnase']].copy()
                 d_prod['Date'] = pd.to_datetime(d_prod['Date']) # Ensure Key is Datetime
                 recap_df = pd.merge(recap_df, d_prod, on='Date', how='left')
                 recap_df.rename(columns={'Tonnase': 'Produksi (Ton)'}, inplace=True)
@@ -452,7 +448,7 @@ def show_dashboard():
             st.dataframe(df_display, use_container_width=True, hide_index=True)
             
             # --- DOWNLOAD: SORT ASCENDING (OLDEST FIRST) & AGGREGATED ---
-            # Use aggregated recap_df, NOT raw df_prod
+            # Use aggregated recap_df, NOT raw production rows
             df_download = recap_df.sort_values(by='Date', ascending=True).copy()
             
             # Format Date for Excel
@@ -2,7 +2,7 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-from utils.data_loader import load_stockpile_hopper, apply_global_filters
+from utils.data_loader import load_stockpile_hopper, apply_global_filters, with_hour
 from utils.helpers import get_chart_layout
 from datetime import datetime
 
@@ -109,18 +109,9 @@ def show_process():
     # 4. CHARTS
     
     # A. Hourly Rhythm (Area Chart)
-    # Extract hour from Jam column (handles both "HH:00-HH:00" format and integer)
-    df_for_hourly = df_filtered.copy()
-    def extract_hour(jam):
-        try:
-            s = str(jam)
-            if ':' in s:
-                return int(s.split(':')[0])
-            return int(float(s))
-        except:
-            return -1
-    df_for_hourly['Hour'] = df_for_hourly['Jam'].apply(extract_hour)
-    df_for_hourly = df_for_hourly[df_for_hourly['Hour'] >= 0]
+    # Hour of the Jam slot, derived at sync (stockpile_logs.hour)
+    df_for_hourly = with_hour(df_filtered, 'Jam')
+    df_for_hourly = df_for_hourly[df_for_hourly['Hour'].notna()]
     
     hourly_rit = df_for_hourly.groupby('Hour')['Ritase'].sum().reset_index()
     hourly_rit.columns = ['Jam', 'Ritase']
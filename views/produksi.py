@@ -3,7 +3,7 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime
-from utils.data_loader import load_produksi, apply_global_filters
+from utils.data_loader import load_produksi, load_production_rollup, apply_global_filters, with_hour
 from utils.helpers import get_chart_layout
 
 # ==========================================
@@ -47,6 +47,8 @@ def show_produksi():
     # This allows us to track how many rows are dropped in Debug
     if 'Tonnase' in df_prod.columns:
         df_prod = df_prod[df_prod['Tonnase'] > 0]
+    # The charts below group the same rows (Tonnase > 0) from the sync-time rollups
+    filters = st.session_state.get('global_filters', {})
     
     # -----------------------------------------------------
 
@@ -56,14 +58,9 @@ def show_produksi():
         
     # Pre-process Data for Analytics
     try:
-        df_prod['TimeStr'] = df_prod['Time'].astype(str).str.strip()
-        def get_hour(t_str):
-            try:
-                if ':' in t_str: return int(t_str.split(':')[0])
-                return int(float(t_str))
-            except: return -1
-        df_prod['Hour'] = df_prod['TimeStr'].apply(get_hour)
-        df_prod_valid_time = df_prod[(df_prod['Hour'] >= 0) & (df_prod['Hour'] <= 23)]
+        # 'Hour' is derived from Time at sync (production_logs.hour)
+        df_prod = with_hour(df_prod)
+        df_prod_valid_time = df_prod[df_prod['Hour'].notna()]
     except Exception as e:
         st.error(f"Error processing Time column: {e}")
         df_prod['Hour'] = 0
@@ -153,8 +150,9 @@ def show_produksi():
         st.markdown("##### 📅 **PERFORMA HARIAN** | Realisasi Harian vs Target")
         st.markdown("---")
         
-        if not df_prod.empty:
-            daily_agg = df_prod.groupby('Date')['Tonnase'].sum().reset_index().sort_values('Date')
+        daily_agg = load_production_rollup(('date',), filters, active=True)
+        if not daily_agg.empty:
+            daily_agg = daily_agg[['Date', 'Tonnase']].sort_values('Date')
             
             # Color Logic: Red (Under) -> Blue (Target) -> Green (Internal)
             colors = []
@@ -240,7 +238,7 @@ def show_produksi():
              st.markdown("---")
 
              if not df_prod_valid_time.empty:
-                 hourly_sum = df_prod_valid_time.groupby('Hour')['Tonnase'].sum().reset_index()
+                 hourly_sum = df_prod_valid_time.groupby('Hour', observed=True)['Tonnase'].sum().reset_index()
                  hourly_sum['Avg'] = hourly_sum['Tonnase'] / total_days
                  
                  # INDUSTRIAL BLUE/GOLD COMBO
@@ -262,8 +260,9 @@ def show_produksi():
             st.markdown("##### 🌓 **KONTRIBUSI SHIFT (%)**")
             st.markdown("---")
             
-            if 'Shift' in df_prod.columns:
-                shift_prod = df_prod.groupby('Shift')['Tonnase'].sum().reset_index()
+            shift_prod = load_production_rollup(('shift',), filters, active=True)
+            if not shift_prod.empty:
+                shift_prod = shift_prod[['Shift', 'Tonnase']]
                 shift_prod['Shift'] = 'Shift ' + shift_prod['Shift'].astype(str).str.replace('Shift ', '')
                 
                 # Standard Shift Colors
@@ -292,8 +291,9 @@ def show_produksi():
             st.markdown("*Sumber: Total Tonnase per Excavator*")
             st.markdown("---")
             
-            if not df_prod.empty:
-                unit_perf = df_prod.groupby('Excavator')['Tonnase'].sum().reset_index().sort_values('Tonnase', ascending=True)
+            unit_perf = load_production_rollup(('excavator',), filters, active=True)
+            if not unit_perf.empty:
+                unit_perf = unit_perf[['Excavator', 'Tonnase']].sort_values('Tonnase', ascending=True)
                 
                 # Solid Blue Bars
                 fig = px.bar(unit_perf, y='Excavator', x='Tonnase', orientation='h', 
@@ -310,8 +310,9 @@ def show_produksi():
             st.markdown("*Sumber: Total Tonnase per Front*")
             st.markdown("---")
             
-            if 'Front' in df_prod.columns and not df_prod.empty:
-                front_prod = df_prod.groupby('Front')['Tonnase'].sum().reset_index().sort_values('Tonnase', ascending=False)
+            front_prod = load_production_rollup(('front',), filters, active=True)
+            if not front_prod.empty:
+                front_prod = front_prod[['Front', 'Tonnase']].sort_values('Tonnase', ascending=False)
                 
                 if len(front_prod) > 10:
                     front_prod = front_prod.head(10)
@@ -391,8 +392,9 @@ def show_produksi():
             st.markdown("*Sumber: Total Tonnase per Dump Location*")
             st.markdown("---")
             
-            if 'Dump Loc' in df_prod.columns and not df_prod.empty:
-                dump_prod = df_prod.groupby('Dump Loc')['Tonnase'].sum().reset_index().sort_values('Tonnase', ascending=True)
+            dump_prod = load_production_rollup(('dump_loc',), filters, active=True)
+            if not dump_prod.empty:
+                dump_prod = dump_prod[['Dump Loc', 'Tonnase']].sort_values('Tonnase', ascending=True)
                 
                 # Solid Green Bars
                 fig_dump = px.bar(dump_prod, x='Tonnase', y='Dump Loc', orientation='h',
@@ -10,7 +10,9 @@ import plotly.graph_objects as go
 import pandas as pd
 from datetime import datetime
 
-from utils.data_loader import load_ritase_by_front, apply_global_filters, load_produksi
+from utils.data_loader import (
+    load_ritase_by_front, apply_global_filters, load_produksi, load_production_rollup, with_hour
+)
 from utils.helpers import get_chart_layout
 
 def show_ritase():
@@ -83,6 +85,8 @@ def show_ritase():
         st.warning("⚠️ Data produksi/ritase tidak tersedia untuk periode ini.")
         return
 
+    # The charts below group the same rows (Tonnase > 0) from the sync-time rollups
+    filters = st.session_state.get('global_filters', {})
 
     # 2. KPI CALCULATIONS (TARGET VS ACTUAL)
     # ----------------------------------------
@@ -154,7 +158,7 @@ def show_ritase():
         st.markdown("---")
         
         # Aggregate Daily
-        rit_daily = df_prod.groupby('Date').agg({'Rit': 'sum', 'Tonnase': 'sum'}).reset_index()
+        rit_daily = load_production_rollup(('date',), filters, active=True).reindex(columns=['Date', 'Rit', 'Tonnase'])
         
         fig_trend = go.Figure()
         
@@ -214,22 +218,12 @@ def show_ritase():
             st.markdown("##### ⏱️ **RATA-RATA RITASE PER JAM (HOURLY)**")
             st.markdown("---")
             
-            # Helper to extract hour
-            def get_hour_safe(t):
-               try:
-                   s = str(t)
-                   if ':' in s: return int(s.split(':')[0])
-                   return int(float(s))
-               except: return -1
-    
-            if 'Hour' not in df_prod.columns:
-                df_prod['Hour'] = df_prod['Time'].apply(get_hour_safe)
-            
-            valid_hours = df_prod[(df_prod['Hour'] >= 0) & (df_prod['Hour'] <= 23)]
+            df_prod = with_hour(df_prod)
+            valid_hours = df_prod[df_prod['Hour'].notna()]
             
             if not valid_hours.empty:
                 # Group by Hour: Sum Ritase & Count Days to get Avg
-                hourly_perf = valid_hours.groupby('Hour')['Rit'].sum().reset_index()
+                hourly_perf = valid_hours.groupby('Hour', observed=True)['Rit'].sum().reset_index()
                 hourly_perf['Avg_Rit_Hour'] = hourly_perf['Rit'] / total_days
                 
                 # Combo Chart: Avg Productivity
@@ -262,12 +256,10 @@ def show_ritase():
             st.markdown("##### 🚛 **KINERJA FORMASI ARMADA (FLEET)**")
             st.markdown("---")
             
-            if 'Dump Truck' in df_prod.columns:
-                # Group by number of DT units: sum ritase, count frequency, sum DT deployed
-                truck_perf = df_prod.groupby('Dump Truck').agg(
-                    Rit=('Rit', 'sum'),
-                    Frekuensi=('Rit', 'count')
-                ).reset_index()
+            # Group by number of DT units: sum ritase, count frequency (rows)
+            truck_perf = load_production_rollup(('dump_truck',), filters, active=True)
+            if not truck_perf.empty:
+                truck_perf = truck_perf[['Dump Truck', 'Rit', 'Rows']].rename(columns={'Rows': 'Frekuensi'})
                 
                 # Avg ritase per session
                 truck_perf['Avg_Rit'] = (truck_perf['Rit'] / truck_perf['Frekuensi']).round(1)
@@ -326,7 +318,8 @@ def show_ritase():
             
             if 'Front' in df_prod.columns or 'BLOK' in df_prod.columns:
                 group_col = 'Front' if 'Front' in df_prod.columns and df_prod['Front'].nunique() > 1 else 'BLOK'
-                rit_front = df_prod.groupby(group_col)['Rit'].sum().reset_index().sort_values('Rit', ascending=True) # Ascending for BarH
+                rit_front = load_production_rollup((group_col.lower(),), filters, active=True).reindex(columns=[group_col, 'Rit'])
+                rit_front = rit_front.sort_values('Rit', ascending=True) # Ascending for BarH
                 
                 # REVISED: Horizontal Bar Chart for Ranking
                 fig_src = px.bar(rit_front, x='Rit', y=group_col, orientation='h',
@@ -344,8 +337,9 @@ def show_ritase():
             st.markdown("##### 🌓 **KONTRIBUSI SHIFT (%)**")
             st.markdown("---")
              
-            if 'Shift' in df_prod.columns:
-                shift_rit = df_prod.groupby('Shift')['Rit'].sum().reset_index()
+            shift_rit = load_production_rollup(('shift',), filters, active=True)
+            if not shift_rit.empty:
+                shift_rit = shift_rit[['Shift', 'Rit']]
                 shift_rit['Shift'] = 'Shift ' + shift_rit['Shift'].astype(str).str.replace('Shift ', '')
                 
                 # Professional Colors